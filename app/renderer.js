@@ -16,6 +16,7 @@ const state = {
   conversionStatusBase: '',
   conversionStatusTicker: null,
   conversionStartedAt: 0,
+  conversionProgress: null,
 };
 const RUN_CONVERSION_TIMEOUT_MS = 90 * 1000;
 const UI_UNLOCK_WATCHDOG_MS = 45 * 1000;
@@ -146,16 +147,29 @@ function setOutlineCollapsed(collapsed) {
   toggleOutlineBtn.title = collapsed ? 'Expand outline panel' : 'Collapse outline panel';
 }
 
+function formatConversionProgress() {
+  const progress = state.conversionProgress;
+  if (!progress) return '';
+  const parts = [`page ${progress.pagesDone}/${progress.pagesTotal}`];
+  if (Number.isFinite(progress.etaSeconds)) {
+    // Count the extractor's estimate down between progress events.
+    const sinceSec = (Date.now() - progress.receivedAt) / 1000;
+    parts.push(`about ${Math.max(1, Math.ceil(progress.etaSeconds - sinceSec))}s left`);
+  }
+  return ` [${parts.join(', ')}]`;
+}
+
 function renderConversionStatus() {
   if (!state.activeConversionRunId) return;
   const elapsedSec = Math.max(0, Math.floor((Date.now() - state.conversionStartedAt) / 1000));
   const base = state.conversionStatusBase || 'Working...';
-  setStatus(`Running conversion: ${base} (${elapsedSec}s elapsed)`);
+  setStatus(`Running conversion: ${base}${formatConversionProgress()} (${elapsedSec}s elapsed)`);
 }
 
 function startConversionStatus(baseMessage) {
   state.conversionStatusBase = baseMessage;
   state.conversionStartedAt = Date.now();
+  state.conversionProgress = null;
   if (state.conversionStatusTicker) {
     clearInterval(state.conversionStatusTicker);
   }
@@ -163,8 +177,19 @@ function startConversionStatus(baseMessage) {
   state.conversionStatusTicker = setInterval(renderConversionStatus, 1000);
 }
 
-function updateConversionStatus(baseMessage) {
+// `payload` is a conversion-progress event; omit it to keep the last page counts.
+function updateConversionStatus(baseMessage, payload) {
   state.conversionStatusBase = baseMessage;
+  if (payload !== undefined) {
+    state.conversionProgress = Number(payload?.pagesTotal) > 0
+      ? {
+        pagesDone: Number(payload.pagesDone) || 0,
+        pagesTotal: Number(payload.pagesTotal),
+        etaSeconds: Number.isFinite(payload.etaSeconds) ? payload.etaSeconds : null,
+        receivedAt: Date.now(),
+      }
+      : null;
+  }
   renderConversionStatus();
 }
 
@@ -175,6 +200,7 @@ function stopConversionStatus() {
   }
   state.conversionStatusBase = '';
   state.conversionStartedAt = 0;
+  state.conversionProgress = null;
 }
 
 function updateRunButtonState() {
@@ -460,28 +486,28 @@ function renderSectionContentView() {
   }
 }
 
-function sectionBaseLevel() {
-  const levels = state.outlineItems
-    .filter((item) => item.section_file)
-    .map((item) => Number(item.level))
-    .filter((n) => Number.isFinite(n));
-  return levels.length ? Math.min(...levels) : 1;
-}
-
-function updateSectionSelectionUI() {
-  const buttons = sectionsListEl.querySelectorAll('button[data-section-file]');
-  for (const btn of buttons) {
-    const sectionFile = btn.dataset.sectionFile || '';
-    btn.classList.toggle('active', sectionFile === state.selectedSection);
-  }
-  const subButtons = sectionsListEl.querySelectorAll('button[data-subheading-title]');
-  for (const btn of subButtons) {
-    const title = btn.dataset.subheadingTitle || '';
-    btn.classList.toggle('active', title === state.selectedSubheading);
-  }
-}
+// Sections panel view state. Groups are derived once per loaded outline; only the
+// rows inside the scrolled viewport (plus an overscan margin) get DOM nodes, and
+// those nodes are reused as the list scrolls.
+const SECTION_ROW_OVERSCAN = 10;
+// Row heights used until a rendered row of each kind has been measured.
+const SECTION_ROW_ESTIMATED_HEIGHT = { section: 33, subheading: 28 };
+const sectionListView = {
+  outlineItems: null,
+  groups: [],
+  baseLevel: 1,
+  rows: [],
+  offsets: [0],
+  rowHeights: { ...SECTION_ROW_ESTIMATED_HEIGHT },
+  measured: { section: false, subheading: false },
+  pool: [],
+  topSpacer: null,
+  bottomSpacer: null,
+  scrollFrame: 0,
+};
 
-function buildSectionGroups() {
+function ensureSectionGroups() {
+  if (sectionListView.outlineItems === state.outlineItems) return;
   const groups = [];
   let currentGroup = null;
   for (const item of state.outlineItems) {
@@ -492,7 +518,30 @@ function buildSectionGroups() {
       currentGroup.children.push(item);
     }
   }
-  return groups;
+  let baseLevel = Infinity;
+  for (const group of groups) {
+    const level = Number(group.root.level);
+    if (Number.isFinite(level) && level < baseLevel) baseLevel = level;
+  }
+  sectionListView.outlineItems = state.outlineItems;
+  sectionListView.groups = groups;
+  sectionListView.baseLevel = Number.isFinite(baseLevel) ? baseLevel : 1;
+  sectionsListEl.scrollTop = 0;
+}
+
+function updateSectionSelectionUI() {
+  for (const li of sectionListView.pool) {
+    if (li.hidden) continue;
+    const btn = li.firstChild;
+    const row = sectionListView.rows[Number(btn.dataset.rowIndex)];
+    if (!row) continue;
+    btn.classList.toggle(
+      'active',
+      row.kind === 'section'
+        ? row.item.section_file === state.selectedSection
+        : String(row.item?.title || '') === state.selectedSubheading
+    );
+  }
 }
 
 function focusSubheadingInContent(title) {
@@ -522,77 +571,173 @@ function focusSubheadingInContent(title) {
   sectionContentEl.scrollTop = Math.floor(maxScroll * ratio);
 }
 
-function renderSectionsList() {
+function computeSectionRowOffsets() {
+  const { rows, rowHeights } = sectionListView;
+  const offsets = new Array(rows.length + 1);
+  offsets[0] = 0;
+  for (let i = 0; i < rows.length; i += 1) {
+    offsets[i + 1] = offsets[i] + rowHeights[rows[i].kind];
+  }
+  sectionListView.offsets = offsets;
+}
+
+function ensureSectionListScaffold() {
+  if (sectionListView.topSpacer && sectionListView.topSpacer.parentNode === sectionsListEl) return;
   sectionsListEl.innerHTML = '';
-  const baseLevel = sectionBaseLevel();
-  const groups = buildSectionGroups();
-  for (const group of groups) {
-    const item = group.root;
+  sectionListView.pool = [];
+  sectionListView.topSpacer = document.createElement('li');
+  sectionListView.bottomSpacer = document.createElement('li');
+  for (const spacer of [sectionListView.topSpacer, sectionListView.bottomSpacer]) {
+    spacer.className = 'virtual-spacer';
+    spacer.setAttribute('aria-hidden', 'true');
+  }
+  sectionsListEl.append(sectionListView.topSpacer, sectionListView.bottomSpacer);
+}
 
+function sectionRowElement(slot) {
+  const { pool, bottomSpacer } = sectionListView;
+  while (pool.length <= slot) {
     const li = document.createElement('li');
     const btn = document.createElement('button');
-    const depth = Math.max(1, Math.min(4, Number(item.level) - baseLevel + 1));
-    btn.classList.add(`depth-${depth}`);
-    btn.dataset.sectionFile = item.section_file;
-    btn.addEventListener('click', () => {
-      state.selectedSection = item.section_file;
-      state.selectedSubheading = '';
-      renderSectionsList();
-      closeSectionContextMenu();
-      void loadSection(item.section_file);
-    });
-    btn.addEventListener('contextmenu', (event) => {
-      event.preventDefault();
-      event.stopPropagation();
-      showSectionContextMenu(event.clientX, event.clientY, item.section_file);
-    });
-
-    const title = document.createElement('span');
-    title.className = 'section-title';
-    title.textContent = item.title;
-
-    btn.appendChild(title);
-
+    btn.type = 'button';
+    btn.appendChild(document.createElement('span'));
     li.appendChild(btn);
+    sectionsListEl.insertBefore(li, bottomSpacer);
+    pool.push(li);
+  }
+  return pool[slot];
+}
 
-    const showChildren = item.section_file === state.selectedSection && Array.isArray(group.children) && group.children.length > 0;
-    if (showChildren) {
-      const childList = document.createElement('ul');
-      childList.className = 'subheading-list';
-      const rootSectionFile = item.section_file;
-      for (const child of group.children) {
-        const childLi = document.createElement('li');
-        const childBtn = document.createElement('button');
-        childBtn.type = 'button';
-        childBtn.className = 'subheading-item';
-        childBtn.dataset.subheadingTitle = String(child?.title || '');
-        childBtn.textContent = String(child?.title || '(untitled)');
-        childBtn.addEventListener('click', () => {
-          const subheadingTitle = String(child?.title || '').trim();
-          state.selectedSubheading = subheadingTitle;
-          updateSectionSelectionUI();
-          if (state.selectedSection !== rootSectionFile) {
-            state.selectedSection = rootSectionFile;
-            void loadSection(rootSectionFile).then(() => focusSubheadingInContent(subheadingTitle));
-          } else {
-            focusSubheadingInContent(subheadingTitle);
-          }
-        });
-        childLi.appendChild(childBtn);
-        childList.appendChild(childLi);
-      }
-      li.appendChild(childList);
-    }
+function fillSectionRow(li, row, rowIndex) {
+  const btn = li.firstChild;
+  const label = btn.firstChild;
+  const title = row.kind === 'section' ? String(row.item.title || '') : String(row.item?.title || '(untitled)');
+  li.hidden = false;
+  btn.dataset.rowIndex = String(rowIndex);
+  btn.title = title;
+  label.textContent = title;
+  if (row.kind === 'section') {
+    const depth = Math.max(1, Math.min(4, Number(row.item.level) - sectionListView.baseLevel + 1));
+    li.className = '';
+    btn.className = `depth-${depth}`;
+    label.className = 'section-title';
+  } else {
+    li.className = row.firstChild ? 'subheading-row first-subheading' : 'subheading-row';
+    btn.className = 'subheading-item';
+    label.className = '';
+  }
+}
 
-    sectionsListEl.appendChild(li);
+function renderVisibleSectionRows() {
+  ensureSectionListScaffold();
+  const { rows, offsets, pool, topSpacer, bottomSpacer } = sectionListView;
+  const viewTop = Math.max(0, sectionsListEl.scrollTop - sectionsListEl.clientTop);
+  const viewBottom = viewTop + (sectionsListEl.clientHeight || 600);
+
+  // First row whose bottom edge is below the top of the viewport.
+  let lo = 0;
+  let hi = rows.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (offsets[mid + 1] <= viewTop) lo = mid + 1;
+    else hi = mid;
+  }
+  const start = Math.max(0, lo - SECTION_ROW_OVERSCAN);
+  let end = lo;
+  while (end < rows.length && offsets[end] < viewBottom) end += 1;
+  end = Math.min(rows.length, end + SECTION_ROW_OVERSCAN);
+
+  topSpacer.style.height = `${offsets[start]}px`;
+  bottomSpacer.style.height = `${offsets[rows.length] - offsets[end]}px`;
+  for (let i = start; i < end; i += 1) {
+    fillSectionRow(sectionRowElement(i - start), rows[i], i);
+  }
+  for (let slot = end - start; slot < pool.length; slot += 1) {
+    pool[slot].hidden = true;
   }
   updateSectionSelectionUI();
+
+  // Replace the estimated height of a row kind with its real height once one is on screen.
+  let remeasured = false;
+  for (let slot = 0; slot < end - start; slot += 1) {
+    const kind = rows[start + slot].kind;
+    if (sectionListView.measured[kind]) continue;
+    const height = pool[slot].offsetHeight;
+    if (!height) continue;
+    sectionListView.measured[kind] = true;
+    if (height !== sectionListView.rowHeights[kind]) {
+      sectionListView.rowHeights[kind] = height;
+      remeasured = true;
+    }
+  }
+  if (remeasured) {
+    computeSectionRowOffsets();
+    renderVisibleSectionRows();
+  }
+}
+
+function renderSectionsList() {
+  ensureSectionGroups();
+  const rows = [];
+  for (const group of sectionListView.groups) {
+    rows.push({ kind: 'section', item: group.root, group });
+    if (group.root.section_file === state.selectedSection) {
+      group.children.forEach((child, index) => {
+        rows.push({ kind: 'subheading', item: child, group, firstChild: index === 0 });
+      });
+    }
+  }
+  sectionListView.rows = rows;
+  computeSectionRowOffsets();
+  renderVisibleSectionRows();
   updateSectionsHintVisibility();
 }
 
+sectionsListEl.addEventListener('scroll', () => {
+  if (sectionListView.scrollFrame) return;
+  sectionListView.scrollFrame = requestAnimationFrame(() => {
+    sectionListView.scrollFrame = 0;
+    renderVisibleSectionRows();
+  });
+});
+
+sectionsListEl.addEventListener('click', (event) => {
+  const btn = event.target.closest('button[data-row-index]');
+  const row = btn ? sectionListView.rows[Number(btn.dataset.rowIndex)] : null;
+  if (!row) return;
+  const rootSectionFile = row.group.root.section_file;
+  if (row.kind === 'section') {
+    state.selectedSection = rootSectionFile;
+    state.selectedSubheading = '';
+    renderSectionsList();
+    closeSectionContextMenu();
+    void loadSection(rootSectionFile);
+    return;
+  }
+  const subheadingTitle = String(row.item?.title || '').trim();
+  state.selectedSubheading = subheadingTitle;
+  updateSectionSelectionUI();
+  if (state.selectedSection !== rootSectionFile) {
+    state.selectedSection = rootSectionFile;
+    void loadSection(rootSectionFile).then(() => focusSubheadingInContent(subheadingTitle));
+  } else {
+    focusSubheadingInContent(subheadingTitle);
+  }
+});
+
+sectionsListEl.addEventListener('contextmenu', (event) => {
+  const btn = event.target.closest('button[data-row-index]');
+  const row = btn ? sectionListView.rows[Number(btn.dataset.rowIndex)] : null;
+  if (!row || row.kind !== 'section') return;
+  event.preventDefault();
+  event.stopPropagation();
+  showSectionContextMenu(event.clientX, event.clientY, row.item.section_file);
+});
+
 function updateSectionsHintVisibility() {
   if (!sectionsHintNoteEl) return;
-  const sectionCount = state.outlineItems.filter((item) => item?.section_file).length;
+  ensureSectionGroups();
+  const sectionCount = sectionListView.groups.length;
   const showHint = state.outputMode !== 'single' && sectionCount > 1;
   sectionsHintNoteEl.hidden = !showHint;
 }
@@ -724,10 +869,24 @@ async function loadSection(sectionRelativePath) {
   }
 }
 
+// The main process sends the outline in pages; fetch the ones after the first.
+// Pages are requested by the payload's folder and token, so they always come
+// from the same load as the first page.
+async function loadRemainingOutlineItems(payload) {
+  const items = [...(payload.outlineItems || [])];
+  const totalItems = Number(payload.totalItems) || items.length;
+  while (items.length < totalItems) {
+    const page = await window.pdfToMdApi.loadOutlinePage(payload.outputDir, payload.outlineToken, items.length);
+    if (!page?.outlineItems?.length) break;
+    items.push(...page.outlineItems);
+  }
+  return items;
+}
+
 async function refreshOutline() {
   if (!state.inputPdfPath) return;
   const payload = await window.pdfToMdApi.loadOutline(state.inputPdfPath, state.outputRootPath);
-  state.outlineItems = payload.outlineItems || [];
+  state.outlineItems = await loadRemainingOutlineItems(payload);
   if (payload.outlineMarkdown && payload.outlineMarkdown.trim()) {
     outlinePreviewEl.textContent = payload.outlineMarkdown;
   } else {
@@ -845,7 +1004,8 @@ runBtn.addEventListener('click', async () => {
     'Running conversion'
   ).then(async (payload) => {
     if (state.activeConversionRunId !== runId) return;
-    state.outlineItems = payload.outlineItems || [];
+    state.outlineItems = await loadRemainingOutlineItems(payload);
+    if (state.activeConversionRunId !== runId) return;
     if (payload.outlineMarkdown && payload.outlineMarkdown.trim()) {
       outlinePreviewEl.textContent = payload.outlineMarkdown;
     } else {
@@ -1090,7 +1250,7 @@ document.addEventListener('click', (event) => {
         if (!state.activeConversionRunId) return;
         const message = String(payload?.message || '').trim();
         if (!message) return;
-        updateConversionStatus(message);
+        updateConversionStatus(message, payload);
       });
     }
 
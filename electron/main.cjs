@@ -72,10 +72,6 @@ function getOutputDirForInput(inputPdfPath, outputRootPath) {
   return path.join(outputRoot, baseName);
 }
 
-function safeRead(filePath) {
-  return fs.existsSync(filePath) ? fs.readFileSync(filePath, 'utf8') : '';
-}
-
 function buildConversionFailureMessage(exitCode, outputBuffer, inputPdfPath) {
   const details = String(outputBuffer || '').trim();
   const rawLower = details.toLowerCase();
@@ -108,33 +104,112 @@ function buildConversionFailureMessage(exitCode, outputBuffer, inputPdfPath) {
   return `Conversion failed with exit code ${exitCode}.${details ? `\n\n${details}` : ''}`;
 }
 
-function loadOutlinePayload(inputPdfPath, outputRootPath) {
+// Outline items sent to the renderer per IPC message; the rest follow via load-outline-page.
+const OUTLINE_PAGE_SIZE = 500;
+// Written by extract_outline.py: every output file with its size.
+const OUTPUT_MANIFEST_FILE = 'manifest.json';
+// Validated outlines still being paged to the renderer, by output folder. Each
+// load gets a new token, so pages of an outline that was reloaded or replaced
+// since are refused instead of being served from the newer one.
+const pagedOutlines = new Map();
+let outlineLoadCount = 0;
+
+async function readOutputManifest(outputDir) {
+  try {
+    const manifest = JSON.parse(await fsp.readFile(path.join(outputDir, OUTPUT_MANIFEST_FILE), 'utf8'));
+    return manifest && Array.isArray(manifest.files) ? manifest : null;
+  } catch (_err) {
+    // Missing (output from an older version) or unreadable; fall back to the outline.
+    return null;
+  }
+}
+
+async function listAvailableSectionFiles(outputDir, outlineItems) {
+  // Candidates come from the manifest when there is one, so files the last
+  // conversion did not write are never offered; otherwise from the outline itself.
+  const manifest = await readOutputManifest(outputDir);
+  const candidates = manifest
+    ? manifest.files.map((entry) => String(entry?.path || ''))
+    : outlineItems.map((item) => String(item?.section_file || '').trim());
+  const resolvedOutputDir = path.resolve(outputDir);
+  const dirs = new Map();
+  for (const relPath of candidates) {
+    if (!relPath) continue;
+    const fullPath = path.resolve(outputDir, relPath);
+    if (!fullPath.startsWith(resolvedOutputDir)) continue;
+    const dir = path.dirname(fullPath);
+    if (!dirs.has(dir)) dirs.set(dir, []);
+    dirs.get(dir).push(fullPath);
+  }
+
+  // One directory read per output folder (usually just the mode's folder)
+  // instead of one existsSync call per outline item.
+  const available = new Set();
+  for (const [dir, fullPaths] of dirs) {
+    let names;
+    try {
+      names = new Set(await fsp.readdir(dir));
+    } catch (_err) {
+      continue;
+    }
+    for (const fullPath of fullPaths) {
+      if (names.has(path.basename(fullPath))) available.add(fullPath);
+    }
+  }
+  return available;
+}
+
+async function loadOutlinePayload(inputPdfPath, outputRootPath) {
   const outputDir = getOutputDirForInput(inputPdfPath, outputRootPath);
   const outlineJsonPath = path.join(outputDir, 'outline.json');
   const outlineMdPath = path.join(outputDir, 'outline.md');
 
-  if (!fs.existsSync(outlineJsonPath)) {
-    throw new Error('outline.json not found. Run conversion first.');
+  let rawOutline;
+  try {
+    rawOutline = await fsp.readFile(outlineJsonPath, 'utf8');
+  } catch (err) {
+    if (err.code === 'ENOENT') throw new Error('outline.json not found. Run conversion first.');
+    throw err;
   }
-
-  const rawOutlineItems = JSON.parse(fs.readFileSync(outlineJsonPath, 'utf8'));
-  const outlineItems = Array.isArray(rawOutlineItems) ? rawOutlineItems.map((item) => {
+  const rawOutlineItems = JSON.parse(rawOutline);
+  const items = Array.isArray(rawOutlineItems) ? rawOutlineItems : [];
+  const available = await listAvailableSectionFiles(outputDir, items);
+  const outlineItems = items.map((item) => {
     if (!item || typeof item !== 'object') return item;
     const sectionRel = String(item.section_file || '').trim();
     if (!sectionRel) return item;
-    const fullPath = path.resolve(outputDir, sectionRel);
-    const outputRootResolved = path.resolve(outputDir);
-    const isInsideOutput = fullPath.startsWith(outputRootResolved);
-    const exists = isInsideOutput && fs.existsSync(fullPath);
-    if (exists) return item;
+    if (available.has(path.resolve(outputDir, sectionRel))) return item;
     return { ...item, section_file: null };
-  }) : [];
-  const outlineMarkdown = safeRead(outlineMdPath);
+  });
+  const outlineMarkdown = await fsp.readFile(outlineMdPath, 'utf8').catch(() => '');
 
+  const outlineToken = ++outlineLoadCount;
+  if (outlineItems.length > OUTLINE_PAGE_SIZE) {
+    pagedOutlines.set(outputDir, { outlineToken, outlineItems });
+  } else {
+    pagedOutlines.delete(outputDir);
+  }
   return {
     outputDir,
+    outlineToken,
     outlineMarkdown,
-    outlineItems,
+    totalItems: outlineItems.length,
+    outlineItems: outlineItems.slice(0, OUTLINE_PAGE_SIZE),
+  };
+}
+
+function loadOutlinePage(outputDir, outlineToken, offset) {
+  const paged = pagedOutlines.get(outputDir);
+  if (!paged || paged.outlineToken !== outlineToken) {
+    throw new Error('Outline was reloaded or replaced. Load the outline again.');
+  }
+  const start = Math.max(0, Number(offset) || 0);
+  const end = start + OUTLINE_PAGE_SIZE;
+  if (end >= paged.outlineItems.length) pagedOutlines.delete(outputDir);
+  return {
+    offset: start,
+    totalItems: paged.outlineItems.length,
+    outlineItems: paged.outlineItems.slice(start, end),
   };
 }
 
@@ -152,10 +227,20 @@ function resolveSectionFullPath(inputPdfPath, outputRootPath, sectionRelativePat
   return resolvedFullPath;
 }
 
-function stripSectionMarkdownPreamble(markdownText) {
+function lastMarkdownHeading(markdownText) {
+  const headings = String(markdownText || '').match(/^#{1,6}\s[^\r\n]*/gm) || [];
+  return headings.length ? headings[headings.length - 1] : null;
+}
+
+function stripSectionMarkdownPreamble(markdownText, continuedHeading = null) {
   const text = String(markdownText || '');
-  const markerRegex = /^#{1,6}\s[^\r\n]*\r?\n\r?\n- Level:[^\r\n]*\r?\n- Pages:[^\r\n]*\r?\n- Source:[^\r\n]*\r?\n\r?\n/;
-  return text.replace(markerRegex, '');
+  const markerRegex = /^(#{1,6}\s[^\r\n]*)\r?\n\r?\n(?:- Level:[^\r\n]*\r?\n- Pages:[^\r\n]*\r?\n- Source:[^\r\n]*\r?\n\r?\n)?/;
+  const match = text.match(markerRegex);
+  if (!match) return text;
+  // Parts of a major-heading group can start at a new sub-section; only drop the
+  // heading when the part continues the section the previous part ended in.
+  if (continuedHeading !== null && match[1] !== continuedHeading) return text;
+  return text.slice(match[0].length);
 }
 
 async function readCombinedSectionContent(sectionFullPath) {
@@ -185,10 +270,14 @@ async function readCombinedSectionContent(sectionFullPath) {
   }
 
   const contents = [];
+  let continuedHeading = null;
   for (let i = 0; i < partFiles.length; i += 1) {
     const partPath = path.join(dir, partFiles[i].name);
     const raw = await fsp.readFile(partPath, 'utf8');
-    contents.push(i === 0 ? raw : stripSectionMarkdownPreamble(raw));
+    const isLast = i === partFiles.length - 1;
+    const content = i === 0 ? raw : stripSectionMarkdownPreamble(raw, continuedHeading);
+    contents.push(isLast ? content : content.replace(/\s+$/, ''));
+    continuedHeading = lastMarkdownHeading(raw) || continuedHeading;
   }
 
   return contents.join('\n\n');
@@ -317,91 +406,282 @@ function resolveDroppedInputPdf(payload) {
   return { ok: false, message: 'Please drop a .pdf file.' };
 }
 
-ipcMain.handle('pick-pdf', async () => {
-  const result = await dialog.showOpenDialog({
-    title: 'Select PDF',
-    properties: ['openFile'],
-    filters: [{ name: 'PDF', extensions: ['pdf'] }],
-  });
+const WORKER_STDERR_TAIL_CHARS = 12_000;
+const WORKER_CONVERSION_TIMEOUT_MS = 10 * 60 * 1000;
+let extractionWorker = null;
+let extractionWorkerStarting = null;
+let pythonInterpreterProbe = null;
 
-  if (result.canceled || result.filePaths.length === 0) {
-    return { canceled: true };
+function getPageCacheDir() {
+  return path.join(app.getPath('userData'), 'page-cache');
+}
+
+function getPythonInterpreterCachePath() {
+  return path.join(app.getPath('userData'), 'python-interpreter.json');
+}
+
+function resolvePythonInterpreter() {
+  // Interpreter discovery lives in the CLI launcher; the result is cached on disk
+  // (keyed on the interpreter's path and mtime) so only the first run probes, and
+  // the probes run as async child processes so they never block the window.
+  // Concurrent callers share one in-flight probe.
+  if (!pythonInterpreterProbe) {
+    const { resolveEngineAsync } = require(path.join(getScriptsDir(), 'phase1.js'));
+    pythonInterpreterProbe = resolveEngineAsync('auto', { cachePath: getPythonInterpreterCachePath() })
+      .then((selected) => selected.pythonBin)
+      .finally(() => {
+        pythonInterpreterProbe = null;
+      });
   }
+  return pythonInterpreterProbe;
+}
 
-  return { canceled: false, filePath: result.filePaths[0] };
-});
+function forgetPythonInterpreter() {
+  try {
+    fs.rmSync(getPythonInterpreterCachePath(), { force: true });
+  } catch (_err) {
+    // no-op
+  }
+}
 
-ipcMain.handle('validate-input-pdf', async (_event, candidatePath) => {
-  return validateInputPdfPath(candidatePath);
-});
+function isMissingPyMuPDFError(message) {
+  return /No module named ['"]?(fitz|pymupdf)/i.test(String(message || ''));
+}
 
-ipcMain.handle('resolve-dropped-input-pdf', async (_event, payload) => {
-  return resolveDroppedInputPdf(payload);
-});
+async function startExtractionWorker() {
+  const pythonBin = await resolvePythonInterpreter();
+  const workerScriptPath = path.join(getScriptsDir(), 'extract_worker.py');
+  if (!fs.existsSync(workerScriptPath)) {
+    throw new Error(`Extraction worker script not found: ${workerScriptPath}`);
+  }
 
-ipcMain.handle('pick-output-dir', async (_event, currentPath) => {
-  const result = await dialog.showOpenDialog({
-    title: 'Select Output Folder',
-    defaultPath: currentPath || getDefaultOutputRoot(),
-    properties: ['openDirectory', 'createDirectory'],
+  const child = spawn(pythonBin, [workerScriptPath], {
+    cwd: getConversionCwd(),
+    env: { ...process.env, PYTHONIOENCODING: 'utf-8' },
+    windowsHide: true,
+    stdio: ['pipe', 'pipe', 'pipe'],
   });
+  const worker = {
+    child,
+    pending: new Map(),
+    nextId: 1,
+    stderrTail: '',
+    exited: false,
+  };
 
-  if (result.canceled || result.filePaths.length === 0) {
-    return { canceled: true };
-  }
+  const failPending = (message) => {
+    for (const request of worker.pending.values()) {
+      request.reject(new Error(message));
+    }
+    worker.pending.clear();
+  };
 
-  return { canceled: false, dirPath: result.filePaths[0] };
-});
+  let stdoutPending = '';
+  child.stdout.on('data', (chunk) => {
+    stdoutPending += chunk.toString('utf8');
+    const lines = stdoutPending.split(/\r?\n/);
+    stdoutPending = lines.pop() || '';
+    for (const line of lines) {
+      let message;
+      try {
+        message = JSON.parse(line);
+      } catch (_err) {
+        // Not a protocol line (e.g. a stray print from a dependency); ignore it.
+        continue;
+      }
+      const request = message && message.id != null ? worker.pending.get(String(message.id)) : null;
+      if (!request) continue;
+      if (message.type === 'progress') {
+        request.onProgress(message);
+      } else {
+        worker.pending.delete(String(message.id));
+        request.resolve(message);
+      }
+    }
+  });
+  child.stderr.on('data', (chunk) => {
+    worker.stderrTail = `${worker.stderrTail}${chunk.toString('utf8')}`.slice(-WORKER_STDERR_TAIL_CHARS);
+  });
+  child.stdin.on('error', () => {
+    // Broken pipe after the worker died; the exit handler reports it.
+  });
+  child.once('error', (err) => {
+    worker.exited = true;
+    if (extractionWorker === worker) extractionWorker = null;
+    failPending(`Extraction worker failed to start: ${err.message}`);
+  });
+  child.once('exit', (code, signal) => {
+    worker.exited = true;
+    if (extractionWorker === worker) extractionWorker = null;
+    const reason = signal ? `signal ${signal}` : `exit code ${code}`;
+    if (isMissingPyMuPDFError(worker.stderrTail)) {
+      // PyMuPDF was removed from the cached interpreter; probe again next time.
+      forgetPythonInterpreter();
+    }
+    failPending(`Extraction worker stopped (${reason}).${worker.stderrTail ? `\n\n${worker.stderrTail.trim()}` : ''}`);
+  });
 
-ipcMain.handle('get-default-output-root', async () => {
-  const outputRoot = getDefaultOutputRoot();
-  ensureDirectoryExists(outputRoot);
-  return { outputRoot };
-});
+  return worker;
+}
 
-ipcMain.handle('get-app-meta', async () => {
-  return {
-    version: app.getVersion(),
-    startedAt: APP_STARTED_AT.toISOString(),
-    isPackaged: app.isPackaged,
-    title: buildWindowTitle(),
-  };
-});
+async function getExtractionWorker() {
+  if (extractionWorker && !extractionWorker.exited) return extractionWorker;
+  if (!extractionWorkerStarting) {
+    extractionWorkerStarting = startExtractionWorker()
+      .then((worker) => {
+        extractionWorker = worker;
+        return worker;
+      })
+      .finally(() => {
+        extractionWorkerStarting = null;
+      });
+  }
+  return extractionWorkerStarting;
+}
 
-ipcMain.handle('run-conversion', async (event, inputPdfPath, outputRootPath, conversionOptions) => {
-  const validatedInput = validateInputPdfPath(inputPdfPath);
-  if (!validatedInput.ok) {
-    throw new Error(validatedInput.message || 'Input PDF path is missing or invalid.');
+function stopExtractionWorker() {
+  const worker = extractionWorker;
+  extractionWorker = null;
+  if (!worker || worker.exited) return;
+  try {
+    worker.child.stdin.end(`${JSON.stringify({ type: 'shutdown' })}\n`);
+  } catch (_err) {
+    // no-op
   }
-  const resolvedInputPdfPath = validatedInput.filePath;
-  const includeSectionMetadata = conversionOptions?.includeSectionMetadata !== false;
-  const outputMode = ['single', 'major', 'sections'].includes(String(conversionOptions?.outputMode || ''))
-    ? String(conversionOptions.outputMode)
-    : 'sections';
+  setTimeout(() => {
+    if (!worker.exited) {
+      try {
+        worker.child.kill();
+      } catch (_err) {
+        // no-op
+      }
+    }
+  }, 2_000).unref();
+}
 
-  const scriptPath = path.join(getScriptsDir(), 'phase1.js');
-  const outputRoot = normalizeOutputRoot(outputRootPath);
-  ensureDirectoryExists(outputRoot);
-  const outputDir = getOutputDirForInput(resolvedInputPdfPath, outputRoot);
+// Progress arrives as plain text or as an extractor event carrying its stage,
+// page counts and ETA (see `--progress-format json` in extract_outline.py).
+function toProgressPayload(progress) {
+  if (!progress || typeof progress !== 'object') {
+    return { message: String(progress || '') };
+  }
+  const payload = { message: String(progress.message || ''), stage: String(progress.stage || '') };
+  if (Number.isFinite(progress.pages_total) && progress.pages_total > 0) {
+    payload.pagesDone = Number(progress.pages_done) || 0;
+    payload.pagesTotal = progress.pages_total;
+  }
+  if (Number.isFinite(progress.eta_seconds)) {
+    payload.etaSeconds = progress.eta_seconds;
+  }
+  return payload;
+}
+
+function runWorkerConversion(worker, conversion, emitProgress) {
+  const requestId = String(worker.nextId);
+  worker.nextId += 1;
+
+  return new Promise((resolve, reject) => {
+    const timer = setTimeout(() => {
+      worker.pending.delete(requestId);
+      // A stuck conversion would block every later request, so restart the worker.
+      try {
+        worker.child.kill();
+      } catch (_err) {
+        // no-op
+      }
+      reject(new Error('Conversion timed out after 10 minutes.'));
+    }, WORKER_CONVERSION_TIMEOUT_MS);
+
+    worker.pending.set(requestId, {
+      onProgress: emitProgress,
+      resolve: (message) => {
+        clearTimeout(timer);
+        if (message.type === 'result') {
+          resolve(message);
+          return;
+        }
+        const details = [message.message, message.details].filter(Boolean).join('\n\n');
+        reject(new Error(buildConversionFailureMessage(1, details, conversion.inputPdfPath)));
+      },
+      reject: (err) => {
+        clearTimeout(timer);
+        reject(new Error(buildConversionFailureMessage(1, err.message, conversion.inputPdfPath)));
+      },
+    });
+
+    const request = {
+      id: requestId,
+      type: 'convert',
+      input: conversion.inputPdfPath,
+      out_dir: conversion.outputRoot,
+      conversion_mode: conversion.outputMode,
+      include_section_metadata: conversion.includeSectionMetadata,
+      page_cache_dir: getPageCacheDir(),
+      // Switching output mode re-renders the saved sections instead of re-extracting.
+      reuse_sections: true,
+    };
+    worker.child.stdin.write(`${JSON.stringify(request)}\n`);
+  });
+}
+
+function runWorkerSearch(worker, outputDir, query, limit) {
+  const requestId = String(worker.nextId);
+  worker.nextId += 1;
+
+  return new Promise((resolve, reject) => {
+    worker.pending.set(requestId, {
+      onProgress: () => {},
+      resolve: (message) => {
+        if (message.type === 'search_result') {
+          resolve(Array.isArray(message.hits) ? message.hits : []);
+          return;
+        }
+        reject(new Error(String(message.message || 'Search failed.')));
+      },
+      reject,
+    });
+    const request = { id: requestId, type: 'search', output_dir: outputDir, query, limit };
+    worker.child.stdin.write(`${JSON.stringify(request)}\n`);
+  });
+}
+
+async function runDirectConversion(conversion, emitProgress) {
+  const {
+    inputPdfPath: resolvedInputPdfPath,
+    outputRoot,
+    includeSectionMetadata,
+    outputMode,
+  } = conversion;
+  const scriptPath = path.join(getScriptsDir(), 'extract_outline.py');
   const conversionCwd = getConversionCwd();
-  const emitProgress = (message) => {
-    event.sender.send(CONVERSION_PROGRESS_EVENT, { message: String(message || '') });
-  };
 
-  emitProgress('Starting conversion process');
-  await new Promise((resolve, reject) => {
+  let pythonBin;
+  try {
+    pythonBin = await resolvePythonInterpreter();
+  } catch (err) {
+    throw new Error(buildConversionFailureMessage(1, err.message, resolvedInputPdfPath));
+  }
+
+  return new Promise((resolve, reject) => {
+    if (!fs.existsSync(scriptPath)) {
+      reject(new Error(`Extraction script not found: ${scriptPath}`));
+      return;
+    }
     const child = spawn(
-      process.execPath,
+      pythonBin,
       [
         scriptPath,
         '--input', resolvedInputPdfPath,
         '--out-dir', outputRoot,
         '--include-section-metadata', includeSectionMetadata ? '1' : '0',
         '--conversion-mode', outputMode,
+        '--page-cache-dir', getPageCacheDir(),
+        '--reuse-sections',
+        '--progress-format', 'json',
       ],
       {
         cwd: conversionCwd,
-        env: { ...process.env, ELECTRON_RUN_AS_NODE: '1' },
+        env: { ...process.env, PYTHONIOENCODING: 'utf-8' },
         windowsHide: true,
         stdio: ['ignore', 'pipe', 'pipe'],
       }
@@ -409,72 +689,28 @@ ipcMain.handle('run-conversion', async (event, inputPdfPath, outputRootPath, con
 
     let settled = false;
     let timer = null;
-    let heartbeat = null;
     let outputBuffer = '';
-    const startMs = Date.now();
-    let lastProgressAtMs = Date.now();
-    let lastProgressMessage = 'starting';
-
-    const readOutputSnapshot = () => {
-      let sectionCount = 0;
-      let outlineReady = false;
-      let latestSectionFile = 'none';
-      let latestSectionAgeSec = -1;
-      try {
-        const candidateDirs = [
-          outputDir,
-          path.join(outputDir, 'Sections'),
-          path.join(outputDir, 'By Major Heading'),
-          path.join(outputDir, 'Per Major Headings'),
-          // Legacy names (pre-v0.7.0 folder naming)
-          path.join(outputDir, 'sections'),
-          path.join(outputDir, 'per-major-headings'),
-        ];
-        const visited = new Set();
-        let newestMtimeMs = 0;
-        for (const dirPath of candidateDirs) {
-          const resolvedDir = path.resolve(dirPath);
-          if (visited.has(resolvedDir) || !fs.existsSync(resolvedDir)) continue;
-          visited.add(resolvedDir);
-          const mdFiles = fs
-            .readdirSync(resolvedDir)
-            .filter((name) => name.toLowerCase().endsWith('.md'))
-            .filter((name) => !(resolvedDir === path.resolve(outputDir) && name.toLowerCase() === 'outline.md'));
-          sectionCount += mdFiles.length;
-          for (const fileName of mdFiles) {
-            const fullPath = path.join(resolvedDir, fileName);
-            const stat = fs.statSync(fullPath);
-            if (stat.mtimeMs > newestMtimeMs) {
-              newestMtimeMs = stat.mtimeMs;
-              latestSectionFile = path.relative(outputDir, fullPath) || fileName;
-            }
-          }
-        }
-        if (newestMtimeMs > 0) {
-          latestSectionAgeSec = Math.max(0, Math.floor((Date.now() - newestMtimeMs) / 1000));
-        }
-      } catch (_err) {
-        // no-op
-      }
-      try {
-        outlineReady = fs.existsSync(path.join(outputDir, 'outline.json'));
-      } catch (_err) {
-        // no-op
-      }
-      return { sectionCount, outlineReady, latestSectionFile, latestSectionAgeSec };
-    };
 
     const parseProgressLine = (rawLine) => {
       const line = String(rawLine || '').trim();
       if (!line) return;
-      outputBuffer += `${line}\n`;
+      let progress = null;
+      if (line.startsWith('{')) {
+        try {
+          const message = JSON.parse(line);
+          if (message && message.type === 'progress') progress = message;
+        } catch (_err) {
+          // Not a progress event; keep it as plain output.
+        }
+      }
+      outputBuffer += progress ? `PROGRESS: ${progress.message || ''}\n` : `${line}\n`;
       if (outputBuffer.length > 12000) {
         outputBuffer = outputBuffer.slice(-12000);
       }
-      if (line.startsWith('PROGRESS:')) {
-        lastProgressAtMs = Date.now();
-        lastProgressMessage = line.replace(/^PROGRESS:\s*/, '').trim();
-        emitProgress(lastProgressMessage);
+      if (progress) {
+        emitProgress(progress);
+      } else if (line.startsWith('PROGRESS:')) {
+        emitProgress(line.replace(/^PROGRESS:\s*/, '').trim());
       }
     };
 
@@ -498,7 +734,6 @@ ipcMain.handle('run-conversion', async (event, inputPdfPath, outputRootPath, con
       if (settled) return;
       settled = true;
       if (timer) clearTimeout(timer);
-      if (heartbeat) clearInterval(heartbeat);
       if (err) reject(err);
       else resolve();
     };
@@ -510,37 +745,13 @@ ipcMain.handle('run-conversion', async (event, inputPdfPath, outputRootPath, con
         return;
       }
       if (code !== 0) {
+        if (isMissingPyMuPDFError(outputBuffer)) forgetPythonInterpreter();
         finish(new Error(buildConversionFailureMessage(code, outputBuffer, resolvedInputPdfPath)));
         return;
       }
       finish();
     });
 
-    heartbeat = setInterval(() => {
-      if (settled) return;
-      const elapsedSec = Math.floor((Date.now() - startMs) / 1000);
-      const idleSec = Math.floor((Date.now() - lastProgressAtMs) / 1000);
-      const snapshot = readOutputSnapshot();
-      const stageSignalsShutdownWait =
-        lastProgressMessage.includes('waiting for subprocess exit')
-        || lastProgressMessage.includes('Extraction pipeline complete')
-        || lastProgressMessage.includes('Core extraction complete');
-      const waitingOnlyForExit =
-        stageSignalsShutdownWait
-        || (
-          snapshot.outlineReady
-          && snapshot.sectionCount > 0
-          && snapshot.latestSectionAgeSec >= 12
-          && idleSec >= 12
-        );
-      const hint = waitingOnlyForExit
-        ? 'no active file processing; all written and waiting for Python process exit'
-        : 'converter still writing/processing';
-      emitProgress(
-        `Finalizing converter shutdown; ${hint}; stage="${lastProgressMessage}", sections=${snapshot.sectionCount}, last-written=${snapshot.latestSectionFile} (${snapshot.latestSectionAgeSec}s ago), outline=${snapshot.outlineReady ? 'yes' : 'no'}, last-update=${idleSec}s, elapsed=${elapsedSec}s`
-      );
-    }, 10_000);
-
     timer = setTimeout(() => {
       try {
         child.kill('SIGTERM');
@@ -550,9 +761,97 @@ ipcMain.handle('run-conversion', async (event, inputPdfPath, outputRootPath, con
       finish(new Error(`Conversion timed out after 10 minutes.${outputBuffer ? `\n\n${outputBuffer}` : ''}`));
     }, 10 * 60 * 1000);
   });
+}
+
+ipcMain.handle('pick-pdf', async () => {
+  const result = await dialog.showOpenDialog({
+    title: 'Select PDF',
+    properties: ['openFile'],
+    filters: [{ name: 'PDF', extensions: ['pdf'] }],
+  });
+
+  if (result.canceled || result.filePaths.length === 0) {
+    return { canceled: true };
+  }
+
+  return { canceled: false, filePath: result.filePaths[0] };
+});
+
+ipcMain.handle('validate-input-pdf', async (_event, candidatePath) => {
+  return validateInputPdfPath(candidatePath);
+});
+
+ipcMain.handle('resolve-dropped-input-pdf', async (_event, payload) => {
+  return resolveDroppedInputPdf(payload);
+});
+
+ipcMain.handle('pick-output-dir', async (_event, currentPath) => {
+  const result = await dialog.showOpenDialog({
+    title: 'Select Output Folder',
+    defaultPath: currentPath || getDefaultOutputRoot(),
+    properties: ['openDirectory', 'createDirectory'],
+  });
+
+  if (result.canceled || result.filePaths.length === 0) {
+    return { canceled: true };
+  }
+
+  return { canceled: false, dirPath: result.filePaths[0] };
+});
+
+ipcMain.handle('get-default-output-root', async () => {
+  const outputRoot = getDefaultOutputRoot();
+  ensureDirectoryExists(outputRoot);
+  return { outputRoot };
+});
+
+ipcMain.handle('get-app-meta', async () => {
+  return {
+    version: app.getVersion(),
+    startedAt: APP_STARTED_AT.toISOString(),
+    isPackaged: app.isPackaged,
+    title: buildWindowTitle(),
+  };
+});
+
+ipcMain.handle('run-conversion', async (event, inputPdfPath, outputRootPath, conversionOptions) => {
+  const validatedInput = validateInputPdfPath(inputPdfPath);
+  if (!validatedInput.ok) {
+    throw new Error(validatedInput.message || 'Input PDF path is missing or invalid.');
+  }
+  const resolvedInputPdfPath = validatedInput.filePath;
+  const includeSectionMetadata = conversionOptions?.includeSectionMetadata !== false;
+  const outputMode = ['single', 'major', 'sections'].includes(String(conversionOptions?.outputMode || ''))
+    ? String(conversionOptions.outputMode)
+    : 'sections';
+
+  const outputRoot = normalizeOutputRoot(outputRootPath);
+  ensureDirectoryExists(outputRoot);
+  const emitProgress = (progress) => {
+    event.sender.send(CONVERSION_PROGRESS_EVENT, toProgressPayload(progress));
+  };
+  const conversion = {
+    inputPdfPath: resolvedInputPdfPath,
+    outputRoot,
+    includeSectionMetadata,
+    outputMode,
+  };
+
+  emitProgress('Starting conversion process');
+  let worker = null;
+  try {
+    worker = await getExtractionWorker();
+  } catch (err) {
+    emitProgress(`Extraction worker unavailable (${err.message}); using one-shot converter`);
+  }
+  if (worker) {
+    await runWorkerConversion(worker, conversion, emitProgress);
+  } else {
+    await runDirectConversion(conversion, emitProgress);
+  }
 
   emitProgress('Loading outline and sections metadata');
-  const payload = loadOutlinePayload(resolvedInputPdfPath, outputRoot);
+  const payload = await loadOutlinePayload(resolvedInputPdfPath, outputRoot);
   emitProgress('Conversion complete');
   return payload;
 });
@@ -574,6 +873,20 @@ ipcMain.handle('load-outline', async (_event, inputPdfPath, outputRootPath) => {
   return loadOutlinePayload(inputPdfPath, outputRootPath);
 });
 
+// Ranked section hits with highlighted snippets, answered by the extraction worker
+// from the search.sqlite index the conversion wrote (no section files are read).
+ipcMain.handle('search-sections', async (_event, inputPdfPath, outputRootPath, query, limit) => {
+  const outputDir = getOutputDirForInput(inputPdfPath, outputRootPath);
+  const text = String(query || '').trim();
+  if (!text) return { query: text, hits: [] };
+  const hits = await runWorkerSearch(await getExtractionWorker(), outputDir, text, Number(limit) || 50);
+  return { query: text, hits };
+});
+
+ipcMain.handle('load-outline-page', async (_event, outputDir, outlineToken, offset) => {
+  return loadOutlinePage(outputDir, outlineToken, offset);
+});
+
 ipcMain.handle('load-section', async (_event, inputPdfPath, outputRootPath, sectionRelativePath) => {
   const resolvedFullPath = resolveSectionFullPath(inputPdfPath, outputRootPath, sectionRelativePath);
   const content = await readCombinedSectionContent(resolvedFullPath);
@@ -619,6 +932,9 @@ ipcMain.handle('open-output-dir', async (_event, inputPdfPath, outputRootPath) =
 
 app.whenReady().then(() => {
   createWindow();
+  // Find the Python interpreter in the background at startup so the first
+  // conversion does not wait on (or race) the probe. Errors surface on first use.
+  resolvePythonInterpreter().catch(() => {});
   app.on('activate', () => {
     if (BrowserWindow.getAllWindows().length === 0) {
       createWindow();
@@ -629,3 +945,7 @@ app.whenReady().then(() => {
 app.on('window-all-closed', () => {
   app.quit();
 });
+
+app.on('will-quit', () => {
+  stopExtractionWorker();
+});
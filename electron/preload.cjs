@@ -29,6 +29,10 @@ contextBridge.exposeInMainWorld('pdfToMdApi', {
   runConversion: (inputPdfPath, outputRootPath, options) =>
     ipcRenderer.invoke('run-conversion', inputPdfPath, outputRootPath, options),
   loadOutline: (inputPdfPath, outputRootPath) => ipcRenderer.invoke('load-outline', inputPdfPath, outputRootPath),
+  loadOutlinePage: (outputDir, outlineToken, offset) =>
+    ipcRenderer.invoke('load-outline-page', outputDir, outlineToken, offset),
+  searchSections: (inputPdfPath, outputRootPath, query, limit) =>
+    ipcRenderer.invoke('search-sections', inputPdfPath, outputRootPath, query, limit),
   loadSection: (inputPdfPath, outputRootPath, sectionRelativePath) =>
     ipcRenderer.invoke('load-section', inputPdfPath, outputRootPath, sectionRelativePath),
   openSectionInFolder: (inputPdfPath, outputRootPath, sectionRelativePath) =>
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import fitz
+
+import extract_outline
+
+
+def collect_input_pdfs(sources: list[str], recursive: bool) -> list[Path]:
+    found = []
+    seen = set()
+
+    def add(candidate: Path):
+        resolved = candidate.expanduser().resolve()
+        if resolved in seen:
+            return
+        seen.add(resolved)
+        found.append(resolved)
+
+    for source in sources:
+        path = Path(source).expanduser()
+        if path.is_dir():
+            pattern = "**/*" if recursive else "*"
+            for entry in sorted(path.glob(pattern)):
+                if entry.is_file() and entry.suffix.lower() == ".pdf":
+                    add(entry)
+        elif path.is_file() and path.suffix.lower() == ".pdf":
+            add(path)
+        elif path.is_file():
+            # Treat any other file as a list of PDF paths, one per line. Relative
+            # entries are resolved against the list file's folder.
+            for raw in path.read_text(encoding="utf-8-sig").splitlines():
+                line = raw.strip()
+                if not line or line.startswith("#"):
+                    continue
+                entry = Path(line).expanduser()
+                if not entry.is_absolute():
+                    entry = path.parent / entry
+                add(entry)
+        else:
+            raise SystemExit(f"Input not found: {path}")
+
+    return found
+
+
+def plan_output_roots(pdfs: list[Path], out_root: Path) -> tuple[dict, dict]:
+    """Pick the folder each PDF is converted into, as ``(roots, rejected)``.
+
+    ``roots`` maps a PDF to the ``out_root`` passed to ``convert_document`` (the
+    document lands in ``<root>/<pdf stem>``). PDFs that share a file name are
+    given their own folders by mirroring their source folders below ``out_root``.
+    ``rejected`` maps a PDF to an error message when its folder would still
+    overwrite, or nest inside, the folder of a PDF listed before it.
+    """
+    by_stem = {}
+    for pdf_path in pdfs:
+        by_stem.setdefault(pdf_path.stem.casefold(), []).append(pdf_path)
+
+    roots = {}
+    for group in by_stem.values():
+        if len(group) == 1:
+            roots[group[0]] = out_root
+            continue
+        try:
+            base = Path(os.path.commonpath([str(pdf_path.parent) for pdf_path in group]))
+        except ValueError:
+            # Different drives on Windows: mirror the full folder path instead.
+            base = None
+        for pdf_path in group:
+            parent = pdf_path.parent
+            relative = parent.relative_to(base) if base is not None else Path(*parent.parts[1:])
+            roots[pdf_path] = out_root / relative
+
+    # Compare folders case-insensitively so the plan is also safe on Windows and
+    # macOS file systems.
+    claimed = {}
+    claimed_below = {}
+    rejected = {}
+    for pdf_path in pdfs:
+        folder = roots[pdf_path] / pdf_path.stem
+        key = str(folder).casefold()
+        ancestors = [
+            str(parent).casefold()
+            for parent in folder.parents
+            if parent != out_root and parent.is_relative_to(out_root)
+        ]
+        owner = claimed.get(key) or claimed_below.get(key)
+        if owner is None:
+            owner = next((claimed[ancestor] for ancestor in ancestors if ancestor in claimed), None)
+        if owner is not None:
+            rejected[pdf_path] = f"Output folder {folder} collides with the output of {owner}"
+            continue
+        claimed[key] = pdf_path
+        for ancestor in ancestors:
+            claimed_below.setdefault(ancestor, pdf_path)
+    return roots, rejected
+
+
+def read_page_count(pdf_path: Path) -> int:
+    try:
+        with fitz.open(str(pdf_path)) as doc:
+            return int(doc.page_count)
+    except Exception:
+        return 0
+
+
+def _init_batch_worker():
+    # Per-document progress from many workers would interleave on stdout; the
+    # parent reports one line per finished document instead.
+    extract_outline.set_progress_sink(lambda _event: None)
+
+
+def _convert_batch_job(job: dict) -> dict:
+    started = time.perf_counter()
+    result = {
+        "input": job["input"],
+        "pages": job["pages"],
+        "status": "ok",
+        "seconds": 0.0,
+        "output": job["output"],
+        "headings": 0,
+        "segments": 0,
+        "error": None,
+    }
+    try:
+        page_store = None
+        if job["page_cache_dir"] and job["page_cache_max_mb"] > 0:
+            page_store = extract_outline.PageResultStore(
+                Path(job["page_cache_dir"]), job["page_cache_max_mb"] * 1024 * 1024
+            )
+        input_path = Path(job["input"])
+        if not input_path.exists():
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+        out_dir, normalized, segments = extract_outline.convert_document(
+            input_path,
+            Path(job["out_root"]),
+            max_section_chars=job["max_section_chars"],
+            max_section_tokens=job["max_section_tokens"],
+            include_section_metadata=job["include_section_metadata"],
+            conversion_mode=job["conversion_mode"],
+            page_cache_pages=job["page_cache_pages"],
+            page_store=page_store,
+            dedupe_scope=job["dedupe_scope"],
+            noise_profile=job["noise_profile"],
+        )
+        result["output"] = str(out_dir)
+        result["headings"] = len(normalized)
+        result["segments"] = len(segments)
+    except Exception as err:
+        result["status"] = "error"
+        result["error"] = f"{type(err).__name__}: {err}"
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def format_summary(results: list[dict]) -> str:
+    lines = ["| Status | Pages | Seconds | Document | Output |", "|---|---:|---:|---|---|"]
+    for row in results:
+        name = Path(row["input"]).name.replace("|", "\\|")
+        output = str(row["output"] or "").replace("|", "\\|")
+        lines.append(f"| {row['status']} | {row['pages']} | {row['seconds']:.2f} | {name} | {output} |")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a folder or list of PDFs in one long-lived worker pool")
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="PDF folders, PDF files, or text files listing one PDF path per line",
+    )
+    parser.add_argument("--out-dir", "-o", default="output", help="Output directory root")
+    parser.add_argument("--recursive", "-r", action="store_true", help="Also scan sub-folders of input folders")
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=0,
+        help="Documents converted in parallel (0 = one per CPU core)",
+    )
+    parser.add_argument(
+        "--max-section-chars",
+        type=int,
+        default=0,
+        help="Split sections longer than this many characters into -part-N files (0 = never split)",
+    )
+    parser.add_argument(
+        "--max-section-tokens",
+        type=int,
+        default=0,
+        help="Like --max-section-chars but budgeted in estimated tokens; overrides it",
+    )
+    parser.add_argument(
+        "--include-section-metadata",
+        type=int,
+        choices=[0, 1],
+        default=1,
+        help="Include section metadata header lines (Level/Pages/Source) in output markdown files",
+    )
+    parser.add_argument(
+        "--conversion-mode",
+        choices=["single", "major", "sections"],
+        default="sections",
+        help="Output grouping mode: single file, per-major-heading, or per-section",
+    )
+    parser.add_argument(
+        "--dedupe-scope",
+        choices=list(extract_outline.DEDUPE_SCOPES),
+        default="section",
+        help="Drop repeated paragraphs within each section, or across the whole document",
+    )
+    parser.add_argument(
+        "--noise-profile",
+        choices=list(extract_outline.NOISE_PROFILES),
+        default="auto",
+        help="Find running headers/footers from every page (full) or a page sample (sampled); auto samples long documents",
+    )
+    parser.add_argument(
+        "--page-cache-pages",
+        type=int,
+        default=extract_outline.PAGE_LAYOUT_CACHE_PAGES,
+        help="Max parsed page layouts each worker keeps in memory",
+    )
+    parser.add_argument(
+        "--page-cache-dir",
+        default=str(extract_outline.default_page_store_dir()),
+        help="Folder for the on-disk page result cache reused across runs (empty string disables it)",
+    )
+    parser.add_argument(
+        "--page-cache-max-mb",
+        type=int,
+        default=extract_outline.PAGE_STORE_MAX_MB,
+        help="Size cap for the on-disk page result cache (0 disables it)",
+    )
+    args = parser.parse_args()
+
+    pdfs = collect_input_pdfs(args.inputs, args.recursive)
+    if not pdfs:
+        raise SystemExit("No PDF files found in the given inputs.")
+
+    out_root = Path(args.out_dir).expanduser().resolve()
+    out_root.mkdir(parents=True, exist_ok=True)
+
+    roots, rejected = plan_output_roots(pdfs, out_root)
+
+    print(f"PROGRESS: Reading page counts for {len(pdfs)} PDFs", flush=True)
+    jobs = []
+    results_by_input = {}
+    for pdf_path in pdfs:
+        if pdf_path in rejected:
+            results_by_input[str(pdf_path)] = {
+                "input": str(pdf_path),
+                "pages": 0,
+                "status": "error",
+                "seconds": 0.0,
+                "output": None,
+                "headings": 0,
+                "segments": 0,
+                "error": rejected[pdf_path],
+            }
+            continue
+        jobs.append(
+            {
+                "input": str(pdf_path),
+                "pages": read_page_count(pdf_path),
+                "out_root": str(roots[pdf_path]),
+                "output": str(roots[pdf_path] / pdf_path.stem),
+                "max_section_chars": args.max_section_chars,
+                "max_section_tokens": args.max_section_tokens,
+                "include_section_metadata": bool(args.include_section_metadata),
+                "conversion_mode": args.conversion_mode,
+                "dedupe_scope": args.dedupe_scope,
+                "noise_profile": args.noise_profile,
+                "page_cache_pages": args.page_cache_pages,
+                "page_cache_dir": args.page_cache_dir,
+                "page_cache_max_mb": args.page_cache_max_mb,
+            }
+        )
+    # Largest documents first so one huge PDF does not start last and become the
+    # straggler that every other worker waits on.
+    jobs.sort(key=lambda job: (-job["pages"], job["input"].lower()))
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    workers = max(1, min(workers, len(jobs) or 1))
+    total_pages = sum(job["pages"] for job in jobs)
+    print(f"PROGRESS: Converting {len(jobs)} PDFs ({total_pages} pages) with {workers} workers", flush=True)
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_batch_worker,
+    ) as pool:
+        futures = [pool.submit(_convert_batch_job, job) for job in jobs]
+        for done_count, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results_by_input[result["input"]] = result
+            print(
+                f"PROGRESS: [{done_count}/{len(jobs)}] {result['status']} {Path(result['input']).name} "
+                f"({result['pages']} pages, {result['seconds']:.2f}s)",
+                flush=True,
+            )
+
+    results = [results_by_input[job["input"]] for job in jobs]
+    results.extend(results_by_input[str(pdf_path)] for pdf_path in pdfs if pdf_path in rejected)
+    elapsed = round(time.perf_counter() - started, 3)
+    failed = [row for row in results if row["status"] != "ok"]
+    summary = {
+        "output_root": str(out_root),
+        "conversion_mode": args.conversion_mode,
+        "workers": workers,
+        "documents": len(results),
+        "failed": len(failed),
+        "pages": total_pages,
+        "seconds": elapsed,
+        "results": results,
+    }
+    summary_path = out_root / "batch-summary.json"
+    summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    print("Batch conversion complete")
+    print(format_summary(results))
+    for row in failed:
+        print(f"Error: {Path(row['input']).name}: {row['error']}")
+    print(f"Documents: {len(results)} ({len(failed)} failed)")
+    print(f"Pages: {total_pages}")
+    print(f"Seconds: {elapsed:.2f}")
+    print(f"Summary: {summary_path}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import fitz
+
+import extract_outline
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_RESULTS_DIR = ROOT / "tests" / "reports" / "benchmarks"
+
+# Pipeline stages and the extract_outline timing spans (see timings.json) whose
+# self time is charged to them. A span nested inside another counts toward the
+# innermost listed one: a page parsed lazily while the outline is built counts
+# as page_text, not outline.
+STAGE_SPANS = {
+    "page_text": ["page_text"],
+    "tables": ["tables"],
+    "noise_profile": ["noise_profile"],
+    "outline": ["outline"],
+    "page_assembly": ["page_assembly"],
+    "post_processing": ["post_processing", "footnote_window", "dedupe"],
+    "writing": ["prepare_output", "writing"],
+}
+STAGE_BY_SPAN = {span: stage for stage, spans in STAGE_SPANS.items() for span in spans}
+STAGES = list(STAGE_SPANS) + ["other"]
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+MARGIN_X = 72
+BODY_TOP = 120
+BODY_BOTTOM = 690
+FOOTNOTE_TOP = 705
+LINE_HEIGHT = 13
+COLUMN_GAP = 24
+# Rough Helvetica 10pt glyph width, used to wrap generated lines to a column.
+CHAR_WIDTH = 5.0
+PAGES_PER_CHAPTER = 4
+
+WORDS = (
+    "analysis apply argument assess audience balance clarity communicate concepts conclusion connection context "
+    "criteria data demonstrate describe design detail develop diagram evaluate evidence examine experiment explain "
+    "explore findings forms graph hypothesis identify illustrate implication inquiry interpret investigate knowledge "
+    "logical materials measure method model observe organize outcome pattern perspective plan precise predict problem "
+    "procedure process purpose question reasoning record relationship report research results safety scientific select "
+    "skills solution source strategy structure summarize support system technique terminology theory thinking tools "
+    "understanding units variables vocabulary energy matter ecosystem students learning expectations curriculum grade "
+    "course program overview strand community history culture language numeracy literacy geometry fractions"
+).split()
+
+
+def density_count(page_index: int, density: float) -> int:
+    """Items on this page so that `density` items per page are spread evenly."""
+    return int((page_index + 1) * density) - int(page_index * density)
+
+
+def sentence(rng: random.Random, low: int = 8, high: int = 18) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(low, high))]
+    return " ".join(words).capitalize() + "."
+
+
+def wrap_words(text: str, max_chars: int) -> list[str]:
+    lines = []
+    current = ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > max_chars:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        lines.append(current)
+    return lines
+
+
+def draw_table(page, x0: float, y0: float, width: float, rng: random.Random) -> float:
+    rows, cols = 4, 3
+    cell_w = width / cols
+    cell_h = 18
+    for r in range(rows):
+        for c in range(cols):
+            rect = fitz.Rect(x0 + c * cell_w, y0 + r * cell_h, x0 + (c + 1) * cell_w, y0 + (r + 1) * cell_h)
+            page.draw_rect(rect, color=(0, 0, 0), width=0.6)
+            label = f"Header {c + 1}" if r == 0 else rng.choice(WORDS)
+            page.insert_text((rect.x0 + 3, rect.y0 + 12), label, fontsize=8)
+    return y0 + rows * cell_h
+
+
+def generate_benchmark_pdf(
+    path: Path,
+    pages: int,
+    columns: int = 1,
+    table_density: float = 0.5,
+    footnote_density: float = 1.0,
+    toc: bool = True,
+    repeated_headers: bool = True,
+    seed: int = 1,
+) -> None:
+    """Write a synthetic PDF with the given layout features."""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    toc_entries = []
+    column_width = (PAGE_WIDTH - 2 * MARGIN_X - (columns - 1) * COLUMN_GAP) / columns
+    max_chars = int(column_width / CHAR_WIDTH)
+    footnote_no = 0
+
+    for page_index in range(pages):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        page_no = page_index + 1
+        if repeated_headers:
+            page.insert_text((MARGIN_X, 40), "Synthetic Benchmark Curriculum Guide", fontsize=9)
+            page.insert_text((MARGIN_X, 770), "Benchmark Publishing 2026", fontsize=8)
+            page.insert_text((PAGE_WIDTH - MARGIN_X - 40, 770), f"Page {page_no}", fontsize=8)
+
+        if page_index % PAGES_PER_CHAPTER == 0:
+            title = f"Chapter {page_index // PAGES_PER_CHAPTER + 1} {rng.choice(WORDS).title()} and {rng.choice(WORDS).title()}"
+            page.insert_text((MARGIN_X, 90), title, fontsize=16)
+            toc_entries.append([1, title, page_no])
+        elif page_index % 2 == 0:
+            title = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} Overview"
+            page.insert_text((MARGIN_X, 90), title, fontsize=13)
+            toc_entries.append([2, title, page_no])
+
+        tables_left = density_count(page_index, table_density)
+        footnotes_left = density_count(page_index, footnote_density)
+        footnotes = []
+        for column in range(columns):
+            x0 = MARGIN_X + column * (column_width + COLUMN_GAP)
+            y = BODY_TOP
+            while y < BODY_BOTTOM - LINE_HEIGHT:
+                if tables_left and y > BODY_TOP and y + 90 < BODY_BOTTOM:
+                    y = draw_table(page, x0, y + 6, column_width, rng) + 16
+                    tables_left -= 1
+                    continue
+                text = " ".join(sentence(rng) for _ in range(rng.randint(2, 4)))
+                if footnotes_left:
+                    footnote_no += 1
+                    footnotes_left -= 1
+                    text = f"{text[:-1]};{footnote_no} {sentence(rng, 4, 8)}"
+                    footnotes.append(f"{footnote_no} {sentence(rng, 6, 12)}")
+                for line in wrap_words(text, max_chars):
+                    if y >= BODY_BOTTOM:
+                        break
+                    page.insert_text((x0, y), line, fontsize=10)
+                    y += LINE_HEIGHT
+                y += 8
+        y = FOOTNOTE_TOP
+        for note in footnotes:
+            page.insert_text((MARGIN_X, y), note[: int((PAGE_WIDTH - 2 * MARGIN_X) / 4.0)], fontsize=8)
+            y += 10
+
+    if toc and toc_entries:
+        doc.set_toc(toc_entries)
+    doc.save(str(path))
+    doc.close()
+
+
+def stage_seconds(timings: dict) -> dict:
+    """Fold a timings.json span report into per-stage exclusive seconds."""
+    seconds = {stage: 0.0 for stage in STAGES}
+    for span in timings["spans"]:
+        stage = "other"
+        for name in reversed(span["path"].split("/")):
+            if name in STAGE_BY_SPAN:
+                stage = STAGE_BY_SPAN[name]
+                break
+        seconds[stage] += span["self_seconds"]
+    return seconds
+
+
+def peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:
+        # Windows has no resource module; peak RSS is left out there.
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _run_benchmark_case(case: dict) -> dict:
+    """Convert one generated PDF `runs` times in a fresh process and time each stage."""
+    extract_outline.set_progress_sink(lambda _event: None)
+    runs = []
+    with tempfile.TemporaryDirectory(prefix="pdf-to-md-bench-") as out_root:
+        for _ in range(case["runs"]):
+            started = time.perf_counter()
+            out_dir, _normalized, _segments = extract_outline.convert_document(
+                Path(case["pdf"]),
+                Path(out_root),
+                conversion_mode=case["conversion_mode"],
+                noise_profile=case["noise_profile"],
+                page_store=None,
+            )
+            seconds = time.perf_counter() - started
+            timings = json.loads((out_dir / extract_outline.TIMINGS_FILE).read_text(encoding="utf-8"))
+            stages = stage_seconds(timings)
+            # Time outside every span (argument checks, writing timings.json itself).
+            stages["other"] += max(0.0, seconds - sum(stages.values()))
+            runs.append({"seconds": round(seconds, 4), "stages": {k: round(v, 4) for k, v in stages.items()}})
+    return {"name": case["name"], "runs": runs, "peak_rss_mb": peak_rss_mb()}
+
+
+def summarize_case(case: dict, result: dict) -> dict:
+    pages = case["params"]["pages"]
+    seconds = statistics.median(run["seconds"] for run in result["runs"])
+    stages = {stage: round(statistics.median(run["stages"][stage] for run in result["runs"]), 4) for stage in STAGES}
+    return {
+        "name": case["name"],
+        "params": case["params"],
+        "seconds": round(seconds, 4),
+        "pages_per_second": round(pages / seconds, 2) if seconds else None,
+        "stages": stages,
+        "stage_pages_per_second": {
+            stage: round(pages / value, 1) for stage, value in stages.items() if value > 0 and stage != "other"
+        },
+        "peak_rss_mb": result["peak_rss_mb"],
+        "runs": result["runs"],
+    }
+
+
+def case_name(params: dict) -> str:
+    return (
+        f"p{params['pages']}-c{params['columns']}-t{params['table_density']:g}-f{params['footnote_density']:g}"
+        f"-{'toc' if params['toc'] else 'notoc'}-{'hdr' if params['repeated_headers'] else 'nohdr'}"
+    )
+
+
+def format_results(cases: list[dict], baseline: dict | None = None) -> str:
+    header = ["Case", "Pages/s", "Seconds"] + [stage for stage in STAGES] + ["Peak RSS MB"]
+    lines = ["| " + " | ".join(header) + " |", "|---|" + "---:|" * (len(header) - 1)]
+    previous = {case["name"]: case for case in (baseline or {}).get("cases", [])}
+    for case in cases:
+        seconds = f"{case['seconds']:.3f}"
+        before = previous.get(case["name"])
+        if before and before.get("seconds"):
+            seconds += f" ({(case['seconds'] - before['seconds']) / before['seconds']:+.0%})"
+        row = [case["name"], f"{case['pages_per_second']}", seconds]
+        row += [f"{case['stages'][stage]:.3f}" for stage in STAGES]
+        row.append("-" if case["peak_rss_mb"] is None else f"{case['peak_rss_mb']}")
+        lines.append("| " + " | ".join(row) + " |")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time every extraction stage on generated PDFs; every list option adds a dimension to the case matrix"
+    )
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 200], help="Page counts to generate")
+    parser.add_argument("--columns", type=int, nargs="+", choices=[1, 2], default=[1], help="Text columns per page")
+    parser.add_argument("--table-density", type=float, nargs="+", default=[0.5], help="Ruled tables per page")
+    parser.add_argument("--footnote-density", type=float, nargs="+", default=[1.0], help="Footnotes per page")
+    parser.add_argument(
+        "--toc",
+        type=int,
+        nargs="+",
+        choices=[0, 1],
+        default=[1],
+        help="Embed a PDF outline (1) or leave headings to the text heuristics (0)",
+    )
+    parser.add_argument(
+        "--repeated-headers",
+        type=int,
+        nargs="+",
+        choices=[0, 1],
+        default=[1],
+        help="Print a running header and page-number footer on every page",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Conversions per case; stage times are medians")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for generated text")
+    parser.add_argument(
+        "--conversion-mode",
+        choices=["single", "major", "sections"],
+        default="sections",
+        help="Output grouping mode used for every case",
+    )
+    parser.add_argument(
+        "--noise-profile",
+        choices=list(extract_outline.NOISE_PROFILES),
+        default="auto",
+        help="Margin-noise profile mode used for every case",
+    )
+    parser.add_argument(
+        "--results",
+        default="",
+        help=f"Results JSON path (default: {DEFAULT_RESULTS_DIR.relative_to(ROOT)}/benchmark-<timestamp>.json)",
+    )
+    parser.add_argument("--compare", default="", help="Earlier results JSON to show per-case changes against")
+    parser.add_argument("--keep-pdfs", default="", help="Folder to keep the generated PDFs in (default: a temp folder)")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+
+    matrix = itertools.product(
+        args.pages, args.columns, args.table_density, args.footnote_density, args.toc, args.repeated_headers
+    )
+    cases = []
+    for pages, columns, table_density, footnote_density, toc, repeated_headers in matrix:
+        params = {
+            "pages": pages,
+            "columns": columns,
+            "table_density": table_density,
+            "footnote_density": footnote_density,
+            "toc": bool(toc),
+            "repeated_headers": bool(repeated_headers),
+            "seed": args.seed,
+        }
+        cases.append({"name": case_name(params), "params": params})
+
+    with tempfile.TemporaryDirectory(prefix="pdf-to-md-bench-pdfs-") as tmp:
+        pdf_dir = Path(args.keep_pdfs).expanduser() if args.keep_pdfs else Path(tmp)
+        pdf_dir.mkdir(parents=True, exist_ok=True)
+        for index, case in enumerate(cases, start=1):
+            print(f"PROGRESS: Generating PDF {index}/{len(cases)}: {case['name']}", flush=True)
+            case["pdf"] = str(pdf_dir / f"{case['name']}.pdf")
+            generate_benchmark_pdf(Path(case["pdf"]), **case["params"])
+            case["runs"] = args.runs
+            case["conversion_mode"] = args.conversion_mode
+            case["noise_profile"] = args.noise_profile
+
+        summaries = []
+        for index, case in enumerate(cases, start=1):
+            print(f"PROGRESS: Benchmarking {index}/{len(cases)}: {case['name']} ({args.runs} runs)", flush=True)
+            # A fresh process per case keeps peak RSS and warm caches from leaking
+            # between cases.
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                result = pool.submit(_run_benchmark_case, case).result()
+            summaries.append(summarize_case(case, result))
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "pymupdf": fitz.VersionBind,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": {
+            "runs": args.runs,
+            "conversion_mode": args.conversion_mode,
+            "noise_profile": args.noise_profile,
+        },
+        "stages": STAGE_SPANS,
+        "cases": summaries,
+    }
+    if args.results:
+        results_path = Path(args.results).expanduser()
+    else:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        results_path = DEFAULT_RESULTS_DIR / f"benchmark-{stamp}.json"
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    results_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    print("Benchmark complete")
+    print(format_results(summaries, baseline))
+    print(f"Results: {results_path}")
+
+
+if __name__ == "__main__":
+    main()
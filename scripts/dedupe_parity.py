@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Check near-duplicate removal against the prefix-only lookup it replaced.
+
+Generates sections of paragraphs with variants just above and just below
+DEDUPE_SIMILARITY that share their opening words, then checks that
+deduplicate_body_paragraphs drops every paragraph the prefix-only lookup
+dropped. A second, long section of paragraphs that open the same way checks
+that each lookup stays within a fixed number of difflib comparisons. Prints a
+JSON summary; exits 1 if any paragraph is missed or the budget is exceeded.
+"""
+import argparse
+import difflib
+import json
+import random
+import sys
+
+import extract_outline
+from extract_outline import BLOCK_PARAGRAPH, Block
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def prefix_only_dropped(norms: list[str]) -> set[int]:
+    """Indexes the former lookup dropped: exact repeats, or same ten-word prefix and ratio >= 0.94.
+
+    Paragraphs over DEDUPE_MAX_COMPARE_CHARS only count as exact repeats, as in the index.
+    """
+    dropped = set()
+    seen_exact = set()
+    seen_by_prefix = {}
+    for pos, norm in enumerate(norms):
+        if norm in seen_exact:
+            dropped.add(pos)
+            continue
+        prefix = " ".join(norm.split()[:10])
+        if len(norm) <= extract_outline.DEDUPE_MAX_COMPARE_CHARS and any(
+            difflib.SequenceMatcher(None, prev, norm).ratio() >= extract_outline.DEDUPE_SIMILARITY
+            for prev in seen_by_prefix.get(prefix, [])
+        ):
+            dropped.add(pos)
+            continue
+        seen_exact.add(norm)
+        if len(norm) <= extract_outline.DEDUPE_MAX_COMPARE_CHARS:
+            seen_by_prefix.setdefault(prefix, []).append(norm)
+    return dropped
+
+
+def base_paragraph(rng: random.Random, words: int) -> str:
+    # A wide random vocabulary keeps difflib fast on the long paragraphs.
+    return " ".join(
+        "".join(rng.choice(LETTERS) for _ in range(rng.randint(2, 9))) for _ in range(words)
+    )
+
+
+def near_variant(rng: random.Random, text: str, low: float, high: float) -> str | None:
+    """Edit letters after the first ten words so the ratio to `text` lands in [low, high)."""
+    words = text.split()
+    head = " ".join(words[:10]) + " "
+    tail = " ".join(words[10:])
+    edits = [(rng.randrange(len(tail)), rng.choice(LETTERS)) for _ in range(len(text) // 8)]
+
+    def edited(count: int) -> str:
+        chars = list(tail)
+        for pos, letter in edits[:count]:
+            if chars[pos] != " ":
+                chars[pos] = letter
+        return head + "".join(chars)
+
+    # The ratio falls as edits accumulate, so bisect on the number of edits.
+    lo, hi = 0, len(edits)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        candidate = edited(mid)
+        ratio = difflib.SequenceMatcher(None, text, candidate).ratio()
+        if low <= ratio < high:
+            return candidate
+        if ratio >= high:
+            lo = mid + 1
+        else:
+            hi = mid
+    return None
+
+
+def build_section(rng: random.Random, long_words: int) -> list[str]:
+    paragraphs = []
+    for _ in range(rng.randint(2, 4)):
+        original = base_paragraph(rng, rng.choice((16, 20, 24, 30, long_words)))
+        paragraphs.append(original)
+        threshold = extract_outline.DEDUPE_SIMILARITY
+        for low, high in ((threshold, threshold + 0.01), (threshold - 0.01, threshold)):
+            for _ in range(rng.randint(1, 3)):
+                variant = near_variant(rng, original, low, high)
+                if variant:
+                    paragraphs.append(variant)
+    head, rest = paragraphs[:1], paragraphs[1:]
+    rng.shuffle(rest)
+    return head + rest
+
+
+def count_ratio_calls(blocks: list[Block]) -> int:
+    calls = 0
+    ratio = difflib.SequenceMatcher.ratio
+
+    def counted(matcher):
+        nonlocal calls
+        calls += 1
+        return ratio(matcher)
+
+    difflib.SequenceMatcher.ratio = counted
+    try:
+        extract_outline.deduplicate_body_paragraphs(blocks)
+    finally:
+        difflib.SequenceMatcher.ratio = ratio
+    return calls
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=13)
+    # About 6,500 characters: over DEDUPE_MAX_COMPARE_CHARS, so only exact repeats drop.
+    parser.add_argument("--long-words", type=int, default=1000)
+    parser.add_argument("--cost-paragraphs", type=int, default=400)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    summary = {"sections": args.sections, "paragraphs": 0, "prefix_only_dropped": 0, "dropped": 0, "missed": []}
+    for section in range(args.sections):
+        paragraphs = build_section(rng, args.long_words)
+        norms = [extract_outline.normalize_match_text(text) for text in paragraphs]
+        expected = prefix_only_dropped(norms)
+        blocks = [Block(BLOCK_PARAGRAPH, text) for text in paragraphs]
+        kept = {block.text for block in extract_outline.deduplicate_body_paragraphs(blocks)}
+        dropped = {pos for pos, text in enumerate(paragraphs) if text not in kept}
+        summary["paragraphs"] += len(paragraphs)
+        summary["prefix_only_dropped"] += len(expected)
+        summary["dropped"] += len(dropped)
+        for pos in sorted(expected - dropped):
+            summary["missed"].append({"section": section, "paragraph": pos, "chars": len(paragraphs[pos])})
+
+    # Variants just below the threshold share the original's opening, so every
+    # one lands in the same prefix bucket and none of them is dropped.
+    original = base_paragraph(rng, 24)
+    paragraphs = [original]
+    while len(paragraphs) < args.cost_paragraphs:
+        threshold = extract_outline.DEDUPE_SIMILARITY
+        variant = near_variant(rng, original, threshold - 0.02, threshold)
+        if variant:
+            paragraphs.append(variant)
+    long_text = base_paragraph(rng, args.long_words)
+    paragraphs += [long_text, long_text[:-1] + "q"]
+    per_lookup = extract_outline.DEDUPE_PREFIX_LIMIT + extract_outline.DEDUPE_MAX_CANDIDATES
+    summary["cost_paragraphs"] = len(paragraphs)
+    summary["ratio_calls"] = count_ratio_calls([Block(BLOCK_PARAGRAPH, text) for text in paragraphs])
+    summary["ratio_call_budget"] = per_lookup * len(paragraphs)
+
+    print(json.dumps(summary, indent=2))
+    if summary["prefix_only_dropped"] == 0:
+        print("No near-threshold duplicates were generated.", file=sys.stderr)
+        return 1
+    if summary["ratio_calls"] > summary["ratio_call_budget"]:
+        print("Near-duplicate lookups exceeded their difflib comparison budget.", file=sys.stderr)
+        return 1
+    return 1 if summary["missed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,288 @@
 ﻿#!/usr/bin/env python3
 import argparse
+import bisect
+import contextlib
+import cProfile
 import difflib
+import functools
+import hashlib
 import json
 import math
+import multiprocessing
+import os
 import re
+import sqlite3
+import sys
+import tempfile
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import NamedTuple
 
 import fitz
 
+# Upper bound on parsed page layouts kept in memory at once. Large documents are
+# re-parsed on demand once their pages have been evicted.
+PAGE_LAYOUT_CACHE_PAGES = 256
+
+# get_text("dict") flags for page layouts: the defaults minus image blocks.
+PAGE_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+# Vector path items that find_tables() turns into table ruling edges.
+TABLE_RULING_ITEMS = ("l", "re", "qu")
+
+# Page extraction shards handed to each worker process when --jobs > 1.
+PAGE_SHARDS_PER_WORKER = 4
+
+# Bump whenever read_page_layout() or detect_page_tables() output changes so stale
+# on-disk page results are never reused.
+PAGE_STORE_VERSION = 1
+
+# Default size cap for the on-disk page result cache; oldest entries go first.
+PAGE_STORE_MAX_MB = 512
+
+# Post-processed section bodies saved next to the outputs so any conversion mode
+# can be re-rendered without re-extracting. Bump the version whenever extraction
+# or section post-processing changes what ends up in a body.
+SECTION_STORE_FILE = "sections.jsonl"
+SECTION_STORE_VERSION = 2
+
+# Every file a conversion wrote, with its size, so readers can check the
+# outputs with one directory listing instead of one stat per outline entry.
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+# SQLite FTS5 index of section text for in-app search, rebuilt by every run.
+SEARCH_INDEX_FILE = "search.sqlite"
+SEARCH_INDEX_VERSION = 1
+SEARCH_RESULT_LIMIT = 50
+# Snippet tokens around each match, and the markers that highlight it.
+SEARCH_SNIPPET_TOKENS = 24
+SEARCH_HIGHLIGHT = ("**", "**")
+
+# Per-stage wall-clock spans of the last run, and the raw cProfile dump --profile adds.
+TIMINGS_FILE = "timings.json"
+PROFILE_FILE = "profile.pstats"
+
+# Page ranges extracted and post-processed per streaming batch; bounds how much of
+# a document is in memory at once.
+SECTION_STREAM_BATCH_PAGES = 64
+
+# Rough characters-per-token ratio behind --max-section-tokens budgets.
+CHARS_PER_TOKEN_ESTIMATE = 4
+
+# Pages with at least this many TOC titles to place index their lines for matching.
+TOC_MATCH_INDEX_MIN_TITLES = 4
+
+# Paragraphs at least this alike (difflib ratio) count as near-duplicates.
+DEDUPE_SIMILARITY = 0.94
+# Near-duplicate candidates come from a MinHash signature over character
+# shingles, split into LSH bands; every candidate is then confirmed with difflib.
+DEDUPE_SHINGLE_CHARS = 5
+DEDUPE_MINHASH_BINS = 128
+DEDUPE_BAND_ROWS = 8
+# Low-vocabulary text can put most paragraphs in the same bands; each band keeps
+# only its newest entries, and only the candidates sharing the most bands are
+# confirmed, so one lookup stays bounded.
+DEDUPE_BUCKET_LIMIT = 64
+DEDUPE_MAX_CANDIDATES = 4
+# Paragraphs that share their first words are compared as well, as the former
+# prefix-only lookup did; each prefix bucket keeps only its newest entries.
+DEDUPE_PREFIX_WORDS = 10
+DEDUPE_PREFIX_LIMIT = 8
+# difflib can take tens of seconds on very long, repetitive paragraphs (usually
+# several blocks merged by extraction), so longer ones only drop exact repeats.
+DEDUPE_MAX_COMPARE_CHARS = 5000
+# "section" drops repeats within each section; "document" also drops paragraphs
+# already kept in an earlier section.
+DEDUPE_SCOPES = ("section", "document")
+
+# Running headers/footers must repeat on at least this share of pages.
+MARGIN_NOISE_MIN_SHARE = 0.15
+# "auto" margin-noise profiling reads every page up to this length and a
+# stratified sample of NOISE_PROFILE_SAMPLE_PAGES pages beyond it.
+NOISE_PROFILE_FULL_SCAN_PAGES = 300
+NOISE_PROFILE_SAMPLE_PAGES = 48
+NOISE_PROFILES = ("auto", "full", "sampled")
+
+# Long page loops (heading detection without a TOC, serial section extraction)
+# report progress every this many pages.
+PROGRESS_PAGE_INTERVAL = 50
+PROGRESS_FORMATS = ("text", "json")
+
+_progress_sink = None
+_progress_clock = None
+
+
+def set_progress_sink(sink) -> None:
+    """Route progress events to `sink(event)` instead of stdout (None restores stdout).
+
+    Each event is a dict with "message", "stage" and "elapsed_seconds", plus
+    "pages_done", "pages_total" and "eta_seconds" once the stage counts pages.
+    """
+    global _progress_sink
+    _progress_sink = sink
+
+
+class ProgressClock:
+    """Turns progress reports into events with a page-weighted ETA.
+
+    The ETA extrapolates the current stage's measured seconds per page over the
+    pages it has left. Reports that give no stage or page counts keep the last ones,
+    so post-processing and writing messages between extraction batches still carry
+    the section stage's page progress.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stage = None
+        self.pages_done = None
+        self.pages_total = None
+        self._stage_started = self.started
+        self._stage_first_page = 0
+
+    def event(self, message: str, stage=None, pages_done=None, pages_total=None) -> dict:
+        now = time.perf_counter()
+        if stage is not None and stage != self.stage:
+            self.stage = stage
+            self.pages_done = self.pages_total = None
+        if pages_total is not None:
+            if self.pages_total is None or pages_done < self.pages_done:
+                self._stage_started = now
+                self._stage_first_page = pages_done
+            self.pages_done = pages_done
+            self.pages_total = pages_total
+        event = {"message": message, "stage": self.stage, "elapsed_seconds": round(now - self.started, 1)}
+        if self.pages_total is not None:
+            event["pages_done"] = self.pages_done
+            event["pages_total"] = self.pages_total
+            measured = self.pages_done - self._stage_first_page
+            if measured > 0:
+                per_page = (now - self._stage_started) / measured
+                event["eta_seconds"] = round(per_page * max(0, self.pages_total - self.pages_done), 1)
+        return event
+
+
+def reset_progress_clock() -> None:
+    """Start elapsed time and ETAs afresh for a new conversion."""
+    global _progress_clock
+    _progress_clock = ProgressClock()
+
+
+def report_progress(
+    message: str, stage: str | None = None, pages_done: int | None = None, pages_total: int | None = None
+) -> None:
+    if _progress_sink is None:
+        print(f"PROGRESS: {message}", flush=True)
+        return
+    if _progress_clock is None:
+        reset_progress_clock()
+    _progress_sink(_progress_clock.event(message, stage=stage, pages_done=pages_done, pages_total=pages_total))
+
+
+def print_progress_json(event: dict) -> None:
+    print(json.dumps({"type": "progress", **event}), flush=True)
+
+
+class StageTimer:
+    """Nested wall-clock spans keyed by their path ("sections/section_pages/tables").
+
+    Each path accumulates its call count, total seconds, and self seconds (total
+    minus time spent in nested spans).
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.spans = {}
+        self._stack = []
+
+    def enter(self, name: str) -> None:
+        path = f"{self._stack[-1][0]}/{name}" if self._stack else name
+        self._stack.append([path, time.perf_counter(), 0.0])
+
+    def leave(self) -> None:
+        path, started, child_seconds = self._stack.pop()
+        elapsed = time.perf_counter() - started
+        if self._stack:
+            self._stack[-1][2] += elapsed
+        totals = self.spans.setdefault(path, [0, 0.0, 0.0])
+        totals[0] += 1
+        totals[1] += elapsed
+        totals[2] += elapsed - child_seconds
+
+    def report(self) -> dict:
+        by_name = {}
+        for path, (calls, _seconds, self_seconds) in self.spans.items():
+            name = path.rsplit("/", 1)[-1]
+            entry = by_name.setdefault(name, {"calls": 0, "self_seconds": 0.0})
+            entry["calls"] += calls
+            entry["self_seconds"] += self_seconds
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 6),
+            "stages": {
+                path: round(seconds, 6)
+                for path, (_calls, seconds, _self_seconds) in self.spans.items()
+                if "/" not in path
+            },
+            "spans": [
+                {
+                    "path": path,
+                    "calls": calls,
+                    "seconds": round(seconds, 6),
+                    "self_seconds": round(self_seconds, 6),
+                }
+                for path, (calls, seconds, self_seconds) in sorted(self.spans.items())
+            ],
+            "by_name": {
+                name: {"calls": entry["calls"], "self_seconds": round(entry["self_seconds"], 6)}
+                for name, entry in sorted(by_name.items())
+            },
+        }
+
+
+_stage_timer = None
+
+
+def set_stage_timer(timer) -> None:
+    """Record stage spans on `timer` (a StageTimer) until reset with None."""
+    global _stage_timer
+    _stage_timer = timer
+
+
+@contextlib.contextmanager
+def stage_span(name: str):
+    timer = _stage_timer
+    if timer is None:
+        yield
+        return
+    timer.enter(name)
+    try:
+        yield
+    finally:
+        timer.leave()
+
+
+def timed_stage(name: str):
+    """Decorator recording every call of the wrapped function as a `name` span."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timer = _stage_timer
+            if timer is None:
+                return func(*args, **kwargs)
+            timer.enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timer.leave()
+
+        return wrapper
+
+    return decorate
+
 
 def slugify(value: str) -> str:
     value = value.lower()
@@ -16,7 +291,8 @@ def slugify(value: str) -> str:
 
 
 def clean_line(line: str) -> str:
-    return re.sub(r"\s+", " ", line).strip()
+    # str.split() and the regex \s class agree on what counts as whitespace.
+    return " ".join(line.split())
 
 
 def clean_paragraph(text: str) -> str:
@@ -27,14 +303,21 @@ def clean_paragraph(text: str) -> str:
     return " ".join(lines)
 
 
-def percentile(values, pct: float):
-    if not values:
+def histogram_percentile(counts: dict, pct: float):
+    """Percentile of the values counted in `counts` (value -> occurrences)."""
+    total = sum(counts.values())
+    if not total:
         return 0.0
-    values = sorted(values)
-    idx = max(0, min(len(values) - 1, int(math.floor((len(values) - 1) * pct))))
-    return values[idx]
+    idx = max(0, min(total - 1, int(math.floor((total - 1) * pct))))
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if seen > idx:
+            return value
+    return value
 
 
+@timed_stage("toc")
 def build_outline_from_toc(doc):
     toc = doc.get_toc(simple=True)
     entries = []
@@ -57,10 +340,11 @@ def build_outline_from_toc(doc):
 
 
 def normalize_match_text(value: str) -> str:
-    value = clean_line(str(value or "")).lower()
+    # Whitespace folds into the non-alphanumeric runs, so one replacement pass
+    # leaves single spaces between words.
+    value = str(value or "").lower()
     value = re.sub(r"<[^>]+>", " ", value)
-    value = re.sub(r"[^a-z0-9]+", " ", value)
-    return clean_line(value)
+    return re.sub(r"[^a-z0-9]+", " ", value).strip()
 
 
 def normalize_margin_noise_text(value: str) -> str:
@@ -71,7 +355,262 @@ def normalize_margin_noise_text(value: str) -> str:
     return normalize_match_text(text)
 
 
+@timed_stage("page_text")
+def read_page_layout(page) -> dict:
+    # Image blocks are skipped below, so don't have MuPDF decode and copy them.
+    payload = page.get_text("dict", flags=PAGE_TEXT_FLAGS)
+    lines = []
+    for block in payload.get("blocks", []):
+        if block.get("type") != 0:
+            continue
+        for line in block.get("lines", []):
+            parts = []
+            font_size = 0.0
+            for span in line.get("spans", []):
+                text = clean_line(span.get("text", ""))
+                if not text:
+                    continue
+                parts.append(text)
+                font_size = max(font_size, float(span.get("size", 0.0)))
+            merged = clean_line(" ".join(parts))
+            if not merged:
+                continue
+            bbox = line.get("bbox", [0, 0, 0, 0])
+            lines.append(
+                {
+                    "x0": float(bbox[0]),
+                    "x1": float(bbox[2]),
+                    "y0": float(bbox[1]),
+                    "y1": float(bbox[3]),
+                    "text": merged,
+                    "size": font_size,
+                    "noise_norm": normalize_margin_noise_text(merged),
+                }
+            )
+
+    return {
+        "page_no": int(page.number) + 1,
+        "width": float(page.rect.width),
+        "height": float(page.rect.height),
+        "lines": lines,
+    }
+
+
+def default_page_store_dir() -> Path:
+    override = os.environ.get("PDF_TO_MD_PAGE_CACHE_DIR", "").strip()
+    if override:
+        return Path(override).expanduser()
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "petes-pdf-to-md" / "pages"
+
+
+PDF_REFERENCE_RE = re.compile(r"\b(\d+) \d+ R\b")
+
+
+def pdf_object_digest(doc, xref: int, memo: dict[int, bytes]) -> bytes:
+    """Hash a PDF object's definition, its stream, and every object it references.
+
+    References are hashed as the referenced object's digest rather than its xref
+    number, so the same font or form in another file hashes the same. `memo`
+    holds digests already computed for `doc`.
+    """
+    cached = memo.get(xref)
+    if cached is not None:
+        return cached
+    # A reference cycle back to this object hashes as empty.
+    memo[xref] = b""
+    digest = hashlib.sha256()
+    try:
+        source = doc.xref_object(xref, compressed=True)
+        stream = doc.xref_stream(xref) if doc.xref_is_stream(xref) else None
+    except Exception:
+        source, stream = "", None
+    pos = 0
+    for match in PDF_REFERENCE_RE.finditer(source):
+        digest.update(source[pos : match.start()].encode("utf-8", "surrogatepass"))
+        digest.update(b"<" + pdf_object_digest(doc, int(match.group(1)), memo) + b">")
+        pos = match.end()
+    digest.update(source[pos:].encode("utf-8", "surrogatepass"))
+    digest.update(b"|stream|" + (stream or b""))
+    memo[xref] = digest.digest()
+    return memo[xref]
+
+
+def page_content_key(doc, page, object_digests: dict[int, bytes] | None = None) -> str:
+    """Hash everything the page's text and table extraction depends on.
+
+    Fonts (with their ToUnicode maps and embedded programs) and XObjects, including
+    nested forms and their resources, are hashed by content. The page's xref
+    number is deliberately left out so an unchanged page in a revised edition of
+    the same PDF still hits the cache. Pass one `object_digests` dict per document
+    so shared fonts are only hashed once.
+    """
+    if object_digests is None:
+        object_digests = {}
+    digest = hashlib.sha256()
+    digest.update(f"v{PAGE_STORE_VERSION}|pymupdf {fitz.VersionBind}|".encode("utf-8"))
+    digest.update(f"{tuple(page.mediabox)}|{tuple(page.rect)}|{page.rotation}|".encode("utf-8"))
+    for font in page.get_fonts():
+        # (ext, type, basefont, resource name, encoding); xref numbers vary per file.
+        digest.update(repr(tuple(font[1:])).encode("utf-8"))
+        digest.update(pdf_object_digest(doc, font[0], object_digests))
+    for xobject in page.get_xobjects():
+        # (resource name, invoker, bbox); the invoker is an xref, so only note its presence.
+        digest.update(repr((xobject[1], bool(xobject[2]), tuple(xobject[3]))).encode("utf-8"))
+        digest.update(pdf_object_digest(doc, xobject[0], object_digests))
+    digest.update(b"|contents|")
+    digest.update(page.read_contents() or b"")
+    return digest.hexdigest()
+
+
+class PageResultStore:
+    """On-disk, content-addressed cache of per-page layouts and detected tables.
+
+    Entries live under `root` as one JSON file per page content hash. Reads touch
+    the file's mtime, and prune() deletes the least recently used entries once the
+    folder grows past `max_bytes`.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root).expanduser()
+        self.max_bytes = max(0, int(max_bytes))
+
+    def _entry_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> dict | None:
+        entry_path = self._entry_path(key)
+        try:
+            entry = json.loads(entry_path.read_text(encoding="utf-8"))
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) else None
+
+    def put(self, key: str, entry: dict) -> None:
+        entry_path = self._entry_path(key)
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent workers never read a partial entry.
+            fd, tmp_name = tempfile.mkstemp(dir=entry_path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(entry, handle, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_name, entry_path)
+        except OSError:
+            pass
+
+    def prune(self) -> None:
+        entries = []
+        total = 0
+        try:
+            buckets = [item for item in os.scandir(self.root) if item.is_dir()]
+        except OSError:
+            return
+        for bucket in buckets:
+            try:
+                for item in os.scandir(bucket.path):
+                    if not item.is_file():
+                        continue
+                    stat = item.stat()
+                    entries.append((stat.st_mtime, stat.st_size, item.path))
+                    total += stat.st_size
+            except OSError:
+                continue
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+            except OSError:
+                continue
+            total -= size
+
+
+class PageLayoutCache:
+    """Parses each page's text once and shares the normalized lines between stages.
+
+    Entries are evicted least-recently-used first once more than `max_pages`
+    layouts are held, so memory stays bounded on very large documents. With a
+    `store`, parsed pages are also persisted on disk and reused across runs.
+    """
+
+    def __init__(self, doc, max_pages: int = PAGE_LAYOUT_CACHE_PAGES, store: PageResultStore | None = None):
+        self.doc = doc
+        self.max_pages = max(1, int(max_pages))
+        self.store = store
+        self._layouts = OrderedDict()
+        self._tables = OrderedDict()
+        self._keys = {}
+        self._object_digests = {}
+
+    def _remember(self, cache: OrderedDict, page_no: int, value) -> None:
+        cache[page_no] = value
+        cache.move_to_end(page_no)
+        while len(cache) > self.max_pages:
+            cache.popitem(last=False)
+
+    def _stored(self, page_no: int, page) -> tuple[str, dict | None]:
+        key = self._keys.get(page_no)
+        if key is None:
+            key = page_content_key(self.doc, page, self._object_digests)
+            self._keys[page_no] = key
+        return key, self.store.get(key)
+
+    def layout(self, page_no: int, page=None) -> dict:
+        cached = self._layouts.get(page_no)
+        if cached is not None:
+            self._layouts.move_to_end(page_no)
+            return cached
+
+        if page is None:
+            page = self.doc.load_page(page_no - 1)
+        if self.store is None:
+            layout = read_page_layout(page)
+        else:
+            key, entry = self._stored(page_no, page)
+            if entry is not None:
+                layout = dict(entry["layout"], page_no=page_no)
+                if entry.get("tables") is not None:
+                    self._remember(self._tables, page_no, entry["tables"])
+            else:
+                layout = read_page_layout(page)
+                self.store.put(key, {"layout": layout, "tables": None})
+        self._remember(self._layouts, page_no, layout)
+        return layout
+
+    def tables(self, page_no: int, page=None) -> list[dict]:
+        cached = self._tables.get(page_no)
+        if cached is not None:
+            self._tables.move_to_end(page_no)
+            return cached
+
+        if page is None:
+            page = self.doc.load_page(page_no - 1)
+        if self.store is None:
+            detected = detect_page_tables(page)
+        else:
+            key, entry = self._stored(page_no, page)
+            if entry is not None and entry.get("tables") is not None:
+                detected = entry["tables"]
+            else:
+                detected = detect_page_tables(page)
+                layout = entry["layout"] if entry is not None else None
+                layout = layout or self._layouts.get(page_no) or read_page_layout(page)
+                self.store.put(key, {"layout": layout, "tables": detected})
+        self._remember(self._tables, page_no, detected)
+        return detected
+
+
 def repair_mojibake(text: str) -> str:
+    # Every mis-decoded sequence below starts with this character.
+    if "\u00c3" not in text:
+        return text
     replacements = {
         "ÃƒÂ¢Ã¢â€šÂ¬Ã‚Â¢": "â€¢",
         "Ã¢â‚¬Â¢": "â€¢",
@@ -134,31 +673,23 @@ def normalize_outline(outline: list[dict]) -> list[dict]:
     return cleaned
 
 
-def infer_document_title(doc, input_path: Path) -> str:
+@timed_stage("document_title")
+def infer_document_title(doc, input_path: Path, layouts: PageLayoutCache | None = None) -> str:
+    layouts = layouts or PageLayoutCache(doc)
     try:
-        page = doc.load_page(0)
+        layout = layouts.layout(1)
     except Exception:
         return input_path.stem.replace("-", " ")
 
-    payload = page.get_text("dict")
-    top_limit = float(page.rect.height) * 0.28
+    top_limit = layout["height"] * 0.28
     rows = []
-    for block in payload.get("blocks", []):
-        if block.get("type") != 0:
+    for line in layout["lines"]:
+        y0 = line["y0"]
+        if y0 > top_limit:
             continue
-        for line in block.get("lines", []):
-            bb = line.get("bbox", [0, 0, 0, 0])
-            y0 = float(bb[1])
-            if y0 > top_limit:
-                continue
-            parts = []
-            for span in line.get("spans", []):
-                text = clean_line(span.get("text", ""))
-                if text:
-                    parts.append(text)
-            merged = repair_mojibake(clean_line(" ".join(parts)))
-            if len(merged) >= 12:
-                rows.append((y0, merged))
+        merged = repair_mojibake(line["text"])
+        if len(merged) >= 12:
+            rows.append((y0, merged))
 
     if not rows:
         return input_path.stem.replace("-", " ")
@@ -177,86 +708,147 @@ def infer_document_title(doc, input_path: Path) -> str:
     return clean_line(" ".join(title_parts)) or input_path.stem.replace("-", " ")
 
 
-def build_margin_noise_profile(doc):
-    top_counts = {}
-    bottom_counts = {}
-    min_repeat = max(2, int(math.ceil(doc.page_count * 0.15)))
-
-    for page_no in range(1, doc.page_count + 1):
-        page = doc.load_page(page_no - 1)
-        payload = page.get_text("dict")
-        page_height = float(page.rect.height)
-        top_band = page_height * 0.10
-        bottom_band = page_height * 0.90
+def resolve_noise_profile_mode(mode: str, page_count: int) -> str:
+    if mode not in NOISE_PROFILES:
+        raise ValueError(f"Unsupported noise profile: {mode}")
+    if mode == "auto":
+        return "sampled" if page_count > NOISE_PROFILE_FULL_SCAN_PAGES else "full"
+    return mode
 
-        for block in payload.get("blocks", []):
-            if block.get("type") != 0:
-                continue
-            for line in block.get("lines", []):
-                parts = []
-                for span in line.get("spans", []):
-                    text = clean_line(span.get("text", ""))
-                    if text:
-                        parts.append(text)
-                merged = clean_line(" ".join(parts))
-                if not merged:
-                    continue
 
-                bbox = line.get("bbox", [0, 0, 0, 0])
-                y0 = float(bbox[1])
-                y1 = float(bbox[3])
-                norm = normalize_margin_noise_text(merged)
-                if not norm:
-                    continue
+def stratified_sample_pages(page_count: int, sample_size: int, position: float = 0.5) -> list[int]:
+    """One page per equal-sized stratum, taken at `position` (0-1) within it."""
+    if page_count <= sample_size:
+        return list(range(1, page_count + 1))
+    stride = page_count / sample_size
+    return sorted({min(page_count, 1 + int((idx + position) * stride)) for idx in range(sample_size)})
 
-                if y0 <= top_band:
-                    top_counts.setdefault(norm, set()).add(page_no)
-                if y1 >= bottom_band:
-                    bottom_counts.setdefault(norm, set()).add(page_no)
 
-    repeated_top = {text for text, pages in top_counts.items() if len(pages) >= min_repeat and len(text) >= 4}
-    repeated_bottom = {text for text, pages in bottom_counts.items() if len(pages) >= min_repeat and len(text) >= 4}
+def count_margin_noise_candidates(layouts: PageLayoutCache, page_numbers, top_counts: dict, bottom_counts: dict) -> None:
+    # Counts pages, not lines: a header printed twice on one page still counts once.
+    for page_no in page_numbers:
+        layout = layouts.layout(page_no)
+        page_height = layout["height"]
+        top_band = page_height * 0.10
+        bottom_band = page_height * 0.90
+        top_norms = set()
+        bottom_norms = set()
+        for line in layout["lines"]:
+            norm = line["noise_norm"]
+            if not norm:
+                continue
+            if line["y0"] <= top_band:
+                top_norms.add(norm)
+            if line["y1"] >= bottom_band:
+                bottom_norms.add(norm)
+        for norm in top_norms:
+            top_counts[norm] = top_counts.get(norm, 0) + 1
+        for norm in bottom_norms:
+            bottom_counts[norm] = bottom_counts.get(norm, 0) + 1
+
+
+@timed_stage("noise_profile")
+def build_margin_noise_profile(doc, layouts: PageLayoutCache | None = None, mode: str = "full"):
+    """Find running header/footer text repeated on at least MARGIN_NOISE_MIN_SHARE of pages.
+
+    "full" reads every page. "sampled" estimates the shares from a stratified page
+    sample. Text whose sampled share lands near the cut-off gets a second, offset
+    sample, which is read only when such a borderline candidate exists.
+    """
+    layouts = layouts or PageLayoutCache(doc)
+    top_counts = {}
+    bottom_counts = {}
+    if resolve_noise_profile_mode(mode, doc.page_count) == "full":
+        scanned = doc.page_count
+        count_margin_noise_candidates(layouts, range(1, doc.page_count + 1), top_counts, bottom_counts)
+    else:
+        pages = stratified_sample_pages(doc.page_count, NOISE_PROFILE_SAMPLE_PAGES)
+        report_progress(f"Profiling page margins from {len(pages)} of {doc.page_count} pages", stage="noise_profile")
+        count_margin_noise_candidates(layouts, pages, top_counts, bottom_counts)
+        scanned = len(pages)
+        cut = scanned * MARGIN_NOISE_MIN_SHARE
+        borderline = any(
+            cut / 2 <= count < cut * 2
+            for counts in (top_counts, bottom_counts)
+            for count in counts.values()
+            if count >= 2
+        )
+        if borderline:
+            sampled = set(pages)
+            extra = [
+                page_no
+                for page_no in stratified_sample_pages(doc.page_count, NOISE_PROFILE_SAMPLE_PAGES, position=0.0)
+                if page_no not in sampled
+            ]
+            count_margin_noise_candidates(layouts, extra, top_counts, bottom_counts)
+            scanned += len(extra)
+
+    min_repeat = max(2, int(math.ceil(scanned * MARGIN_NOISE_MIN_SHARE)))
+    repeated_top = {text for text, count in top_counts.items() if count >= min_repeat and len(text) >= 4}
+    repeated_bottom = {text for text, count in bottom_counts.items() if count >= min_repeat and len(text) >= 4}
     return {"top": repeated_top, "bottom": repeated_bottom}
 
 
-def infer_toc_heading_positions(doc, outline):
+@timed_stage("toc_positions")
+def infer_toc_heading_positions(doc, outline, layouts: PageLayoutCache | None = None):
     if not outline:
         return outline
 
-    lines_by_page = {}
+    layouts = layouts or PageLayoutCache(doc)
 
     def page_lines(page_no: int):
-        if page_no in lines_by_page:
-            return lines_by_page[page_no]
-
-        page = doc.load_page(page_no - 1)
-        payload = page.get_text("dict")
         rows = []
-        for block in payload.get("blocks", []):
-            if block.get("type") != 0:
-                continue
-            for line in block.get("lines", []):
-                parts = []
-                for span in line.get("spans", []):
-                    text = clean_line(span.get("text", ""))
-                    if text:
-                        parts.append(text)
-                merged = clean_line(" ".join(parts))
-                if not merged:
-                    continue
-                y0 = float(line.get("bbox", [0, 0, 0, 0])[1])
-                rows.append(
-                    {
-                        "y0": y0,
-                        "text": merged,
-                        "norm": normalize_match_text(merged),
-                    }
-                )
+        for line in layouts.layout(page_no)["lines"]:
+            rows.append(
+                {
+                    "y0": line["y0"],
+                    "text": line["text"],
+                    "norm": normalize_match_text(line["text"]),
+                }
+            )
 
         rows.sort(key=lambda item: item["y0"])
-        lines_by_page[page_no] = rows
         return rows
 
+    def match_index(rows):
+        # The page's normalized lines joined by newlines, so one str.find scan
+        # finds every line containing a title. A line inside a title keeps its
+        # interior words whole, so longer lines are also keyed by second word.
+        norms = [row["norm"] for row in rows]
+        starts = []
+        offset = 1
+        for norm in norms:
+            starts.append(offset)
+            offset += len(norm) + 1
+        by_second_word = {}
+        short_rows = []
+        for pos, norm in enumerate(norms):
+            if len(norm) < 8:
+                continue
+            words = norm.split(" ", 2)
+            if len(words) == 3:
+                by_second_word.setdefault(words[1], []).append(pos)
+            else:
+                short_rows.append(pos)
+        return "\n" + "\n".join(norms) + "\n", starts, by_second_word, short_rows
+
+    def matching_rows(rows, index, title_norm: str):
+        text, starts, by_second_word, short_rows = index
+        positions = set()
+        # Lines containing the title (or equal to it, for short titles).
+        needle = title_norm if len(title_norm) >= 6 else f"\n{title_norm}\n"
+        at = text.find(needle)
+        while at != -1:
+            pos = bisect.bisect_right(starts, at + 1) - 1
+            positions.add(pos)
+            at = text.find(needle, starts[pos] + len(rows[pos]["norm"]))
+        if len(title_norm) >= 8:
+            # Lines contained in the title.
+            for word in set(title_norm.split(" ")):
+                positions.update(pos for pos in by_second_word.get(word, ()) if rows[pos]["norm"] in title_norm)
+            positions.update(pos for pos in short_rows if rows[pos]["norm"] in title_norm)
+        return [rows[pos] for pos in sorted(positions)]
+
     grouped = {}
     for idx, entry in enumerate(outline):
         page_no = int(entry.get("page_start") or 1)
@@ -266,6 +858,9 @@ def infer_toc_heading_positions(doc, outline):
         rows = page_lines(page_no)
         if not rows:
             continue
+        # Pages with only a few titles to place are cheaper to scan directly.
+        pending = sum(1 for idx in indices if outline[idx].get("y0") is None)
+        index = match_index(rows) if pending >= TOC_MATCH_INDEX_MIN_TITLES else None
 
         last_y = -1e9
         for idx in indices:
@@ -279,7 +874,7 @@ def infer_toc_heading_positions(doc, outline):
                 continue
 
             candidates = []
-            for row in rows:
+            for row in matching_rows(rows, index, title_norm) if index else rows:
                 row_norm = row["norm"]
                 if not row_norm:
                     continue
@@ -307,60 +902,50 @@ def infer_toc_heading_positions(doc, outline):
     return outline
 
 
-def build_outline_heuristic(doc):
-    spans = []
+@timed_stage("outline_heuristic")
+def build_outline_heuristic(doc, layouts: PageLayoutCache | None = None):
+    layouts = layouts or PageLayoutCache(doc)
+    # One pass: font sizes go into a histogram, and only lines that pass the
+    # size-independent heading filters are kept, as compact tuples.
+    size_counts = {}
+    possible = []
     for page_index in range(doc.page_count):
-        page = doc.load_page(page_index)
-        payload = page.get_text("dict")
-        for block in payload.get("blocks", []):
-            if block.get("type") != 0:
+        page_no = page_index + 1
+        if page_index % PROGRESS_PAGE_INTERVAL == 0:
+            report_progress(
+                f"Detecting headings: page {page_no}/{doc.page_count}",
+                stage="outline",
+                pages_done=page_index,
+                pages_total=doc.page_count,
+            )
+        for line in layouts.layout(page_no)["lines"]:
+            size = line["size"]
+            if size > 0:
+                size_counts[size] = size_counts.get(size, 0) + 1
+            text = line["text"]
+            if len(text) < 4 or len(text) > 120:
                 continue
-            for line in block.get("lines", []):
-                parts = []
-                font_size = 0.0
-                for span in line.get("spans", []):
-                    text = clean_line(span.get("text", ""))
-                    if not text:
-                        continue
-                    parts.append(text)
-                    font_size = max(font_size, float(span.get("size", 0.0)))
-                merged = clean_line(" ".join(parts))
-                if merged:
-                    spans.append(
-                        {
-                            "page_start": page_index + 1,
-                            "text": merged,
-                            "size": font_size,
-                            "y0": float(line.get("bbox", [0, 0, 0, 0])[1]),
-                        }
-                    )
-
-    if not spans:
-        return []
+            if text.startswith(("â€¢", "-", "*")):
+                continue
+            if text.endswith(".") and len(text.split()) > 8:
+                continue
+            possible.append((page_no, text, size, line["y0"]))
 
-    all_sizes = [s["size"] for s in spans if s["size"] > 0]
-    if not all_sizes:
+    if not size_counts:
         return []
 
-    cutoff = max(percentile(all_sizes, 0.75), percentile(all_sizes, 0.5) + 1.0)
+    cutoff = max(histogram_percentile(size_counts, 0.75), histogram_percentile(size_counts, 0.5) + 1.0)
 
     candidates = []
     seen = set()
-    for row in spans:
-        text = row["text"]
-        if len(text) < 4 or len(text) > 120:
-            continue
-        if text.startswith(("â€¢", "-", "*")):
-            continue
-        if row["size"] < cutoff:
-            continue
-        if text.endswith(".") and len(text.split()) > 8:
+    for page_no, text, size, y0 in possible:
+        if size < cutoff:
             continue
         key = text.lower()
         if key in seen:
             continue
         seen.add(key)
-        candidates.append(row)
+        candidates.append({"page_start": page_no, "text": text, "size": size, "y0": y0})
 
     if not candidates:
         return []
@@ -440,65 +1025,317 @@ def build_outline_heuristic(doc):
     return outline
 
 
-def improve_readability(text: str) -> str:
-    out = repair_mojibake(text)
-    out = re.sub(r"(?im)^\W*extract\s+\d+\s*", "", out)
-    out = re.sub(r"(?im)^[-*\u2022]\s*", "- ", out)
-    # Plain inline marker: "Parents 1 play ..." -> "Parents <sup>1</sup> play ..."
-    out = re.sub(r"(?<=\w)\s(\d{1,3})(?=\s+[a-z])", r" <sup>\1</sup>", out)
-    # Footnote markers at the beginning of a line: "1 The word..." -> "<sup>1</sup> The word..."
-    # Avoid converting table-like rows such as "19 | Header ...".
-    out = re.sub(r"(?m)^(\d{1,3})\s+(?!\|)", r"<sup>\1</sup> ", out)
-    # Inline footnote markers attached to punctuation: "...strategies;6 " -> "...strategies;<sup>6</sup> "
-    out = re.sub(r"([;:,\.\)])(\d{1,3})(?=\s)", r"\1<sup>\2</sup>", out)
-    out = re.sub(r"\n{3,}", "\n\n", out)
+# Kinds of Block in a section body.
+BLOCK_PARAGRAPH = "paragraph"
+BLOCK_BULLET = "bullet"
+BLOCK_TABLE = "table"
+BLOCK_FOOTNOTE = "footnote"
+
+# Patterns of the section body passes, compiled once since they run per block.
+# The *_TAIL_RE and *_HEAD_RE ones spot blocks where a match of the pattern
+# before them would run on across a blank line into the neighbouring block.
+FOOTNOTE_DEFINITION_RE = re.compile(r"\s*<sup>(\d{1,3})</sup>\s+")
+LIST_ITEM_RE = re.compile(r"(?:[•\-*]|\d+\.)\s")
+EXTRACT_LABEL_RE = re.compile(r"(?im)^\W*extract\s+\d+\s*")
+BULLET_PREFIX_RE = re.compile(r"(?im)^[-*\u2022]\s*")
+BULLET_ONLY_TAIL_RE = re.compile(r"(?m)^[-*\u2022]\s*\Z")
+INLINE_MARKER_RE = re.compile(r"(?<=\w)\s(\d{1,3})(?=\s+[a-z])")
+LINE_START_MARKER_RE = re.compile(r"(?m)^(\d{1,3})\s+(?!\|)")
+NUMBER_ONLY_TAIL_RE = re.compile(r"(?m)^\d{1,3}\s*\Z")
+PUNCTUATION_MARKER_RE = re.compile(r"([;:,\.\)])(\d{1,3})(?=\s)")
+BLANK_RUN_RE = re.compile(r"\n{3,}")
+DIGIT_RE = re.compile(r"\d")
+FOOTNOTE_BREAK_RE = re.compile(r"(?m)(<sup>\d{1,3}</sup>[^\n]*)\n([a-z])")
+DOT_LEADER_ROW_RE = re.compile(r"^\s*(.+?)\s*(?:\.{3,}|(?:\.\s*){3,})\s*(?:<sup>)?(\d{1,3})(?:</sup>)?\s*$")
+DOT_LEADER_LINE_RE = re.compile(r"(?m)^\s*(.+?)\s*(?:\.{3,}|(?:\.\s*){3,})\s*(?:<sup>)?(\d{1,3})(?:</sup>)?\s*$")
+STRAND_LINE_RE = re.compile(r"^\s*(?:[-*]\s+)?([A-Z]\.\s+.+?)\s*(?:\u2022)?\s*$")
+TABLE_HEADER_NOISE_RE = re.compile(
+    r"(?im)(?:^|\n\n)Categories\s*\n\s*Level\s*1\s*\n\s*Level\s*2\s*\n\s*Level\s*3\s*\n\s*Level\s*4\s*(?=\n\n|\n\||$)"
+)
+ACHIEVEMENT_HEADER_LINE = "| Categories | Level 1 | Level 2 | Level 3 | Level 4 |"
+ACHIEVEMENT_SEPARATOR_LINE = "|---|---|---|---|---|"
+TABLE_ROW_FOOTNOTE_RE = re.compile(r"(?m)^<sup>\d{1,3}</sup>\s+(?=\|)")
+FOOTNOTE_ONLY_TAIL_RE = re.compile(r"(?m)^<sup>\d{1,3}</sup>\s*\Z")
+TABLE_ROW_TRAILING_TEXT_RE = re.compile(r"(?m)^(\|.*\|)[ \t]+([^|]+)$")
+TABLE_ROW_OPEN_TAIL_RE = re.compile(r"(?m)^\|.*\|[ \t]+\Z")
+BULLET_GLYPH_RE = re.compile(r"\s*•\s*")
+INLINE_SPACE_RUN_RE = re.compile(r"[ \t]{2,}")
+SUP_TAG_RE = re.compile(r"</?sup>")
+TABLE_ROW_NUMBER_RE = re.compile(r"(?m)^\s*\d{1,3}\s+(?=\|)")
+TABLE_ROW_NUMBER_HEAD_RE = re.compile(r"\s*\d{1,3}\s+(?=\|)")
+NUMBER_ONLY_LINE_TAIL_RE = re.compile(r"(?m)^\s*\d{1,3}\s*\Z")
+FOOTNOTE_MARKER_RE = re.compile(r"<sup>(\d{1,3})</sup>")
+FOOTNOTE_DEFINITION_LINE_RE = re.compile(r"(?m)^\s*<sup>(\d{1,3})</sup>\s+")
+
+
+class Block(NamedTuple):
+    """One paragraph, list item, markdown table or footnote definition of a section body.
+
+    A body's markdown is its blocks joined by blank lines, and a block list is
+    always that markdown split on blank lines, so no block holds one. `kind` is
+    derived from the text. `page` (1-based) and `bbox` (x0, y0, x1, y1) locate
+    the block in the PDF; text that a pass splits off or merges in keeps the
+    geometry of the block it came from.
+    """
+
+    kind: str
+    text: str
+    page: int = 0
+    bbox: tuple | None = None
+
+
+def block_kind(text: str) -> str:
+    if text.startswith("|"):
+        return BLOCK_TABLE
+    if FOOTNOTE_DEFINITION_RE.match(text):
+        return BLOCK_FOOTNOTE
+    if LIST_ITEM_RE.match(text):
+        return BLOCK_BULLET
+    return BLOCK_PARAGRAPH
+
+
+def make_block(text: str, like: Block | None = None) -> Block:
+    if like is None:
+        return Block(block_kind(text), text)
+    return Block(block_kind(text), text, like.page, like.bbox)
+
+
+def no_text_blocks(like: Block | None = None) -> list[Block]:
+    return [make_block("(No extractable text in this range.)", like)]
+
+
+def blocks_to_markdown(blocks: list[Block]) -> str:
+    return "\n\n".join(block.text for block in blocks)
+
+
+def retext_block(block: Block, text: str) -> list[Block]:
+    """Give `block` new text, splitting it wherever the text now has blank lines."""
+    if text == block.text:
+        return [block]
+    if "\n\n" not in text:
+        return [make_block(text, block)]
+    return [make_block(part, block) for part in text.split("\n\n")]
+
+
+def reblock(text: str, source: list[Block]) -> list[Block]:
+    """Split rewritten markdown into blocks, reusing `source` blocks that are unchanged.
+
+    New blocks take the geometry of the last unchanged block before them.
+    """
+    unchanged = {}
+    for block in source:
+        unchanged.setdefault(block.text, []).append(block)
+    out = []
+    like = source[0] if source else None
+    for part in text.split("\n\n"):
+        same = unchanged.get(part)
+        if same:
+            like = same.pop(0)
+            out.append(like)
+        else:
+            out.append(make_block(part, like))
     return out
 
-def attach_missing_footnote_markers(text: str) -> str:
-    paragraphs = [p for p in text.split("\n\n") if p.strip()]
-    if len(paragraphs) < 2:
+
+def canonical_blocks(blocks: list[Block]) -> list[Block]:
+    # A block ending in a newline would join to its successor with an extra
+    # blank line; splitting the markdown again would start the successor with it.
+    if all(not block.text.endswith("\n") for block in blocks[:-1]):
+        return blocks
+    return reblock(blocks_to_markdown(blocks), blocks)
+
+
+def map_block_text(blocks: list[Block], rewrite) -> list[Block]:
+    """Apply a rewrite that cannot reach across blank lines to every block's text."""
+    out = None
+    for idx, block in enumerate(blocks):
+        text = rewrite(block.text)
+        if text != block.text:
+            if out is None:
+                out = blocks[:idx]
+            out.extend(retext_block(block, text))
+        elif out is not None:
+            out.append(block)
+    return blocks if out is None else canonical_blocks(out)
+
+
+def rewrite_markdown(blocks: list[Block], rewrite) -> list[Block]:
+    """Apply a rewrite to the serialized markdown when it can reach across blocks."""
+    text = blocks_to_markdown(blocks)
+    out = rewrite(text)
+    if out == text:
+        return blocks
+    return reblock(out, blocks)
+
+
+def next_visible_char(blocks: list[Block], idx: int) -> str:
+    """First non-whitespace character after block `idx`, or "" at the end of the body."""
+    for block in blocks[idx + 1 :]:
+        text = block.text.lstrip()
+        if text:
+            return text[0]
+    return ""
+
+
+def collapse_blank_runs(blocks: list[Block]) -> list[Block]:
+    # Three or more newlines only appear where a block is empty or starts with one.
+    if len(blocks) > 1 and any(not block.text or block.text[0] == "\n" for block in blocks):
+        return rewrite_markdown(blocks, lambda text: BLANK_RUN_RE.sub("\n\n", text))
+    return blocks
+
+
+def strip_block_edges(blocks: list[Block]) -> list[Block]:
+    # The whole-body strip() of blocks whose first and last hold visible text.
+    if len(blocks) == 1:
+        return retext_block(blocks[0], blocks[0].text.strip())
+    head = blocks[0].text.lstrip()
+    tail = blocks[-1].text.rstrip()
+    if head == blocks[0].text and tail == blocks[-1].text:
+        return blocks
+    return canonical_blocks([make_block(head, blocks[0]), *blocks[1:-1], make_block(tail, blocks[-1])])
+
+
+def strip_body_blocks(blocks: list[Block]) -> list[Block]:
+    """Collapse runs of blank lines and strip the body, as the markdown passes did."""
+    blocks = collapse_blank_runs(blocks)
+    lo = 0
+    hi = len(blocks)
+    while lo < hi and not blocks[lo].text.strip():
+        lo += 1
+    while hi > lo and not blocks[hi - 1].text.strip():
+        hi -= 1
+    if lo == hi:
+        return [make_block("", blocks[0] if blocks else None)]
+    return strip_block_edges(blocks[lo:hi])
+
+
+def is_empty_body(blocks: list[Block]) -> bool:
+    return len(blocks) == 1 and not blocks[0].text
+
+
+def drop_final_newline(blocks: list[Block]) -> list[Block]:
+    # Line-based passes rebuild the body with "\n".join(body.splitlines()), which
+    # loses one trailing newline.
+    if not blocks or len(blocks) == 1 and not blocks[0].text:
+        return blocks
+    last = blocks[-1]
+    if not last.text:
+        prev = blocks[-2]
+        return [*blocks[:-2], make_block(prev.text + "\n", prev)]
+    if last.text.endswith("\n"):
+        return [*blocks[:-1], make_block(last.text[:-1], last)]
+    return blocks
+
+
+def has_extract_label(text: str) -> bool:
+    return "extract" in text.casefold() and EXTRACT_LABEL_RE.search(text) is not None
+
+
+def improve_readability(blocks: list[Block]) -> list[Block]:
+    blocks = map_block_text(blocks, repair_mojibake)
+    if any(has_extract_label(block.text) for block in blocks):
+        blocks = rewrite_markdown(blocks, lambda text: EXTRACT_LABEL_RE.sub("", text))
+
+    def mark_bullets(text: str) -> str:
+        if text.startswith(("-", "*", "\u2022")) or "\n" in text:
+            return BULLET_PREFIX_RE.sub("- ", text)
         return text
 
-    for idx in range(1, len(paragraphs)):
-        match = re.match(r"^\s*<sup>(\d{1,3})</sup>\s+", paragraphs[idx])
-        if not match:
-            continue
-        num = match.group(1)
-        prev = paragraphs[idx - 1]
-        if f"<sup>{num}</sup>" in prev:
+    # A line holding only a bullet glyph absorbs the blank line after it.
+    if any(
+        block.text.rstrip().endswith(("-", "*", "\u2022")) and BULLET_ONLY_TAIL_RE.search(block.text)
+        for block in blocks[:-1]
+    ):
+        blocks = rewrite_markdown(blocks, lambda text: BULLET_PREFIX_RE.sub("- ", text))
+    else:
+        blocks = map_block_text(blocks, mark_bullets)
+
+    # Plain inline marker: "Parents 1 play ..." -> "Parents <sup>1</sup> play ..."
+    # A marker ending a block is followed by whatever the next block starts with.
+    last = len(blocks) - 1
+    out = []
+    for idx, block in enumerate(blocks):
+        text = block.text
+        if not DIGIT_RE.search(text):
+            out.append(block)
             continue
-        paragraphs[idx - 1] = prev.rstrip() + f" <sup>{num}</sup>"
+        if idx < last and text.rstrip()[-1:].isdigit():
+            follow = "\n" + next_visible_char(blocks, idx)
+            text = INLINE_MARKER_RE.sub(r" <sup>\1</sup>", text + follow)[: -len(follow)]
+        else:
+            text = INLINE_MARKER_RE.sub(r" <sup>\1</sup>", text)
+        out.extend(retext_block(block, text))
+    blocks = out
+
+    def mark_line_starts(text: str) -> str:
+        if text[:1].isdigit() or "\n" in text:
+            return LINE_START_MARKER_RE.sub(r"<sup>\1</sup> ", text)
+        return text
+
+    # Footnote markers at the beginning of a line: "1 The word..." -> "<sup>1</sup> The word..."
+    # Avoid converting table-like rows such as "19 | Header ...".
+    if any(
+        block.text.rstrip()[-1:].isdigit() and NUMBER_ONLY_TAIL_RE.search(block.text)
+        for block in blocks[:-1]
+    ):
+        blocks = rewrite_markdown(blocks, lambda text: LINE_START_MARKER_RE.sub(r"<sup>\1</sup> ", text))
+    else:
+        blocks = map_block_text(blocks, mark_line_starts)
 
-    return "\n\n".join(paragraphs)
+    # Inline footnote markers attached to punctuation: "...strategies;6 " -> "...strategies;<sup>6</sup> "
+    last = len(blocks) - 1
+    out = []
+    for idx, block in enumerate(blocks):
+        text = block.text
+        if not DIGIT_RE.search(text):
+            out.append(block)
+            continue
+        if idx < last and text[-1:].isdigit():
+            text = PUNCTUATION_MARKER_RE.sub(r"\1<sup>\2</sup>", text + "\n")[:-1]
+        else:
+            text = PUNCTUATION_MARKER_RE.sub(r"\1<sup>\2</sup>", text)
+        out.extend(retext_block(block, text))
+    return collapse_blank_runs(out)
 
 
-def normalize_footnote_block_breaks(text: str) -> str:
+def normalize_footnote_block_breaks(blocks: list[Block]) -> list[Block]:
     # If a footnote definition line is followed by a lowercase continuation on the next line,
     # split it into separate paragraphs so reordering and stitching can handle it.
-    return re.sub(r"(?m)(<sup>\d{1,3}</sup>[^\n]*)\n([a-z])", r"\1\n\n\2", text)
+    return map_block_text(
+        blocks,
+        lambda text: FOOTNOTE_BREAK_RE.sub(r"\1\n\n\2", text) if "<sup>" in text and "\n" in text else text,
+    )
 
 
-def move_footnote_definitions_to_end(text: str) -> str:
-    paragraphs = [p for p in text.split("\n\n") if p.strip()]
-    if not paragraphs:
-        return text
+def attach_paragraph_footnote_markers(paragraphs: list[Block]) -> None:
+    for idx in range(1, len(paragraphs)):
+        if paragraphs[idx].kind != BLOCK_FOOTNOTE:
+            continue
+        num = FOOTNOTE_DEFINITION_RE.match(paragraphs[idx].text).group(1)
+        prev = paragraphs[idx - 1]
+        if f"<sup>{num}</sup>" in prev.text:
+            continue
+        paragraphs[idx - 1] = make_block(prev.text.rstrip() + f" <sup>{num}</sup>", prev)
 
-    footnote_pat = re.compile(r"^\s*<sup>\d{1,3}</sup>\s+")
-    body = [p for p in paragraphs if not footnote_pat.match(p)]
-    footnotes = [p for p in paragraphs if footnote_pat.match(p)]
 
-    combined = body + footnotes
-    return "\n\n".join(combined)
+def arrange_footnote_paragraphs(blocks: list[Block]) -> list[Block]:
+    # Attaches missing markers, moves footnote definitions to the end and stitches
+    # orphaned continuations back on, sharing one list of visible paragraphs.
+    paragraphs = [block for block in blocks if block.text.strip()]
+    if not paragraphs:
+        return blocks
+
+    attach_paragraph_footnote_markers(paragraphs)
+    paragraphs = [block for block in paragraphs if block.kind != BLOCK_FOOTNOTE] + [
+        block for block in paragraphs if block.kind == BLOCK_FOOTNOTE
+    ]
+    stitch_orphan_paragraphs(paragraphs)
+    return canonical_blocks(paragraphs)
 
 
-def format_dot_leader_blocks(text: str) -> str:
-    lines = text.splitlines()
+def format_dot_leader_lines(lines: list[str]) -> list[str]:
     out = []
     i = 0
-    item_re = re.compile(
-        r"^\s*(.+?)\s*(?:\.{3,}|(?:\.\s*){3,})\s*(?:<sup>)?(\d{1,3})(?:</sup>)?\s*$"
-    )
-
     while i < len(lines):
         j = i
         rows = []
@@ -510,7 +1347,8 @@ def format_dot_leader_blocks(text: str) -> str:
                     j += 1
                     continue
                 break
-            m = item_re.match(line)
+            # A dot leader needs at least three dots; skip the regex otherwise.
+            m = DOT_LEADER_ROW_RE.match(line) if line.count(".") >= 3 else None
             if not m:
                 break
             consumed_any = True
@@ -529,8 +1367,32 @@ def format_dot_leader_blocks(text: str) -> str:
 
         out.append(lines[i])
         i += 1
+    return out
 
-    return "\n".join(out)
+
+def format_dot_leader_blocks(blocks: list[Block]) -> list[Block]:
+    blocks = drop_final_newline(blocks)
+    rows = [
+        idx
+        for idx, block in enumerate(blocks)
+        if block.text.count(".") >= 3 and DOT_LEADER_LINE_RE.search(block.text)
+    ]
+    if not rows:
+        return blocks
+    # Only the blocks from the first possible row up to the first visible text
+    # after the last one can change: a run of rows swallows the blank lines after it.
+    start = rows[0]
+    stop = rows[-1] + 1
+    while stop < len(blocks):
+        stop += 1
+        if blocks[stop - 1].text.strip():
+            break
+    window = blocks[start:stop]
+    text = blocks_to_markdown(window)
+    out = "\n".join(format_dot_leader_lines(text.split("\n")))
+    if out == text:
+        return blocks
+    return canonical_blocks([*blocks[:start], *reblock(out, window), *blocks[stop:]])
 
 
 def parse_course_rows_from_flat(flat: str) -> list[dict]:
@@ -598,7 +1460,7 @@ def parse_course_rows_from_flat(flat: str) -> list[dict]:
     return rows
 
 
-def format_course_table_blocks(text: str) -> str:
+def format_course_table_markdown(text: str) -> str:
     if "Course Name" not in text or "Course Type" not in text or "Course Code" not in text:
         return text
 
@@ -637,68 +1499,64 @@ def format_course_table_blocks(text: str) -> str:
     return replaced
 
 
-def fix_as_follows_bullet_lists(text: str) -> str:
-    lines = text.splitlines()
-    out = []
-    i = 0
-    strand_line_re = re.compile(r"^\s*(?:[-*]\s+)?([A-Z]\.\s+.+?)\s*(?:\u2022)?\s*$")
-
-    while i < len(lines):
-        out.append(lines[i])
-        trigger = lines[i].strip().lower().endswith("as follows:")
-        i += 1
-        if not trigger:
-            continue
-
-        while i < len(lines):
-            raw = lines[i]
-            stripped = raw.strip()
-
-            if not stripped:
-                out.append(raw)
-                i += 1
-                continue
-
-            # Stop at headings or table rows.
-            if stripped.startswith("#") or stripped.startswith("|"):
-                break
+def format_course_table_blocks(blocks: list[Block]) -> list[Block]:
+    # The course header spans several paragraphs, so this pass works on markdown.
+    for label in ("Course Name", "Course Type", "Course Code"):
+        if not any(label in block.text for block in blocks):
+            return blocks
+    return rewrite_markdown(blocks, format_course_table_markdown)
 
-            match = strand_line_re.match(raw)
-            if not match:
-                break
 
-            item = clean_line(match.group(1))
-            out.append(f"- {item}")
-            i += 1
+def fix_as_follows_bullet_lists(blocks: list[Block]) -> list[Block]:
+    blocks = drop_final_newline(blocks)
+    if not any("as follows:" in block.text.lower() for block in blocks):
+        return blocks
 
-    return "\n".join(out)
+    out = []
+    # The blank line between two blocks keeps a list going, so the state
+    # carries over from one block to the next.
+    in_list = False
+    for block in blocks:
+        if not in_list and "as follows:" not in block.text.lower():
+            out.append(block)
+            continue
+        lines = []
+        for raw in block.text.split("\n"):
+            if in_list:
+                stripped = raw.strip()
+                if not stripped:
+                    lines.append(raw)
+                    continue
+                # Stop at headings or table rows.
+                match = None
+                if not (stripped.startswith("#") or stripped.startswith("|")):
+                    match = STRAND_LINE_RE.match(raw)
+                if match:
+                    lines.append(f"- {clean_line(match.group(1))}")
+                    continue
+            lines.append(raw)
+            in_list = raw.strip().lower().endswith("as follows:")
+        out.extend(retext_block(block, "\n".join(lines)))
+    return out
 
 
-def remove_redundant_table_header_lines(text: str) -> str:
-    if "|" not in text:
-        return text
+def remove_redundant_table_header_lines(blocks: list[Block]) -> list[Block]:
+    if not any("|" in block.text for block in blocks):
+        return blocks
     # Remove standalone table-header labels that were extracted as plain text
     # above/between table blocks.
-    noise_re = re.compile(
-        r"(?im)(?:^|\n\n)Categories\s*\n\s*Level\s*1\s*\n\s*Level\s*2\s*\n\s*Level\s*3\s*\n\s*Level\s*4\s*(?=\n\n|\n\||$)"
-    )
-    cleaned = noise_re.sub("\n\n", text)
-    return re.sub(r"\n{3,}", "\n\n", cleaned).strip()
+    if any("categories" in block.text.casefold() for block in blocks):
+        blocks = rewrite_markdown(blocks, lambda text: TABLE_HEADER_NOISE_RE.sub("\n\n", text))
+    return strip_body_blocks(blocks)
 
 
-def remove_duplicate_markdown_table_headers(text: str) -> str:
-    lines = text.splitlines()
-    if not lines:
-        return text
-
-    header_line = "| Categories | Level 1 | Level 2 | Level 3 | Level 4 |"
-    sep_line = "|---|---|---|---|---|"
+def remove_duplicate_table_header_lines(lines: list[str]) -> list[str]:
     out = []
     i = 0
     while i < len(lines):
         line = lines[i].strip()
         next_line = lines[i + 1].strip() if i + 1 < len(lines) else ""
-        if line == header_line and next_line == sep_line:
+        if line == ACHIEVEMENT_HEADER_LINE and next_line == ACHIEVEMENT_SEPARATOR_LINE:
             # Only drop header blocks that are duplicated inside an existing table.
             # Keep headers that start a new table section after non-table text.
             prev_nonempty = ""
@@ -721,26 +1579,47 @@ def remove_duplicate_markdown_table_headers(text: str) -> str:
                 continue
         out.append(lines[i])
         i += 1
+    return out
 
-    return "\n".join(out)
+
+def remove_duplicate_markdown_table_headers(blocks: list[Block]) -> list[Block]:
+    blocks = drop_final_newline(blocks)
+    if not any(ACHIEVEMENT_HEADER_LINE in block.text for block in blocks):
+        return blocks
+    # Whether a header is a duplicate depends on the rows around it, across blocks.
+    return rewrite_markdown(blocks, lambda text: "\n".join(remove_duplicate_table_header_lines(text.split("\n"))))
 
 
-def strip_footnote_prefix_from_table_rows(text: str) -> str:
+def strip_footnote_prefix_from_table_rows(blocks: list[Block]) -> list[Block]:
     # Footnote markers sometimes bleed into the first table row as:
     # "<sup>19</sup> | ...", which breaks markdown table parsing.
-    return re.sub(r"(?m)^<sup>\d{1,3}</sup>\s+(?=\|)", "", text)
-
-
-def strip_inline_sup_markers(text: str) -> str:
-    out = re.sub(r"</?sup>", "", text)
-    out = re.sub(r"(?m)^\s*\d{1,3}\s+(?=\|)", "", out)
-    return out
+    if any("<sup>" in block.text and FOOTNOTE_ONLY_TAIL_RE.search(block.text) for block in blocks[:-1]):
+        return rewrite_markdown(blocks, lambda text: TABLE_ROW_FOOTNOTE_RE.sub("", text))
+    return map_block_text(blocks, lambda text: TABLE_ROW_FOOTNOTE_RE.sub("", text) if "<sup>" in text else text)
+
+
+def strip_inline_sup_markers(blocks: list[Block]) -> list[Block]:
+    blocks = map_block_text(blocks, lambda text: SUP_TAG_RE.sub("", text) if "sup>" in text else text)
+    last = len(blocks) - 1
+    # A row number at the edge of a block reaches across the blank line to its row.
+    spans_blocks = any(
+        (idx > 0 and "|" in block.text and TABLE_ROW_NUMBER_HEAD_RE.match(block.text))
+        or (
+            idx < last
+            and block.text.rstrip()[-1:].isdigit()
+            and NUMBER_ONLY_LINE_TAIL_RE.search(block.text)
+            and next_visible_char(blocks, idx) == "|"
+        )
+        for idx, block in enumerate(blocks)
+    )
+    if spans_blocks:
+        return rewrite_markdown(blocks, lambda text: TABLE_ROW_NUMBER_RE.sub("", text))
+    return map_block_text(blocks, lambda text: TABLE_ROW_NUMBER_RE.sub("", text) if "|" in text else text)
 
 
-def split_inline_bullet_runs(text: str) -> str:
-    lines = text.splitlines()
+def split_bullet_run_lines(text: str) -> str:
     out = []
-    for raw in lines:
+    for raw in text.split("\n"):
         line = raw.strip()
         if (
             not line
@@ -759,7 +1638,7 @@ def split_inline_bullet_runs(text: str) -> str:
             out.append(raw)
             continue
 
-        parts = [clean_line(p) for p in re.split(r"\s*•\s*", working) if clean_line(p)]
+        parts = [clean_line(p) for p in BULLET_GLYPH_RE.split(working) if clean_line(p)]
         if len(parts) < 2:
             out.append(raw)
             continue
@@ -767,61 +1646,176 @@ def split_inline_bullet_runs(text: str) -> str:
     return "\n".join(out)
 
 
-def strip_remaining_bullet_glyphs(text: str) -> str:
-    out = re.sub(r"\s*•\s*", " ", text)
-    out = re.sub(r"[ \t]{2,}", " ", out)
-    return out
+def split_inline_bullet_runs(blocks: list[Block]) -> list[Block]:
+    blocks = drop_final_newline(blocks)
+    return map_block_text(blocks, lambda text: split_bullet_run_lines(text) if "•" in text else text)
+
+
+def strip_remaining_bullet_glyphs(blocks: list[Block]) -> list[Block]:
+    if any("•" in block.text for block in blocks):
+        last = len(blocks) - 1
+        # A glyph at the edge of a block swallows the blank line next to it.
+        spans_blocks = any(
+            (idx > 0 and block.text.lstrip().startswith("•"))
+            or (idx < last and block.text.rstrip().endswith("•"))
+            for idx, block in enumerate(blocks)
+        )
+        if spans_blocks:
+            blocks = rewrite_markdown(blocks, lambda text: BULLET_GLYPH_RE.sub(" ", text) if "•" in text else text)
+        else:
+            blocks = map_block_text(blocks, lambda text: BULLET_GLYPH_RE.sub(" ", text) if "•" in text else text)
+    return map_block_text(
+        blocks,
+        lambda text: INLINE_SPACE_RUN_RE.sub(" ", text) if "  " in text or "\t" in text else text,
+    )
 
 
-def detach_trailing_text_from_table_rows(text: str) -> str:
+def detach_trailing_text_from_table_rows(blocks: list[Block]) -> list[Block]:
     # Some PDFs bleed prose into the end of a markdown table row.
     # Split the trailing prose back into a regular paragraph.
-    return re.sub(r"(?m)^(\|.*\|)[ \t]+([^|]+)$", r"\1\n\n\2", text)
+    if any("|" in block.text and TABLE_ROW_OPEN_TAIL_RE.search(block.text) for block in blocks[:-1]):
+        # A row ending in bare spaces takes the next block as its trailing text.
+        return rewrite_markdown(blocks, lambda text: TABLE_ROW_TRAILING_TEXT_RE.sub(r"\1\n\n\2", text))
+    return map_block_text(
+        blocks,
+        lambda text: TABLE_ROW_TRAILING_TEXT_RE.sub(r"\1\n\n\2", text) if "|" in text else text,
+    )
+
+
+class NearDuplicateIndex:
+    """Remembers kept paragraphs and finds earlier ones within DEDUPE_SIMILARITY.
+
+    Each paragraph gets a one-permutation MinHash signature over its character
+    shingles; paragraphs that agree on every value of one LSH band are compared.
+    A lookup touches only a few likely matches instead of every earlier paragraph,
+    and near-duplicates are found even when their opening words differ. Matches
+    are still confirmed with difflib's ratio.
+
+    Paragraphs are also bucketed by their first DEDUPE_PREFIX_WORDS words, and
+    the newest DEDUPE_PREFIX_LIMIT paragraphs in the same bucket are compared.
+    Near-threshold pairs often share too few shingles to meet in an LSH band;
+    these buckets still catch the ones that open the same way, nearby.
+    """
+
+    def __init__(self):
+        self._exact = set()
+        self._by_prefix = {}
+        self._kept = []
+        self._bands = {}
+
+    @staticmethod
+    def signature(norm: str) -> list[int]:
+        data = norm.encode("utf-8")
+        mins = [None] * DEDUPE_MINHASH_BINS
+        for start in range(max(1, len(data) - DEDUPE_SHINGLE_CHARS + 1)):
+            value = zlib.crc32(data[start : start + DEDUPE_SHINGLE_CHARS])
+            slot = value % DEDUPE_MINHASH_BINS
+            if mins[slot] is None or value < mins[slot]:
+                mins[slot] = value
+        # Short paragraphs leave bins empty; each borrows the next filled bin's
+        # value (wrapping around) so every band stays comparable.
+        carry = next(value for value in mins if value is not None)
+        for slot in range(DEDUPE_MINHASH_BINS - 1, -1, -1):
+            if mins[slot] is None:
+                mins[slot] = carry
+            else:
+                carry = mins[slot]
+        return mins
+
+    def keep(self, norm: str) -> bool:
+        """Return False for a near-duplicate of a kept paragraph; otherwise keep `norm`."""
+        if norm in self._exact:
+            return False
+        if len(norm) > DEDUPE_MAX_COMPARE_CHARS:
+            self._exact.add(norm)
+            return True
+        matcher = difflib.SequenceMatcher(None)
+        # difflib caches its analysis of the second sequence, so set it once.
+        matcher.set_seq2(norm)
+        prefix = " ".join(norm.split()[:DEDUPE_PREFIX_WORDS])
+        same_prefix = self._by_prefix.setdefault(prefix, [])
+        for prev in same_prefix:
+            if self._similar(matcher, prev):
+                return False
+        self._exact.add(norm)
+        same_prefix.append(norm)
+        if len(same_prefix) > DEDUPE_PREFIX_LIMIT:
+            del same_prefix[0]
+
+        sig = self.signature(norm)
+        band_keys = [
+            (start, *sig[start : start + DEDUPE_BAND_ROWS])
+            for start in range(0, DEDUPE_MINHASH_BINS, DEDUPE_BAND_ROWS)
+        ]
+        shared = {}
+        for key in band_keys:
+            for idx in self._bands.get(key, ()):
+                shared[idx] = shared.get(idx, 0) + 1
+        # Most shared bands first, then the most recently kept paragraph.
+        candidates = sorted(shared, key=lambda idx: (-shared[idx], -idx))
+        for idx in candidates[:DEDUPE_MAX_CANDIDATES]:
+            if self._similar(matcher, self._kept[idx]):
+                return False
+
+        idx = len(self._kept)
+        self._kept.append(norm)
+        for key in band_keys:
+            bucket = self._bands.setdefault(key, [])
+            bucket.append(idx)
+            if len(bucket) > DEDUPE_BUCKET_LIMIT:
+                del bucket[0]
+        return True
+
+    @staticmethod
+    def _similar(matcher: difflib.SequenceMatcher, prev: str) -> bool:
+        matcher.set_seq1(prev)
+        # The quick ratios are upper bounds on ratio(), so they only skip misses.
+        return (
+            matcher.real_quick_ratio() >= DEDUPE_SIMILARITY
+            and matcher.quick_ratio() >= DEDUPE_SIMILARITY
+            and matcher.ratio() >= DEDUPE_SIMILARITY
+        )
+
 
+def deduplicate_body_paragraphs(blocks: list[Block], index: NearDuplicateIndex | None = None) -> list[Block]:
+    """Drop repeated long paragraphs.
 
-def deduplicate_body_paragraphs(text: str) -> str:
-    paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
+    Pass a shared `index` to also drop paragraphs already kept in earlier sections.
+    """
+    paragraphs = []
+    for block in blocks:
+        text = block.text.strip()
+        if text:
+            paragraphs.append(block if text == block.text else make_block(text, block))
     if not paragraphs:
-        return text
+        return blocks
 
+    if index is None:
+        index = NearDuplicateIndex()
     kept = []
-    seen_exact = set()
-    seen_by_prefix = {}
 
-    def is_candidate(para: str) -> bool:
-        if para.startswith("|") or para.startswith("#"):
+    def is_candidate(block: Block) -> bool:
+        para = block.text
+        if block.kind == BLOCK_TABLE or para.startswith("#"):
             return False
         if para.startswith("- Level:") or para.startswith("- Pages:") or para.startswith("- Source:"):
             return False
         return len(para) >= 80 and len(para.split()) >= 12
 
-    for para in paragraphs:
-        norm = normalize_match_text(para)
+    for block in paragraphs:
+        norm = normalize_match_text(block.text)
         if not norm:
             continue
-        if not is_candidate(para):
-            kept.append(para)
-            continue
-
-        if norm in seen_exact:
-            continue
-
-        prefix = " ".join(norm.split()[:10])
-        near_dup = False
-        for prev in seen_by_prefix.get(prefix, []):
-            if difflib.SequenceMatcher(None, prev, norm).ratio() >= 0.94:
-                near_dup = True
-                break
-        if near_dup:
+        if not is_candidate(block):
+            kept.append(block)
             continue
 
-        seen_exact.add(norm)
-        seen_by_prefix.setdefault(prefix, []).append(norm)
-        kept.append(para)
+        if index.keep(norm):
+            kept.append(block)
 
     if not kept:
-        return "(No extractable text in this range.)"
-    return "\n\n".join(kept)
+        return no_text_blocks(paragraphs[0])
+    return kept
 
 
 def build_toc_markdown_table(rows: list[dict]) -> str:
@@ -845,95 +1839,132 @@ def build_toc_markdown_table(rows: list[dict]) -> str:
     return "\n".join(table)
 
 
-def stitch_orphan_continuations(text: str) -> str:
-    paragraphs = [p for p in text.split("\n\n") if p.strip()]
-    if len(paragraphs) < 2:
-        return text
+def stitch_orphan_paragraphs(paragraphs: list[Block]) -> None:
+    def ends_with_marker(block: Block) -> bool:
+        return block.text.rstrip().endswith("</sup>")
 
+    # Indexes below i of paragraphs ending with a footnote marker, nearest last.
+    marked = [0] if paragraphs and ends_with_marker(paragraphs[0]) else []
     i = 1
     while i < len(paragraphs):
-        p = paragraphs[i].lstrip()
+        p = paragraphs[i].text.lstrip()
         if p and p[0].islower():
-            merged = False
             # Prefer attaching to the nearest paragraph that ends with a footnote marker.
-            for j in range(i - 1, -1, -1):
-                if re.search(r"</sup>\s*$", paragraphs[j].rstrip()):
-                    paragraphs[j] = paragraphs[j].rstrip() + " " + p
-                    del paragraphs[i]
-                    merged = True
-                    break
-            if not merged and i > 0 and not re.search(r"[.!?]\s*$", paragraphs[i - 1].rstrip()):
-                paragraphs[i - 1] = paragraphs[i - 1].rstrip() + " " + p
+            if marked:
+                j = marked[-1]
+                paragraphs[j] = make_block(paragraphs[j].text.rstrip() + " " + p, paragraphs[j])
+                del paragraphs[i]
+                if not ends_with_marker(paragraphs[j]):
+                    marked.pop()
+                continue
+            prev = paragraphs[i - 1]
+            if not prev.text.rstrip().endswith((".", "!", "?")):
+                paragraphs[i - 1] = make_block(prev.text.rstrip() + " " + p, prev)
                 del paragraphs[i]
-                merged = True
-            if merged:
+                if ends_with_marker(paragraphs[i - 1]):
+                    marked.append(i - 1)
                 continue
+        if ends_with_marker(paragraphs[i]):
+            marked.append(i)
         i += 1
 
-    return "\n\n".join(paragraphs)
+
+def find_in_blocks(blocks: list[Block], needle: str) -> int:
+    """Offset of `needle` in the blocks' markdown, or -1."""
+    offset = 0
+    for block in blocks:
+        pos = block.text.find(needle)
+        if pos != -1:
+            return offset + pos
+        offset += len(block.text) + 2
+    return -1
+
+
+def has_footnote_definition(blocks: list[Block], num: str) -> bool:
+    definition_re = re.compile(rf"(?m)^\s*<sup>{re.escape(num)}</sup>\s+")
+    last = len(blocks) - 1
+    # The blank line after a block counts as the whitespace after a marker.
+    return any(
+        definition_re.search(block.text + "\n" if idx < last else block.text)
+        for idx, block in enumerate(blocks)
+        if "<sup>" in block.text
+    )
 
 
-def rebalance_cross_section_footnotes(sections: list[dict]) -> None:
-    footnote_def_re = re.compile(r"^\s*<sup>(\d{1,3})</sup>\s+")
+def footnote_definition_numbers(blocks: list[Block]) -> set[str]:
+    last = len(blocks) - 1
+    # A definition whose trailing whitespace runs into an indented block hides a
+    # definition opening that block; only the whole markdown shows which one.
+    if any(idx > 0 and block.text[:1].isspace() and "<sup>" in block.text for idx, block in enumerate(blocks)):
+        return set(FOOTNOTE_DEFINITION_LINE_RE.findall(blocks_to_markdown(blocks)))
+    found = set()
+    for idx, block in enumerate(blocks):
+        if "<sup>" in block.text:
+            found.update(FOOTNOTE_DEFINITION_LINE_RE.findall(block.text + "\n" if idx < last else block.text))
+    return found
+
 
+def rebalance_cross_section_footnotes(sections: list[dict]) -> None:
     for i in range(1, len(sections)):
-        prev_body = sections[i - 1]["body"]
-        curr_body = sections[i]["body"]
-        curr_paragraphs = [p for p in curr_body.split("\n\n") if p.strip()]
+        prev_blocks = sections[i - 1]["blocks"]
+        curr_paragraphs = [block for block in sections[i]["blocks"] if block.text.strip()]
         if not curr_paragraphs:
             continue
 
-        curr_defs = []
-        curr_nondefs = []
-        for p in curr_paragraphs:
-            m = footnote_def_re.match(p)
-            if m:
-                curr_defs.append((m.group(1), p))
-            else:
-                curr_nondefs.append(p)
-
+        curr_defs = [block for block in curr_paragraphs if block.kind == BLOCK_FOOTNOTE]
         if not curr_defs:
             continue
 
-        curr_nondef_text = "\n\n".join(curr_nondefs)
-        prev_paragraphs = [p for p in prev_body.split("\n\n") if p.strip()]
+        curr_nondefs = [block.text for block in curr_paragraphs if block.kind != BLOCK_FOOTNOTE]
+        prev_paragraphs = [block for block in prev_blocks if block.text.strip()]
         moved_any = False
 
-        for num, definition in curr_defs:
+        for definition in curr_defs:
+            num = FOOTNOTE_DEFINITION_RE.match(definition.text).group(1)
             marker = f"<sup>{num}</sup>"
-            prev_has_marker = marker in prev_body
-            prev_has_definition = re.search(rf"(?m)^\s*<sup>{re.escape(num)}</sup>\s+", prev_body) is not None
-            curr_uses_marker = marker in curr_nondef_text
-            prev_marker_pos = prev_body.find(marker)
-            prev_marker_early = prev_marker_pos != -1 and prev_marker_pos < 500
+            prev_marker_pos = find_in_blocks(prev_blocks, marker)
+            prev_has_marker = prev_marker_pos != -1
+            if not prev_has_marker:
+                continue
+            prev_has_definition = has_footnote_definition(prev_blocks, num)
+            curr_uses_marker = any(marker in text for text in curr_nondefs)
+            prev_marker_early = prev_marker_pos < 500
 
-            if prev_has_marker and not prev_has_definition and (not curr_uses_marker or prev_marker_early):
+            if not prev_has_definition and (not curr_uses_marker or prev_marker_early):
                 prev_paragraphs.append(definition)
-                curr_paragraphs = [p for p in curr_paragraphs if p != definition]
+                curr_paragraphs = [block for block in curr_paragraphs if block.text != definition.text]
                 moved_any = True
 
         if moved_any:
-            sections[i - 1]["body"] = "\n\n".join(prev_paragraphs).strip()
-            sections[i]["body"] = "\n\n".join(curr_paragraphs).strip() or "(No extractable text in this range.)"
+            sections[i - 1]["blocks"] = strip_block_edges(canonical_blocks(prev_paragraphs))
+            if curr_paragraphs:
+                sections[i]["blocks"] = strip_block_edges(canonical_blocks(curr_paragraphs))
+            else:
+                sections[i]["blocks"] = no_text_blocks(curr_defs[0])
 
 
 def remove_orphan_markers_after_rebalance(sections: list[dict]) -> None:
-    def_nums_re = re.compile(r"(?m)^\s*<sup>(\d{1,3})</sup>\s+")
-    marker_re = re.compile(r"<sup>(\d{1,3})</sup>")
-
     for i in range(1, len(sections)):
-        prev_body = sections[i - 1]["body"]
-        curr_body = sections[i]["body"]
-
-        prev_defs = set(def_nums_re.findall(prev_body))
-        curr_defs = set(def_nums_re.findall(curr_body))
-        curr_markers = set(marker_re.findall(curr_body))
-
-        orphan_nums = [n for n in curr_markers if n not in curr_defs and n in prev_defs]
-        for num in orphan_nums:
-            curr_body = re.sub(rf"\s*<sup>{re.escape(num)}</sup>", "", curr_body)
-
-        sections[i]["body"] = re.sub(r"\n{3,}", "\n\n", curr_body).strip() or "(No extractable text in this range.)"
+        curr_blocks = sections[i]["blocks"]
+        curr_markers = set()
+        for block in curr_blocks:
+            if "<sup>" in block.text:
+                curr_markers.update(FOOTNOTE_MARKER_RE.findall(block.text))
+
+        if curr_markers:
+            prev_defs = footnote_definition_numbers(sections[i - 1]["blocks"])
+            curr_defs = footnote_definition_numbers(curr_blocks)
+            orphan_nums = [n for n in curr_markers if n not in curr_defs and n in prev_defs]
+            for num in orphan_nums:
+                marker_re = re.compile(rf"\s*<sup>{re.escape(num)}</sup>")
+                # A marker opening a block takes the blank line before it along.
+                if any(marker_re.match(block.text) for block in curr_blocks[1:]):
+                    curr_blocks = rewrite_markdown(curr_blocks, lambda text: marker_re.sub("", text))
+                else:
+                    curr_blocks = map_block_text(curr_blocks, lambda text: marker_re.sub("", text))
+
+        curr_blocks = strip_body_blocks(curr_blocks)
+        sections[i]["blocks"] = no_text_blocks(curr_blocks[0]) if is_empty_body(curr_blocks) else curr_blocks
 
 
 def markdown_table_from_rows(rows: list[list[str]]) -> str:
@@ -990,21 +2021,36 @@ def markdown_table_from_rows(rows: list[list[str]]) -> str:
     return "\n".join(lines)
 
 
-def extract_page_tables(page, top: float, bottom: float) -> list[dict]:
-    found = []
+def page_has_ruling_graphics(page) -> bool:
+    # find_tables() only builds its cell grid from line, rectangle and quad path
+    # items, so a page without any of them cannot produce a table.
+    try:
+        paths = page.get_cdrawings()
+    except Exception:
+        return True
+    for path in paths:
+        for item in path.get("items", []):
+            if item and item[0] in TABLE_RULING_ITEMS:
+                return True
+    return False
+
+
+@timed_stage("tables")
+def detect_page_tables(page) -> list[dict]:
+    if not page_has_ruling_graphics(page):
+        return []
     try:
         table_objs = page.find_tables().tables
     except Exception:
         table_objs = []
 
+    found = []
     seen = set()
     for table in table_objs:
         bbox = getattr(table, "bbox", None)
         if not bbox or len(bbox) < 4:
             continue
         x0, y0, x1, y1 = [float(v) for v in bbox[:4]]
-        if y1 <= top or y0 >= bottom:
-            continue
         md = markdown_table_from_rows(table.extract() or [])
         if not md:
             continue
@@ -1012,13 +2058,25 @@ def extract_page_tables(page, top: float, bottom: float) -> list[dict]:
         if key in seen:
             continue
         seen.add(key)
+        found.append({"x0": x0, "x1": x1, "y0": y0, "y1": y1, "md": md})
+    return found
+
+
+def extract_page_tables(page, top: float, bottom: float, detected=None) -> list[dict]:
+    if detected is None:
+        detected = detect_page_tables(page)
+
+    found = []
+    for table in detected:
+        if table["y1"] <= top or table["y0"] >= bottom:
+            continue
         found.append(
             {
-                "x0": x0,
-                "x1": x1,
-                "y0": max(y0, top),
-                "y1": min(y1, bottom),
-                "md": md,
+                "x0": table["x0"],
+                "x1": table["x1"],
+                "y0": max(table["y0"], top),
+                "y1": min(table["y1"], bottom),
+                "md": table["md"],
             }
         )
 
@@ -1026,7 +2084,44 @@ def extract_page_tables(page, top: float, bottom: float) -> list[dict]:
     return found
 
 
-def lines_to_paragraphs(lines: list[dict]) -> list[str]:
+def table_overlap_index(tables: list[dict]) -> tuple[list[float], list[float]]:
+    """Index tables (sorted by y0, as extract_page_tables returns them) by vertical extent.
+
+    Returns each table's y0 and the running maximum of y1 up to it, so a line only
+    needs testing against tables that start above its bottom and, scanning upward,
+    until no earlier table reaches down to its top.
+    """
+    starts = []
+    reach = []
+    lowest = float("-inf")
+    for tb in tables:
+        starts.append(tb["y0"])
+        lowest = max(lowest, tb["y1"])
+        reach.append(lowest)
+    return starts, reach
+
+
+def line_overlaps_table(x0: float, x1: float, y0: float, y1: float, tables: list[dict], index) -> bool:
+    starts, reach = index
+    line_width = max(1.0, x1 - x0)
+    line_height = max(1.0, y1 - y0)
+    idx = bisect.bisect_left(starts, y1) - 1
+    while idx >= 0 and reach[idx] > y0:
+        tb = tables[idx]
+        idx -= 1
+        inter_w = max(0.0, min(x1, tb["x1"]) - max(x0, tb["x0"]))
+        inter_h = max(0.0, min(y1, tb["y1"]) - max(y0, tb["y0"]))
+        if inter_w <= 0.0 or inter_h <= 0.0:
+            continue
+        overlap_area_ratio = (inter_w * inter_h) / (line_width * line_height)
+        overlap_w_ratio = inter_w / line_width
+        overlap_h_ratio = inter_h / line_height
+        if overlap_area_ratio >= 0.45 or (overlap_w_ratio >= 0.6 and overlap_h_ratio >= 0.8):
+            return True
+    return False
+
+
+def lines_to_paragraphs(lines: list[dict], page_no: int = 0) -> list[Block]:
     if not lines:
         return []
 
@@ -1041,22 +2136,28 @@ def lines_to_paragraphs(lines: list[dict]) -> list[str]:
     def flush():
         if not current:
             return
-        merged = current[0]
-        for nxt in current[1:]:
+        merged = current[0]["text"]
+        for line in current[1:]:
+            nxt = line["text"]
             if merged.endswith("-") and len(merged) > 1 and merged[-2].isalpha() and nxt[:1].isalpha():
                 merged = merged[:-1] + nxt
-            elif re.search(r"[.!?:;)]$", merged):
-                merged += " " + nxt
             else:
                 merged += " " + nxt
-        paragraphs.append(merged.strip())
+        bbox = (
+            min(line["x0"] for line in current),
+            min(line["y0"] for line in current),
+            max(line["x1"] for line in current),
+            max(line["y1"] for line in current),
+        )
+        text = merged.strip()
+        paragraphs.append(Block(block_kind(text), text, page_no, bbox))
 
     for line in lines:
         text = line["text"]
         bullet = bool(bullet_pattern.match(text))
 
         if prev is None:
-            current = [text]
+            current = [line]
             current_is_bullet = bullet
             prev = line
             continue
@@ -1077,53 +2178,21 @@ def lines_to_paragraphs(lines: list[dict]) -> list[str]:
 
         if starts_new:
             flush()
-            current = [text]
+            current = [line]
             current_is_bullet = bullet
         else:
-            current.append(text)
+            current.append(line)
         prev = line
 
     flush()
     return paragraphs
 
 
-def order_lines_for_column_layout(lines: list[dict], page_width: float) -> list[dict]:
-    if len(lines) < 10:
-        return sorted(lines, key=lambda item: (item["y0"], item["x0"]))
-
+def order_lines_for_column_layout(lines: list[dict], page_width: float, column_centers: list[float] | None = None) -> list[dict]:
     sorted_lines = sorted(lines, key=lambda item: (item["y0"], item["x0"]))
-    narrow_lines = [
-        line for line in sorted_lines if float(line["x1"] - line["x0"]) <= (page_width * 0.62)
-    ]
-    if len(narrow_lines) < 6:
-        return sorted_lines
-
-    threshold = max(18.0, page_width * 0.08)
-    clusters: list[dict] = []
-    for line in sorted(narrow_lines, key=lambda item: item["x0"]):
-        x0 = float(line["x0"])
-        if not clusters:
-            clusters.append({"center": x0, "count": 1})
-            continue
-        nearest_idx = min(range(len(clusters)), key=lambda idx: abs(x0 - clusters[idx]["center"]))
-        nearest = clusters[nearest_idx]
-        if abs(x0 - nearest["center"]) <= threshold:
-            next_count = int(nearest["count"]) + 1
-            nearest["center"] = (nearest["center"] * nearest["count"] + x0) / next_count
-            nearest["count"] = next_count
-        else:
-            clusters.append({"center": x0, "count": 1})
-
-    min_cluster_count = max(3, int(len(narrow_lines) * 0.12))
-    clusters = [cluster for cluster in clusters if int(cluster["count"]) >= min_cluster_count]
-    if len(clusters) < 2:
-        return sorted_lines
-
-    # Use the two strongest x-clusters and read left column fully before right column.
-    clusters = sorted(clusters, key=lambda cluster: cluster["count"], reverse=True)[:2]
-    clusters = sorted(clusters, key=lambda cluster: cluster["center"])
-    column_centers = [float(cluster["center"]) for cluster in clusters]
-    if (column_centers[1] - column_centers[0]) < (page_width * 0.18):
+    if column_centers is None:
+        column_centers = detect_column_centers(lines, page_width)
+    if not column_centers:
         return sorted_lines
 
     column_lines = {0: [], 1: []}
@@ -1161,32 +2230,30 @@ def order_lines_for_column_layout(lines: list[dict], page_width: float) -> list[
 
 
 def detect_column_centers(lines: list[dict], page_width: float) -> list[float]:
+    """Return the left and right column x-centers, or [] for a single-column run."""
     if len(lines) < 10:
         return []
-    sorted_lines = sorted(lines, key=lambda item: (item["y0"], item["x0"]))
-    narrow_lines = [
-        line for line in sorted_lines if float(line["x1"] - line["x0"]) <= (page_width * 0.62)
-    ]
-    if len(narrow_lines) < 6:
+    narrow_x0 = sorted(
+        float(line["x0"]) for line in lines if float(line["x1"] - line["x0"]) <= (page_width * 0.62)
+    )
+    if len(narrow_x0) < 6:
         return []
 
+    # Greedy x0 clustering as a single sweep: x0 values arrive in ascending order and
+    # each center is a mean of values already seen, so the newest cluster is always
+    # the nearest one and no other cluster needs to be checked.
     threshold = max(18.0, page_width * 0.08)
     clusters: list[dict] = []
-    for line in sorted(narrow_lines, key=lambda item: item["x0"]):
-        x0 = float(line["x0"])
-        if not clusters:
-            clusters.append({"center": x0, "count": 1})
-            continue
-        nearest_idx = min(range(len(clusters)), key=lambda idx: abs(x0 - clusters[idx]["center"]))
-        nearest = clusters[nearest_idx]
-        if abs(x0 - nearest["center"]) <= threshold:
-            next_count = int(nearest["count"]) + 1
-            nearest["center"] = (nearest["center"] * nearest["count"] + x0) / next_count
-            nearest["count"] = next_count
+    for x0 in narrow_x0:
+        last = clusters[-1] if clusters else None
+        if last is not None and abs(x0 - last["center"]) <= threshold:
+            next_count = int(last["count"]) + 1
+            last["center"] = (last["center"] * last["count"] + x0) / next_count
+            last["count"] = next_count
         else:
             clusters.append({"center": x0, "count": 1})
 
-    min_cluster_count = max(3, int(len(narrow_lines) * 0.12))
+    min_cluster_count = max(3, int(len(narrow_x0) * 0.12))
     clusters = [cluster for cluster in clusters if int(cluster["count"]) >= min_cluster_count]
     if len(clusters) < 2:
         return []
@@ -1198,7 +2265,11 @@ def detect_column_centers(lines: list[dict], page_width: float) -> list[float]:
     return centers
 
 
-def emit_column_blocks(column_lines: list[dict], column_tables: list[dict]) -> list[str]:
+def table_block(table: dict, page_no: int) -> Block:
+    return Block(BLOCK_TABLE, table["md"], page_no, (table["x0"], table["y0"], table["x1"], table["y1"]))
+
+
+def emit_column_blocks(column_lines: list[dict], column_tables: list[dict], page_no: int = 0) -> list[Block]:
     out = []
     lines = sorted(column_lines, key=lambda item: (item["y0"], item["x0"]))
     tables = sorted(column_tables, key=lambda item: (item["y0"], item["x0"]))
@@ -1209,84 +2280,62 @@ def emit_column_blocks(column_lines: list[dict], column_tables: list[dict]) -> l
             pre.append(lines[li])
             li += 1
         if pre:
-            out.extend(lines_to_paragraphs(pre))
-        out.append(table["md"])
+            out.extend(lines_to_paragraphs(pre, page_no))
+        out.append(table_block(table, page_no))
     if li < len(lines):
-        out.extend(lines_to_paragraphs(lines[li:]))
+        out.extend(lines_to_paragraphs(lines[li:], page_no))
     return out
 
 
-def page_blocks(page, y_min=None, y_max=None, margin_noise_profile=None):
+@timed_stage("page_assembly")
+def page_blocks(page, y_min=None, y_max=None, margin_noise_profile=None, layout=None, detected_tables=None) -> list[Block]:
+    if layout is None:
+        layout = read_page_layout(page)
+    page_height = layout["height"]
     top = 0.0 if y_min is None else max(0.0, float(y_min) + 0.5)
-    bottom = float(page.rect.height) if y_max is None else float(y_max)
+    bottom = page_height if y_max is None else float(y_max)
     if bottom <= top:
         return []
 
-    tables = extract_page_tables(page, top, bottom)
-    payload = page.get_text("dict")
+    tables = extract_page_tables(page, top, bottom, detected=detected_tables)
+    table_index = table_overlap_index(tables)
+    page_number_re = re.compile(r"^\s*(?:page\s+)?\d{1,4}(?:\s*(?:/|of)\s*\d{1,4})?\s*$", flags=re.IGNORECASE)
+    top_band = page_height * 0.10
+    bottom_band = page_height * 0.90
     lines = []
-    for block in payload.get("blocks", []):
-        if block.get("type") != 0:
+    for line in layout["lines"]:
+        x0, x1, y0, y1 = line["x0"], line["x1"], line["y0"], line["y1"]
+        if y1 <= top or y0 >= bottom:
             continue
-        for line in block.get("lines", []):
-            bbox = line.get("bbox", [0, 0, 0, 0])
-            x0, x1, y0, y1 = float(bbox[0]), float(bbox[2]), float(bbox[1]), float(bbox[3])
-            if y1 <= top or y0 >= bottom:
-                continue
-            line_width = max(1.0, x1 - x0)
-            line_height = max(1.0, y1 - y0)
-
-            overlaps_table_text = False
-            for tb in tables:
-                inter_w = max(0.0, min(x1, tb["x1"]) - max(x0, tb["x0"]))
-                inter_h = max(0.0, min(y1, tb["y1"]) - max(y0, tb["y0"]))
-                if inter_w <= 0.0 or inter_h <= 0.0:
-                    continue
-                overlap_area_ratio = (inter_w * inter_h) / (line_width * line_height)
-                overlap_w_ratio = inter_w / line_width
-                overlap_h_ratio = inter_h / line_height
-                if overlap_area_ratio >= 0.45 or (overlap_w_ratio >= 0.6 and overlap_h_ratio >= 0.8):
-                    overlaps_table_text = True
-                    break
-            if overlaps_table_text:
-                continue
-            parts = []
-            for span in line.get("spans", []):
-                text = clean_line(span.get("text", ""))
-                if text:
-                    parts.append(text)
-            text = clean_line(" ".join(parts))
-            if text:
-                norm = normalize_margin_noise_text(text)
-                top_band = float(page.rect.height) * 0.10
-                bottom_band = float(page.rect.height) * 0.90
-                page_number_like = re.match(
-                    r"^\s*(?:page\s+)?\d{1,4}(?:\s*(?:/|of)\s*\d{1,4})?\s*$",
-                    text,
-                    flags=re.IGNORECASE,
-                ) is not None
-                is_top_noise = (
-                    margin_noise_profile is not None
-                    and y0 <= top_band
-                    and norm in margin_noise_profile.get("top", set())
-                )
-                is_bottom_noise = (
-                    margin_noise_profile is not None
-                    and y1 >= bottom_band
-                    and norm in margin_noise_profile.get("bottom", set())
-                )
-                is_page_footer = page_number_like and y1 >= bottom_band
-                if is_top_noise or is_bottom_noise or is_page_footer:
-                    continue
-                lines.append({"x0": x0, "x1": x1, "y0": y0, "y1": y1, "text": text})
+        if tables and line_overlaps_table(x0, x1, y0, y1, tables, table_index):
+            continue
+
+        text = line["text"]
+        norm = line["noise_norm"]
+        page_number_like = page_number_re.match(text) is not None
+        is_top_noise = (
+            margin_noise_profile is not None
+            and y0 <= top_band
+            and norm in margin_noise_profile.get("top", set())
+        )
+        is_bottom_noise = (
+            margin_noise_profile is not None
+            and y1 >= bottom_band
+            and norm in margin_noise_profile.get("bottom", set())
+        )
+        is_page_footer = page_number_like and y1 >= bottom_band
+        if is_top_noise or is_bottom_noise or is_page_footer:
+            continue
+        lines.append({"x0": x0, "x1": x1, "y0": y0, "y1": y1, "text": text})
 
     if not lines and not tables:
         return []
 
-    page_width = float(page.rect.width)
+    page_width = layout["width"]
+    page_no = page.number + 1
     if not tables:
         ordered_lines = order_lines_for_column_layout(lines, page_width)
-        return [block for block in lines_to_paragraphs(ordered_lines) if clean_line(block)]
+        return [block for block in lines_to_paragraphs(ordered_lines, page_no) if clean_line(block.text)]
 
     column_centers = detect_column_centers(lines, page_width)
     if column_centers:
@@ -1316,12 +2365,12 @@ def page_blocks(page, y_min=None, y_max=None, margin_noise_profile=None):
 
         blocks = []
         if full_lines:
-            blocks.extend(lines_to_paragraphs(sorted(full_lines, key=lambda item: (item["y0"], item["x0"]))))
+            blocks.extend(lines_to_paragraphs(sorted(full_lines, key=lambda item: (item["y0"], item["x0"])), page_no))
         for tb in sorted(full_tables, key=lambda item: (item["y0"], item["x0"])):
-            blocks.append(tb["md"])
-        blocks.extend(emit_column_blocks(left_lines, left_tables))
-        blocks.extend(emit_column_blocks(right_lines, right_tables))
-        return [block for block in blocks if clean_line(block)]
+            blocks.append(table_block(tb, page_no))
+        blocks.extend(emit_column_blocks(left_lines, left_tables, page_no))
+        blocks.extend(emit_column_blocks(right_lines, right_tables, page_no))
+        return [block for block in blocks if clean_line(block.text)]
 
     lines = sorted(lines, key=lambda item: (item["y0"], item["x0"]))
     output_blocks = []
@@ -1332,14 +2381,232 @@ def page_blocks(page, y_min=None, y_max=None, margin_noise_profile=None):
             pre_lines.append(lines[li])
             li += 1
         ordered_pre_lines = order_lines_for_column_layout(pre_lines, page_width)
-        output_blocks.extend(lines_to_paragraphs(ordered_pre_lines))
-        output_blocks.append(table["md"])
+        output_blocks.extend(lines_to_paragraphs(ordered_pre_lines, page_no))
+        output_blocks.append(table_block(table, page_no))
 
     if li < len(lines):
         ordered_tail_lines = order_lines_for_column_layout(lines[li:], page_width)
-        output_blocks.extend(lines_to_paragraphs(ordered_tail_lines))
+        output_blocks.extend(lines_to_paragraphs(ordered_tail_lines, page_no))
+
+    return [block for block in output_blocks if clean_line(block.text)]
+
+
+def plan_section_pages(normalized: list[dict], page_count: int) -> list[dict]:
+    plans = []
+    task_count = 0
+    for i, current in enumerate(normalized):
+        start = max(1, current["page_start"])
+        has_next = i + 1 < len(normalized)
+        next_entry = normalized[i + 1] if has_next else None
+
+        current_y = current.get("y0")
+        next_y = next_entry.get("y0") if has_next else None
+        next_page = next_entry["page_start"] if has_next else None
+        next_same_page = has_next and next_page == start
+
+        if has_next and next_page is not None:
+            if next_y is not None:
+                section_end_page = next_page
+            elif next_same_page:
+                # Ambiguous same-page boundary: keep current section empty rather than
+                # duplicating full-page content into multiple sections.
+                section_end_page = start - 1
+            else:
+                # Without an anchor on the next heading, stop before its start page
+                # to avoid cross-section full-page overlap.
+                section_end_page = next_page - 1
+        else:
+            section_end_page = page_count
+
+        end = max(start - 1, min(page_count, section_end_page))
+
+        tasks = []
+        for page_no in range(start - 1, end):
+            if page_no == start - 1 and current_y is not None:
+                y_min = float(current_y)
+            else:
+                y_min = None
+
+            if page_no == start - 1 and next_same_page and next_y is not None:
+                y_max = float(next_y)
+            elif has_next and next_page is not None and page_no == next_page - 1 and next_y is not None:
+                y_max = float(next_y)
+            else:
+                y_max = None
+            tasks.append((page_no, y_min, y_max))
+
+        plans.append(
+            {
+                "index": i,
+                "start": start,
+                "end": end,
+                "title": clean_line(current.get("title", ""))[:80],
+                "tasks": tasks,
+                "task_ids": list(range(task_count, task_count + len(tasks))),
+            }
+        )
+        task_count += len(tasks)
+    return plans
+
+
+def extract_task_blocks(doc, layouts: PageLayoutCache, task: tuple, margin_noise_profile) -> list[Block]:
+    page_no, y_min, y_max = task
+    page = doc.load_page(page_no)
+    return page_blocks(
+        page,
+        y_min=y_min,
+        y_max=y_max,
+        margin_noise_profile=margin_noise_profile,
+        layout=layouts.layout(page_no + 1, page),
+        detected_tables=layouts.tables(page_no + 1, page),
+    )
+
+
+_PAGE_WORKER = {}
+
+
+def _init_page_worker(pdf_path: str, margin_noise_profile, page_cache_pages: int, store_spec=None):
+    doc = fitz.open(pdf_path)
+    store = PageResultStore(*store_spec) if store_spec else None
+    _PAGE_WORKER["doc"] = doc
+    _PAGE_WORKER["layouts"] = PageLayoutCache(doc, max_pages=page_cache_pages, store=store)
+    _PAGE_WORKER["margin_noise_profile"] = margin_noise_profile
+
+
+def _extract_page_shard(shard: list[tuple]) -> list[list[Block]]:
+    doc = _PAGE_WORKER["doc"]
+    layouts = _PAGE_WORKER["layouts"]
+    margin_noise_profile = _PAGE_WORKER["margin_noise_profile"]
+    return [extract_task_blocks(doc, layouts, task, margin_noise_profile) for task in shard]
+
+
+def shard_page_tasks(tasks: list[tuple], shard_count: int) -> list[list[tuple]]:
+    # Tasks arrive in page order. Cut only between different pages so every band
+    # of a shared boundary page is handled by the worker that already parsed it.
+    target = max(1, int(math.ceil(len(tasks) / max(1, shard_count))))
+    shards = []
+    current = []
+    for task in tasks:
+        if len(current) >= target and task[0] != current[-1][0]:
+            shards.append(current)
+            current = []
+        current.append(task)
+    if current:
+        shards.append(current)
+    return shards
+
+
+def start_worker_pool(doc, margin_noise_profile, layouts: PageLayoutCache, jobs: int):
+    pdf_path = str(getattr(doc, "name", "") or "")
+    if jobs <= 1 or not pdf_path or not Path(pdf_path).exists():
+        return None
+    store = layouts.store
+    store_spec = (str(store.root), store.max_bytes) if store is not None else None
+    # Workers are spawned rather than forked so no MuPDF state is shared with the parent.
+    return ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_page_worker,
+        initargs=(pdf_path, margin_noise_profile, layouts.max_pages, store_spec),
+    )
+
+
+@timed_stage("section_pages")
+def extract_section_pages(
+    doc,
+    section_plans: list[dict],
+    margin_noise_profile,
+    layouts: PageLayoutCache,
+    pool=None,
+    jobs: int = 1,
+    total_sections: int | None = None,
+    total_tasks: int | None = None,
+    done_tasks: int = 0,
+):
+    # Progress counts are document-wide when the plans are one streaming batch.
+    tasks = [task for plan in section_plans for task in plan["tasks"]]
+    total_sections = total_sections or len(section_plans)
+    total_tasks = total_tasks or len(tasks)
+
+    if pool is None or len(tasks) < 2:
+        results = []
+        for plan in section_plans:
+            message = f"Extracting section text {plan['index'] + 1}/{total_sections}: {plan['title']}"
+            report_progress(message, stage="sections", pages_done=done_tasks + len(results), pages_total=total_tasks)
+            for task in plan["tasks"]:
+                results.append(extract_task_blocks(doc, layouts, task, margin_noise_profile))
+                if len(results) % PROGRESS_PAGE_INTERVAL == 0:
+                    report_progress(message, pages_done=done_tasks + len(results), pages_total=total_tasks)
+        return results
+
+    shards = shard_page_tasks(tasks, jobs * PAGE_SHARDS_PER_WORKER)
+    if done_tasks == 0:
+        report_progress(
+            f"Extracting section text from {total_tasks} page ranges with {jobs} workers",
+            stage="sections",
+            pages_done=0,
+            pages_total=total_tasks,
+        )
+    results = []
+    # map() yields shard results in submission order, so the merged output is
+    # identical to a serial run.
+    for shard_results in pool.map(_extract_page_shard, shards):
+        results.extend(shard_results)
+        report_progress(
+            f"Extracting section text {done_tasks + len(results)}/{total_tasks} page ranges",
+            stage="sections",
+            pages_done=done_tasks + len(results),
+            pages_total=total_tasks,
+        )
+    return results
+
+
+# Post-processing passes applied, in order, after cleanup_section_body().
+SECTION_BODY_PASSES = (
+    improve_readability,
+    normalize_footnote_block_breaks,
+    arrange_footnote_paragraphs,
+    format_dot_leader_blocks,
+    format_course_table_blocks,
+    fix_as_follows_bullet_lists,
+    remove_redundant_table_header_lines,
+    remove_duplicate_markdown_table_headers,
+    strip_footnote_prefix_from_table_rows,
+    detach_trailing_text_from_table_rows,
+    split_inline_bullet_runs,
+    strip_remaining_bullet_glyphs,
+    strip_inline_sup_markers,
+    deduplicate_body_paragraphs,
+)
+
+
+def postprocess_section_body(blocks: list[Block], title: str, next_title: str | None = None) -> list[Block]:
+    with stage_span("cleanup_section_body"):
+        blocks = cleanup_section_body(blocks, title, next_title=next_title)
+    for step in SECTION_BODY_PASSES:
+        with stage_span(step.__name__):
+            blocks = step(blocks)
+    return blocks
+
+
+def _postprocess_section_job(item: tuple) -> list[Block]:
+    return postprocess_section_body(*item)
+
+
+def postprocess_section_bodies(items: list[tuple], pool=None, jobs: int = 1) -> list[list[Block]]:
+    # Each item is (blocks, title, next_title); the chain never looks at other sections,
+    # so sections can be processed out of process and collected back in order.
+    if pool is None or len(items) < 2:
+        return [postprocess_section_body(*item) for item in items]
+
+    report_progress(f"Post-processing {len(items)} sections with {jobs} workers")
+    chunksize = max(1, len(items) // (jobs * PAGE_SHARDS_PER_WORKER))
+    return list(pool.map(_postprocess_section_job, items, chunksize=chunksize))
+
+
+def _deduplicate_body_job(blocks: list[Block]) -> list[Block]:
+    return deduplicate_body_paragraphs(blocks)
 
-    return [block for block in output_blocks if clean_line(block)]
 
 def prepare_output_dirs(out_dir: Path, conversion_mode: str) -> tuple[Path, str]:
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -1374,49 +2641,57 @@ def prepare_output_dirs(out_dir: Path, conversion_mode: str) -> tuple[Path, str]
     return target_dir, relative_prefix
 
 
-def cleanup_section_body(body: str, title: str, next_title: str | None = None) -> str:
-    out = body.strip()
-    out = re.sub(r"(?im)^\W*extract\s+\d+\s*", "", out)
+def cleanup_section_body(blocks: list[Block], title: str, next_title: str | None = None) -> list[Block]:
+    if any(has_extract_label(block.text) for block in blocks):
+        blocks = rewrite_markdown(blocks, lambda text: EXTRACT_LABEL_RE.sub("", text.strip()))
 
-    paragraphs = [p.strip() for p in out.split("\n\n") if p.strip()]
+    paragraphs = []
+    for block in blocks:
+        text = block.text.strip()
+        if text:
+            paragraphs.append(block if text == block.text else make_block(text, block))
     if not paragraphs:
-        return "(No extractable text in this range.)"
+        return no_text_blocks()
 
     title_norm = normalize_match_text(title)
+    footer_re = re.compile(r"\baffiliates\s+\d{1,3}\s*$", flags=re.IGNORECASE)
+    page_header_re = re.compile(r"^\d{1,3}\s+[A-Z].{20,}$")
     cleaned = []
-    for para in paragraphs:
-        para_norm = normalize_match_text(para)
+    for block in paragraphs:
+        para = block.text
         # Drop running headers/footers such as "... Affiliates 3".
-        if re.search(r"\baffiliates\s+\d{1,3}\s*$", para, flags=re.IGNORECASE):
+        if footer_re.search(para):
             continue
         # Drop page-header variants that prepend page numbers.
-        if re.match(r"^\d{1,3}\s+[A-Z].{20,}$", para):
+        if page_header_re.match(para):
             continue
         # Drop short repeated cover/header strings that mirror the section title.
-        if title_norm and len(para.split()) <= 35 and (
-            para_norm == title_norm
-            or para_norm.startswith(title_norm)
-            or title_norm.startswith(para_norm)
-        ):
-            continue
-        cleaned.append(para)
+        if title_norm and len(para.split()) <= 35:
+            para_norm = normalize_match_text(para)
+            if (
+                para_norm == title_norm
+                or para_norm.startswith(title_norm)
+                or title_norm.startswith(para_norm)
+            ):
+                continue
+        cleaned.append(block)
     paragraphs = cleaned
     if not paragraphs:
-        return "(No extractable text in this range.)"
+        return no_text_blocks()
 
     # Remove duplicated heading echoed as first paragraph.
-    first_para = paragraphs[0].rstrip(":").strip()
+    first_para = paragraphs[0].text.rstrip(":").strip()
     if first_para.lower() == title.strip().lower().rstrip(":"):
         paragraphs = paragraphs[1:]
 
     if paragraphs and next_title:
-        last_para = paragraphs[-1].rstrip(":").strip()
+        last_para = paragraphs[-1].text.rstrip(":").strip()
         if last_para.lower() == next_title.strip().lower().rstrip(":"):
             paragraphs = paragraphs[:-1]
 
     # Drop likely trailing heading bleed if it is short title-case text.
     if len(paragraphs) > 1:
-        tail = paragraphs[-1]
+        tail = paragraphs[-1].text
         tail_words = tail.split()
         looks_like_heading = (
             len(tail_words) <= 6
@@ -1426,12 +2701,7 @@ def cleanup_section_body(body: str, title: str, next_title: str | None = None) -
         if looks_like_heading:
             paragraphs = paragraphs[:-1]
 
-    out = "\n\n".join(paragraphs).strip()
-    if not out:
-        out = "(No extractable text in this range.)"
-
-    out = re.sub(r"\n{3,}", "\n\n", out)
-    return out
+    return paragraphs or no_text_blocks()
 
 
 def build_section_markdown(title: str, level: int, start: int, end: int, source: str, body: str, include_section_metadata: bool) -> str:
@@ -1452,18 +2722,81 @@ def build_section_markdown(title: str, level: int, start: int, end: int, source:
     )
 
 
-def write_outputs(
-    doc,
-    outline,
-    out_dir: Path,
-    max_section_chars: int,
-    include_section_metadata: bool,
-    conversion_mode: str,
-    emit_generated_toc: bool = False,
-):
-    output_md_dir, output_rel_prefix = prepare_output_dirs(out_dir, conversion_mode)
-    margin_noise_profile = build_margin_noise_profile(doc)
+def section_part_char_limit(max_section_chars: int = 0, max_section_tokens: int = 0) -> int:
+    """Character budget per output part; 0 means sections are never split."""
+    if max_section_tokens and max_section_tokens > 0:
+        return int(max_section_tokens) * CHARS_PER_TOKEN_ESTIMATE
+    return max(0, int(max_section_chars or 0))
+
+
+def is_markdown_table_block(block: str) -> bool:
+    lines = [line for line in block.splitlines() if line.strip()]
+    return len(lines) >= 2 and all(line.lstrip().startswith("|") for line in lines)
+
 
+def split_table_block(block: str, offset: int, limit: int) -> list[tuple[int, str]]:
+    # Split between rows and repeat the header row and separator in every piece.
+    lines = block.split("\n")
+    header = lines[:2] if len(lines) > 2 and re.match(r"^\|\s*:?-{3,}", lines[1].strip()) else []
+    header_len = sum(len(line) + 1 for line in header)
+    pieces = []
+    current = []
+    current_len = header_len
+    current_offset = offset + header_len
+    pos = offset + header_len
+    for line in lines[len(header):]:
+        if current and current_len + len(line) + 1 > limit:
+            pieces.append((current_offset, "\n".join(header + current)))
+            current = []
+            current_len = header_len
+            current_offset = pos
+        current.append(line)
+        current_len += len(line) + 1
+        pos += len(line) + 1
+    if current:
+        pieces.append((current_offset, "\n".join(header + current)))
+    return pieces
+
+
+def split_section_body(body: str, limit: int) -> list[tuple[int, str]]:
+    """Split a section body into (char_offset, text) parts of at most `limit` chars.
+
+    Parts break only between paragraphs/tables. Oversized markdown tables are split
+    between rows; any other block longer than the limit becomes a part of its own.
+    """
+    if limit <= 0 or len(body) <= limit:
+        return [(0, body)]
+
+    pieces = []
+    pos = 0
+    for block in body.split("\n\n"):
+        if block.strip():
+            if len(block) > limit and is_markdown_table_block(block):
+                pieces.extend(split_table_block(block, pos, limit))
+            else:
+                pieces.append((pos, block))
+        pos += len(block) + 2
+
+    parts = []
+    current = []
+    current_len = 0
+    for offset, text in pieces:
+        if current and current_len + 2 + len(text) > limit:
+            parts.append((current[0][0], "\n\n".join(item for _, item in current)))
+            current = []
+            current_len = 0
+        current_len += (2 if current else 0) + len(text)
+        current.append((offset, text))
+    if current:
+        parts.append((current[0][0], "\n\n".join(item for _, item in current)))
+    return parts or [(0, body)]
+
+
+def part_file_name(file_name: str, part: int) -> str:
+    return f"{file_name[:-3]}-part-{part}.md"
+
+
+def normalize_section_outline(outline) -> list[dict]:
     normalized = []
     for idx, item in enumerate(outline, start=1):
         normalized.append(
@@ -1504,285 +2837,979 @@ def write_outputs(
                     "section_file": None,
                 },
             )
-
-    section_rows = []
-    total_sections = len(normalized)
-    for i, current in enumerate(normalized):
-        current_title = clean_line(current.get("title", ""))[:80]
-        print(f"PROGRESS: Extracting section text {i + 1}/{total_sections}: {current_title}", flush=True)
-        start = max(1, current["page_start"])
-        has_next = i + 1 < len(normalized)
-        next_entry = normalized[i + 1] if has_next else None
-
-        current_y = current.get("y0")
-        next_y = next_entry.get("y0") if has_next else None
-        next_page = next_entry["page_start"] if has_next else None
-        next_same_page = has_next and next_page == start
-
-        if has_next and next_page is not None:
-            if next_y is not None:
-                section_end_page = next_page
-            elif next_same_page:
-                # Ambiguous same-page boundary: keep current section empty rather than
-                # duplicating full-page content into multiple sections.
-                section_end_page = start - 1
-            else:
-                # Without an anchor on the next heading, stop before its start page
-                # to avoid cross-section full-page overlap.
-                section_end_page = next_page - 1
+    return normalized
+
+
+class FootnoteRebalanceWindow:
+    """Runs the cross-section footnote passes over rows streamed in document order.
+
+    rebalance_cross_section_footnotes() only ever moves definitions from a section
+    into the one just before it, and the orphan-marker pass only compares a section
+    with its predecessor, so holding two rows is enough to reproduce both
+    whole-document passes exactly.
+    """
+
+    def __init__(self):
+        # Newest row; its successor may still move footnote definitions into it.
+        self._pending = None
+        # Last settled row as the orphan pass saw it (before paragraph dedupe).
+        self._previous = None
+
+    def push(self, row: dict) -> list[dict]:
+        settled = []
+        if self._pending is not None:
+            rebalance_cross_section_footnotes([self._pending, row])
+            settled.append(self._settle(self._pending))
+        self._pending = row
+        return settled
+
+    def finish(self) -> list[dict]:
+        if self._pending is None:
+            return []
+        row = self._settle(self._pending)
+        self._pending = None
+        return [row]
+
+    def _settle(self, row: dict) -> dict:
+        if self._previous is not None:
+            remove_orphan_markers_after_rebalance([self._previous, row])
+        self._previous = row
+        # Callers dedupe the returned copy; the next orphan check needs this body as-is.
+        return dict(row)
+
+
+def batch_section_plans(section_plans: list[dict], batch_tasks: int) -> list[list[dict]]:
+    batches = []
+    current = []
+    current_tasks = 0
+    for plan in section_plans:
+        current.append(plan)
+        current_tasks += len(plan["tasks"])
+        if current_tasks >= batch_tasks:
+            batches.append(current)
+            current = []
+            current_tasks = 0
+    if current:
+        batches.append(current)
+    return batches
+
+
+def iter_section_rows(
+    doc,
+    normalized: list[dict],
+    layouts: PageLayoutCache | None = None,
+    jobs: int = 1,
+    dedupe_scope: str = "section",
+    noise_profile: str = "auto",
+):
+    """Yield fully post-processed section rows in document order.
+
+    Sections are extracted and post-processed in batches of roughly
+    SECTION_STREAM_BATCH_PAGES page ranges, so only a bounded slice of the document
+    is held in memory however long it is.
+    """
+    layouts = layouts or PageLayoutCache(doc)
+    margin_noise_profile = build_margin_noise_profile(doc, layouts=layouts, mode=noise_profile)
+    section_plans = plan_section_pages(normalized, doc.page_count)
+    total_tasks = sum(len(plan["tasks"]) for plan in section_plans)
+    batch_tasks = max(SECTION_STREAM_BATCH_PAGES, jobs * PAGE_SHARDS_PER_WORKER * 4)
+    window = FootnoteRebalanceWindow()
+    # Blocks as post-processing left them (already deduplicated once), by index.
+    processed_blocks = {}
+    document_index = NearDuplicateIndex() if dedupe_scope == "document" else None
+
+    # Spans are never held across a yield: the consumer's own spans run in between.
+    @timed_stage("dedupe")
+    def finalize(rows: list[dict]) -> list[dict]:
+        if document_index is not None:
+            # One shared index, so sections must go through it in document order.
+            for row in rows:
+                processed_blocks.pop(row["index"], None)
+                row["blocks"] = deduplicate_body_paragraphs(row["blocks"], index=document_index)
         else:
-            section_end_page = doc.page_count
-
-        end = max(start - 1, min(doc.page_count, section_end_page))
-
-        pages_text = []
-        for page_no in range(start - 1, end):
-            page = doc.load_page(page_no)
-            if page_no == start - 1 and current_y is not None:
-                y_min = float(current_y)
+            # Deduplication is idempotent, so only bodies the footnote window changed
+            # need another pass.
+            changed = [row for row in rows if row["blocks"] != processed_blocks.pop(row["index"], None)]
+            if pool is not None and len(changed) > 1:
+                chunksize = max(1, len(changed) // (jobs * PAGE_SHARDS_PER_WORKER))
+                results = pool.map(_deduplicate_body_job, [row["blocks"] for row in changed], chunksize=chunksize)
             else:
-                y_min = None
+                results = [deduplicate_body_paragraphs(row["blocks"]) for row in changed]
+            for row, blocks in zip(changed, results):
+                row["blocks"] = blocks
+        # The body is serialized to markdown once, here.
+        for row in rows:
+            row["body"] = blocks_to_markdown(row.pop("blocks"))
+        return rows
 
-            if page_no == start - 1 and next_same_page and next_y is not None:
-                y_max = float(next_y)
-            elif has_next and next_page is not None and page_no == next_page - 1 and next_y is not None:
-                y_max = float(next_y)
-            else:
-                y_max = None
+    pool = start_worker_pool(doc, margin_noise_profile, layouts, jobs)
+    try:
+        done_tasks = 0
+        for batch in batch_section_plans(section_plans, batch_tasks):
+            blocks_by_task = extract_section_pages(
+                doc,
+                batch,
+                margin_noise_profile,
+                layouts,
+                pool=pool,
+                jobs=jobs,
+                total_sections=len(section_plans),
+                total_tasks=total_tasks,
+                done_tasks=done_tasks,
+            )
 
-            blocks = page_blocks(page, y_min=y_min, y_max=y_max, margin_noise_profile=margin_noise_profile)
-            if blocks:
-                pages_text.append("\n\n".join(blocks))
-
-        next_title = next_entry["title"] if has_next else None
-        body = "\n\n".join(pages_text).strip() or "(No extractable text in this range.)"
-        body = cleanup_section_body(body, current["title"], next_title=next_title)
-        body = improve_readability(body)
-        body = normalize_footnote_block_breaks(body)
-        body = attach_missing_footnote_markers(body)
-        body = move_footnote_definitions_to_end(body)
-        body = stitch_orphan_continuations(body)
-        body = format_dot_leader_blocks(body)
-        body = format_course_table_blocks(body)
-        body = fix_as_follows_bullet_lists(body)
-        body = remove_redundant_table_header_lines(body)
-        body = remove_duplicate_markdown_table_headers(body)
-        body = strip_footnote_prefix_from_table_rows(body)
-        body = detach_trailing_text_from_table_rows(body)
-        body = split_inline_bullet_runs(body)
-        body = strip_remaining_bullet_glyphs(body)
-        body = strip_inline_sup_markers(body)
-        body = deduplicate_body_paragraphs(body)
-        section_rows.append(
-            {
-                "index": i,
-                "start": start,
-                "end": end,
-                "title": current["title"],
-                "level": current["level"],
-                "source": current["source"],
-                "body": body,
-            }
+            postprocess_items = []
+            offset = 0
+            for plan in batch:
+                i = plan["index"]
+                blocks = [block for page in blocks_by_task[offset : offset + len(plan["tasks"])] for block in page]
+                offset += len(plan["tasks"])
+                next_title = normalized[i + 1]["title"] if i + 1 < len(normalized) else None
+                postprocess_items.append((blocks or no_text_blocks(), normalized[i]["title"], next_title))
+            done_tasks += offset
+            blocks_by_task = None
+
+            with stage_span("post_processing"):
+                bodies = postprocess_section_bodies(postprocess_items, pool=pool, jobs=jobs)
+            postprocess_items = None
+
+            settled = []
+            with stage_span("footnote_window"):
+                for plan, blocks in zip(batch, bodies):
+                    current = normalized[plan["index"]]
+                    processed_blocks[plan["index"]] = blocks
+                    settled.extend(
+                        window.push(
+                            {
+                                "index": plan["index"],
+                                "start": plan["start"],
+                                "end": plan["end"],
+                                "title": current["title"],
+                                "level": current["level"],
+                                "source": current["source"],
+                                "blocks": blocks,
+                            }
+                        )
+                    )
+            yield from finalize(settled)
+        with stage_span("footnote_window"):
+            settled = window.finish()
+        yield from finalize(settled)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+class SectionOutputWriter:
+    """Writes markdown for one conversion mode as section rows arrive in order.
+
+    Each section file (or major-heading group) is written as soon as its rows are
+    final, so the output folder fills in during long conversions and no mode holds
+    more than one open file's worth of markdown.
+    """
+
+    def __init__(
+        self,
+        normalized: list[dict],
+        out_dir: Path,
+        include_section_metadata: bool,
+        conversion_mode: str,
+        emit_generated_toc: bool = False,
+        page_count: int = 1,
+        output_dirs: tuple[Path, str] | None = None,
+        part_char_limit: int = 0,
+    ):
+        if conversion_mode not in ("single", "major", "sections"):
+            raise ValueError(f"Unsupported conversion mode: {conversion_mode}")
+        if output_dirs is None:
+            output_dirs = prepare_output_dirs(out_dir, conversion_mode)
+        self.normalized = normalized
+        self.out_dir = out_dir
+        self.include_section_metadata = include_section_metadata
+        self.conversion_mode = conversion_mode
+        self.page_count = page_count
+        # Single-file output is one file by definition and is never split.
+        self.part_char_limit = part_char_limit if conversion_mode != "single" else 0
+        self.output_md_dir, self.output_rel_prefix = output_dirs
+        self.segments = []
+        self._handle = None
+        self._group = None
+
+        max_level_in_doc = max((int(item["level"]) for item in normalized), default=1)
+        numbering_depth = max(3, min(6, max_level_in_doc))
+        level_counters = [0] * numbering_depth
+        self.code_by_index = {}
+        for i, current in enumerate(normalized):
+            current_level = max(1, min(numbering_depth, int(current["level"])))
+            for depth_i in range(current_level, numbering_depth):
+                level_counters[depth_i] = 0
+            level_counters[current_level - 1] += 1
+            self.code_by_index[i] = ".".join(str(level_counters[idx]) for idx in range(numbering_depth))
+
+        if conversion_mode == "major":
+            levels = [int(item["level"]) for item in normalized] or [1]
+            level_counts = {}
+            for lvl in levels:
+                level_counts[lvl] = level_counts.get(lvl, 0) + 1
+            multi_levels = sorted([lvl for lvl, cnt in level_counts.items() if cnt >= 2])
+            major_level = multi_levels[0] if multi_levels else min(levels)
+            major_indices = [idx for idx, item in enumerate(normalized) if int(item["level"]) == major_level]
+            self.major_set = set(major_indices or [0])
+            self.first_major = major_indices[0] if major_indices else 0
+        elif conversion_mode == "single":
+            file_name = f"{out_dir.name}.md"
+            self.single_path = f"{self.output_rel_prefix}{file_name}"
+            self._group = {"page_start": None, "page_end": None, "chars": 0}
+            self._handle = (self.output_md_dir / file_name).open("w", encoding="utf-8")
+            self._chunks_written = 0
+            # The table only needs each section's title and start page, which the
+            # outline already knows before any body has been extracted.
+            toc_rows = [{"title": item["title"], "start": max(1, int(item["page_start"]))} for item in normalized]
+            toc_table = build_toc_markdown_table(toc_rows)
+            if emit_generated_toc and toc_table:
+                self._write_chunk(toc_table.strip())
+
+    def _write_chunk(self, chunk: str) -> None:
+        if self._chunks_written:
+            self._handle.write("\n\n")
+        self._handle.write(chunk)
+        self._chunks_written += 1
+
+    def _row_markdown(self, row: dict, body: str | None = None) -> str:
+        entry = self.normalized[row["index"]]
+        return build_section_markdown(
+            entry["title"],
+            int(entry["level"]),
+            int(row["start"]),
+            int(row["end"]),
+            entry["source"],
+            row["body"] if body is None else body,
+            self.include_section_metadata,
         )
 
-    rebalance_cross_section_footnotes(section_rows)
-    remove_orphan_markers_after_rebalance(section_rows)
-    for row in section_rows:
-        row["body"] = deduplicate_body_paragraphs(row["body"])
-
-    max_level_in_doc = max((int(item["level"]) for item in normalized), default=1)
-    numbering_depth = max(3, min(6, max_level_in_doc))
-    level_counters = [0] * numbering_depth
-
-    code_by_index = {}
-    for row in section_rows:
+    def add(self, row: dict) -> None:
         i = row["index"]
-        current = normalized[i]
-        current_level = max(1, min(numbering_depth, int(current["level"])))
-        for depth_i in range(current_level, numbering_depth):
-            level_counters[depth_i] = 0
-        level_counters[current_level - 1] += 1
-        code_by_index[i] = ".".join(str(level_counters[idx]) for idx in range(numbering_depth))
-
+        current = self.normalized[i]
         body = row["body"]
         current["line_count"] = len([line for line in body.splitlines() if line.strip()])
         current["char_count"] = len(body)
         current["section_file"] = None
 
-    segments = []
-    total_rows = len(section_rows)
-
-    if conversion_mode == "sections":
-        for row in section_rows:
-            i = row["index"]
-            current = normalized[i]
+        if self.conversion_mode == "sections":
             current_title = clean_line(current.get("title", ""))[:80]
-            print(f"PROGRESS: Writing section markdown {i + 1}/{total_rows}: {current_title}", flush=True)
-            start = row["start"]
-            end = row["end"]
-            body = row["body"]
-
-            section_code = code_by_index[i]
-            file_name = f"{section_code}-{slugify(current['title'])}.md"
-            section_path = f"{output_rel_prefix}{file_name}"
-            current["section_file"] = section_path
-            markdown = build_section_markdown(
-                current["title"],
-                int(current["level"]),
-                int(start),
-                int(end),
-                current["source"],
-                body,
-                include_section_metadata,
+            report_progress(f"Writing section markdown {i + 1}/{len(self.normalized)}: {current_title}")
+            file_name = f"{self.code_by_index[i]}-{slugify(current['title'])}.md"
+            parts = split_section_body(body, self.part_char_limit)
+            if len(parts) == 1:
+                section_path = f"{self.output_rel_prefix}{file_name}"
+                current["section_file"] = section_path
+                (self.output_md_dir / file_name).write_text(self._row_markdown(row), encoding="utf-8")
+                self.segments.append(
+                    {
+                        "id": f"s{len(self.segments)+1}",
+                        "title": current["title"],
+                        "level": current["level"],
+                        "page_start": row["start"],
+                        "page_end": row["end"],
+                        "file": section_path,
+                        "char_count": len(body),
+                    }
+                )
+                return
+
+            for part_no, (offset, part_body) in enumerate(parts, start=1):
+                part_name = part_file_name(file_name, part_no)
+                section_path = f"{self.output_rel_prefix}{part_name}"
+                if part_no == 1:
+                    current["section_file"] = section_path
+                (self.output_md_dir / part_name).write_text(self._row_markdown(row, part_body), encoding="utf-8")
+                self.segments.append(
+                    {
+                        "id": f"s{len(self.segments)+1}",
+                        "title": current["title"],
+                        "level": current["level"],
+                        "page_start": row["start"],
+                        "page_end": row["end"],
+                        "file": section_path,
+                        "char_count": len(part_body),
+                        "part": part_no,
+                        "part_count": len(parts),
+                        "char_offset": offset,
+                    }
+                )
+        elif self.conversion_mode == "major":
+            # Rows before the first major heading are grouped under it.
+            if i in self.major_set:
+                major_idx = i
+            elif self._group is not None:
+                major_idx = self._group["major_idx"]
+            else:
+                major_idx = self.first_major
+            if self._group is None or self._group["major_idx"] != major_idx:
+                self._close_major_group()
+                self._open_major_group(major_idx, row)
+            limit = self.part_char_limit
+            for _, part_body in split_section_body(body, limit):
+                part = self._group["parts"][-1]
+                if limit and part["chars"] and part["chars"] + len(part_body) > limit:
+                    self._start_major_part(row)
+                    part = self._group["parts"][-1]
+                self._write_chunk(self._row_markdown(row, part_body).strip())
+                part["page_end"] = row["end"]
+                part["chars"] += len(part_body)
+            self._group["page_end"] = row["end"]
+            self._group["chars"] += len(body)
+        else:
+            if self._group["page_start"] is None:
+                self._group["page_start"] = row["start"]
+            self._write_chunk(self._row_markdown(row).strip())
+            self._group["page_end"] = row["end"]
+            self._group["chars"] += len(body)
+
+    def _open_major_group(self, major_idx: int, row: dict) -> None:
+        current = self.normalized[major_idx]
+        current_title = clean_line(current.get("title", ""))[:80]
+        report_progress(f"Writing major-heading markdown {major_idx + 1}/{len(self.normalized)}: {current_title}")
+        file_name = f"{self.code_by_index.get(major_idx, '0.0.0')}-{slugify(current['title'])}.md"
+        self._group = {
+            "major_idx": major_idx,
+            "file_name": file_name,
+            "section_path": f"{self.output_rel_prefix}{file_name}",
+            "page_start": row["start"],
+            "page_end": row["end"],
+            "chars": 0,
+            "parts": [{"page_start": row["start"], "page_end": row["end"], "chars": 0, "offset": 0}],
+        }
+        self._handle = (self.output_md_dir / file_name).open("w", encoding="utf-8")
+        self._chunks_written = 0
+
+    def _start_major_part(self, row: dict) -> None:
+        group = self._group
+        self._handle.write("\n")
+        self._handle.close()
+        if len(group["parts"]) == 1:
+            # The group turned out to need parts: the file written so far is part 1.
+            os.replace(
+                self.output_md_dir / group["file_name"],
+                self.output_md_dir / part_file_name(group["file_name"], 1),
             )
-            (output_md_dir / file_name).write_text(markdown, encoding="utf-8")
-            segments.append(
+        previous = group["parts"][-1]
+        group["parts"].append(
+            {
+                "page_start": row["start"],
+                "page_end": row["end"],
+                "chars": 0,
+                "offset": previous["offset"] + previous["chars"],
+            }
+        )
+        part_name = part_file_name(group["file_name"], len(group["parts"]))
+        self._handle = (self.output_md_dir / part_name).open("w", encoding="utf-8")
+        self._chunks_written = 0
+
+    def _close_major_group(self) -> None:
+        if self._group is None:
+            return
+        self._handle.write("\n")
+        self._handle.close()
+        self._handle = None
+        group = self._group
+        current = self.normalized[group["major_idx"]]
+        if len(group["parts"]) == 1:
+            current["section_file"] = group["section_path"]
+            self.segments.append(
                 {
-                    "id": f"s{len(segments)+1}",
+                    "id": f"s{len(self.segments)+1}",
                     "title": current["title"],
                     "level": current["level"],
-                    "page_start": start,
-                    "page_end": end,
-                    "file": section_path,
-                    "char_count": len(body),
+                    "page_start": group["page_start"],
+                    "page_end": group["page_end"],
+                    "file": group["section_path"],
+                    "char_count": group["chars"],
                 }
             )
-    elif conversion_mode == "major":
-        levels = [int(item["level"]) for item in normalized] or [1]
-        level_counts = {}
-        for lvl in levels:
-            level_counts[lvl] = level_counts.get(lvl, 0) + 1
-        multi_levels = sorted([lvl for lvl, cnt in level_counts.items() if cnt >= 2])
-        major_level = multi_levels[0] if multi_levels else min(levels)
-        major_indices = [idx for idx, item in enumerate(normalized) if int(item["level"]) == major_level]
-        if not major_indices:
-            major_indices = [0]
-
-        rows_by_major = {idx: [] for idx in major_indices}
-        active_major = major_indices[0]
-        major_set = set(major_indices)
-        for row in section_rows:
-            idx = row["index"]
-            if idx in major_set:
-                active_major = idx
-            rows_by_major.setdefault(active_major, []).append(row)
-
-        for major_idx in major_indices:
-            grouped_rows = rows_by_major.get(major_idx, [])
-            if not grouped_rows:
-                continue
-            current = normalized[major_idx]
-            current_title = clean_line(current.get("title", ""))[:80]
-            print(
-                f"PROGRESS: Writing major-heading markdown {major_idx + 1}/{len(normalized)}: {current_title}",
-                flush=True,
-            )
-
-            section_code = code_by_index.get(major_idx, "0.0.0")
-            file_name = f"{section_code}-{slugify(current['title'])}.md"
-            section_path = f"{output_rel_prefix}{file_name}"
-            current["section_file"] = section_path
-
-            chunk_markdown = []
-            total_chars = 0
-            page_start = grouped_rows[0]["start"]
-            page_end = grouped_rows[-1]["end"]
-            for row in grouped_rows:
-                idx = row["index"]
-                entry = normalized[idx]
-                body = row["body"]
-                total_chars += len(body)
-                chunk_markdown.append(
-                    build_section_markdown(
-                        entry["title"],
-                        int(entry["level"]),
-                        int(row["start"]),
-                        int(row["end"]),
-                        entry["source"],
-                        body,
-                        include_section_metadata,
-                    ).strip()
+        else:
+            for part_no, part in enumerate(group["parts"], start=1):
+                section_path = f"{self.output_rel_prefix}{part_file_name(group['file_name'], part_no)}"
+                if part_no == 1:
+                    current["section_file"] = section_path
+                self.segments.append(
+                    {
+                        "id": f"s{len(self.segments)+1}",
+                        "title": current["title"],
+                        "level": current["level"],
+                        "page_start": part["page_start"],
+                        "page_end": part["page_end"],
+                        "file": section_path,
+                        "char_count": part["chars"],
+                        "part": part_no,
+                        "part_count": len(group["parts"]),
+                        "char_offset": part["offset"],
+                    }
                 )
-            (output_md_dir / file_name).write_text("\n\n".join(chunk_markdown) + "\n", encoding="utf-8")
-            segments.append(
+        self._group = None
+
+    def abort(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def close(self) -> tuple[list[dict], list[dict]]:
+        if self.conversion_mode == "major":
+            self._close_major_group()
+        elif self.conversion_mode == "single":
+            self._handle.write("\n")
+            self._handle.close()
+            self._handle = None
+            if self.normalized:
+                self.normalized[0]["section_file"] = self.single_path
+            page_start = self._group["page_start"]
+            self.segments.append(
                 {
-                    "id": f"s{len(segments)+1}",
-                    "title": current["title"],
-                    "level": current["level"],
-                    "page_start": page_start,
-                    "page_end": page_end,
-                    "file": section_path,
-                    "char_count": total_chars,
+                    "id": "s1",
+                    "title": "Document",
+                    "level": 1,
+                    "page_start": page_start if page_start is not None else 1,
+                    "page_end": self._group["page_end"] if page_start is not None else self.page_count,
+                    "file": self.single_path,
+                    "char_count": self._group["chars"],
                 }
             )
-    elif conversion_mode == "single":
-        file_name = f"{out_dir.name}.md"
-        section_path = f"{output_rel_prefix}{file_name}"
-        if normalized:
-            normalized[0]["section_file"] = section_path
-
-        chunk_markdown = []
-        toc_table = build_toc_markdown_table(section_rows)
-        if emit_generated_toc and toc_table:
-            chunk_markdown.append(toc_table.strip())
-        total_chars = 0
-        page_start = section_rows[0]["start"] if section_rows else 1
-        page_end = section_rows[-1]["end"] if section_rows else doc.page_count
-        for row in section_rows:
-            idx = row["index"]
-            entry = normalized[idx]
-            body = row["body"]
-            total_chars += len(body)
-            chunk_markdown.append(
-                build_section_markdown(
-                    entry["title"],
-                    int(entry["level"]),
-                    int(row["start"]),
-                    int(row["end"]),
-                    entry["source"],
-                    body,
-                    include_section_metadata,
-                ).strip()
+
+        normalized = self.normalized
+        out_dir = self.out_dir
+        (out_dir / "outline.json").write_text(json.dumps(normalized, indent=2), encoding="utf-8")
+        (out_dir / "segments.json").write_text(json.dumps(self.segments, indent=2), encoding="utf-8")
+
+        lines = ["# Outline", ""]
+        for entry in normalized:
+            indent = "  " * max(0, entry["level"] - 1)
+            title = entry["title"]
+            if entry.get("section_file"):
+                title = f"[{title}]({entry['section_file']})"
+            lines.append(
+                f"{indent}- L{entry['level']} p{entry['page_start']} "
+                f"{title} (lines: {entry['line_count']}, chars: {entry['char_count']})"
             )
-        (output_md_dir / file_name).write_text("\n\n".join(chunk_markdown) + "\n", encoding="utf-8")
-        segments.append(
-            {
-                "id": "s1",
-                "title": "Document",
-                "level": 1,
-                "page_start": page_start,
-                "page_end": page_end,
-                "file": section_path,
-                "char_count": total_chars,
-            }
+        lines.append("")
+        (out_dir / "outline.md").write_text("\n".join(lines), encoding="utf-8")
+
+        section_files = list(dict.fromkeys(segment["file"] for segment in self.segments))
+        write_output_manifest(
+            out_dir, self.conversion_mode, ["outline.json", "segments.json", "outline.md", *section_files]
         )
-    else:
-        raise ValueError(f"Unsupported conversion mode: {conversion_mode}")
+        return normalized, self.segments
+
+
+def write_output_manifest(out_dir: Path, conversion_mode: str, relative_paths: list[str]) -> None:
+    files = []
+    for relative_path in relative_paths:
+        files.append({"path": relative_path, "size": (out_dir / relative_path).stat().st_size})
+    manifest = {"version": MANIFEST_VERSION, "conversion_mode": conversion_mode, "files": files}
+    (out_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+
+class SectionSearchIndexWriter:
+    """Builds SEARCH_INDEX_FILE as section rows arrive, replacing it only on close().
+
+    Section text goes into an FTS5 table keyed by outline index. Page ranges and
+    the markdown file holding each section are added on close, once the output
+    writer has assigned files.
+    """
+
+    def __init__(self, index_path: Path):
+        self.index_path = index_path
+        self.tmp_path = index_path.with_name(f"{index_path.name}.tmp")
+        self.tmp_path.unlink(missing_ok=True)
+        self._db = sqlite3.connect(str(self.tmp_path))
+        try:
+            self._db.executescript(
+                """
+                CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE sections (
+                    id INTEGER PRIMARY KEY, title TEXT, level INTEGER,
+                    page_start INTEGER, page_end INTEGER, file TEXT
+                );
+                CREATE VIRTUAL TABLE section_text USING fts5(
+                    title, body, tokenize = 'unicode61 remove_diacritics 2'
+                );
+                """
+            )
+        except sqlite3.Error:
+            self.abort()
+            raise
+        self._pages = {}
+
+    def add(self, row: dict) -> None:
+        self._db.execute(
+            "INSERT INTO section_text (rowid, title, body) VALUES (?, ?, ?)",
+            (row["index"], row["title"], row["body"]),
+        )
+        self._pages[row["index"]] = (row["start"], row["end"])
+
+    def close(self, normalized: list[dict]) -> None:
+        # Rows without a file of their own (sub-sections in major mode, every row
+        # in single mode) live in the nearest file at or before them; rows ahead
+        # of the first major heading are grouped into the first file.
+        files = []
+        current = None
+        for entry in normalized:
+            current = entry.get("section_file") or current
+            files.append(current)
+        first_file = next((file for file in files if file), None)
+        records = []
+        for i, entry in enumerate(normalized):
+            page_start, page_end = self._pages.get(i, (entry["page_start"], entry["page_start"]))
+            records.append((i, entry["title"], int(entry["level"]), page_start, page_end, files[i] or first_file))
+        self._db.executemany("INSERT INTO sections VALUES (?, ?, ?, ?, ?, ?)", records)
+        self._db.execute("INSERT INTO meta VALUES ('version', ?)", (str(SEARCH_INDEX_VERSION),))
+        self._db.commit()
+        self._db.close()
+        os.replace(self.tmp_path, self.index_path)
+
+    def abort(self) -> None:
+        self._db.close()
+        try:
+            self.tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def open_search_index(out_dir: Path) -> SectionSearchIndexWriter | None:
+    try:
+        return SectionSearchIndexWriter(out_dir / SEARCH_INDEX_FILE)
+    except sqlite3.Error as err:
+        # Python builds whose SQLite lacks FTS5 still convert, just without search.
+        report_progress(f"Search index unavailable ({err}); skipping it")
+        return None
+
+
+def search_match_expression(query: str) -> str:
+    # Every word must match; the last one also matches as a prefix so results
+    # follow the user's typing. Quoting keeps FTS5 query syntax out of user input.
+    words = re.findall(r"\w+", query)
+    if not words:
+        return ""
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_section_index(out_dir: Path, query: str, limit: int = SEARCH_RESULT_LIMIT) -> list[dict]:
+    """Return the best-ranked sections for `query` (BM25, title matches weighted 5x)."""
+    index_path = Path(out_dir) / SEARCH_INDEX_FILE
+    if not index_path.exists():
+        raise FileNotFoundError(f"{SEARCH_INDEX_FILE} not found; run a conversion first")
+    match = search_match_expression(query)
+    if not match:
+        return []
+    with contextlib.closing(sqlite3.connect(f"{index_path.as_uri()}?mode=ro", uri=True)) as db:
+        rows = db.execute(
+            """
+            SELECT s.id, s.title, s.level, s.page_start, s.page_end, s.file,
+                   snippet(section_text, -1, ?, ?, '...', ?), bm25(section_text, 5.0, 1.0) AS rank
+            FROM section_text JOIN sections AS s ON s.id = section_text.rowid
+            WHERE section_text MATCH ?
+            ORDER BY rank
+            LIMIT ?
+            """,
+            (*SEARCH_HIGHLIGHT, SEARCH_SNIPPET_TOKENS, match, max(1, int(limit))),
+        ).fetchall()
+    return [
+        {
+            "id": section_id,
+            "title": title,
+            "level": level,
+            "page_start": page_start,
+            "page_end": page_end,
+            "file": file,
+            "snippet": snippet,
+            "score": round(-rank, 4),
+        }
+        for section_id, title, level, page_start, page_end, file, snippet, rank in rows
+    ]
+
+
+def render_outputs(
+    normalized: list[dict],
+    section_rows,
+    out_dir: Path,
+    include_section_metadata: bool,
+    conversion_mode: str,
+    emit_generated_toc: bool = False,
+    page_count: int = 1,
+    output_dirs: tuple[Path, str] | None = None,
+    part_char_limit: int = 0,
+):
+    writer = SectionOutputWriter(
+        normalized,
+        out_dir,
+        include_section_metadata,
+        conversion_mode,
+        emit_generated_toc=emit_generated_toc,
+        page_count=page_count,
+        output_dirs=output_dirs,
+        part_char_limit=part_char_limit,
+    )
+    search_index = open_search_index(out_dir)
+    try:
+        for row in section_rows:
+            writer.add(row)
+            if search_index is not None:
+                search_index.add(row)
+    except BaseException:
+        writer.abort()
+        if search_index is not None:
+            search_index.abort()
+        raise
+    normalized, segments = writer.close()
+    if search_index is not None:
+        search_index.close(normalized)
+    return normalized, segments
+
+
+class SectionStoreUnavailable(ValueError):
+    """The saved section store is missing, stale, or was built for another outline."""
+
+
+def source_signature(input_path: Path) -> dict:
+    stat = Path(input_path).stat()
+    return {"size": int(stat.st_size), "mtime_ns": int(stat.st_mtime_ns)}
+
+
+def required_outline_variant(conversion_mode: str, heuristic_outline: bool) -> str:
+    # Single-file output collapses a purely heuristic outline into one document
+    # heading (see convert_document), so its sections differ from other modes.
+    if conversion_mode == "single" and heuristic_outline:
+        return "single-fallback"
+    return "full"
+
+
+class SectionStoreWriter:
+    """Streams final section rows into SECTION_STORE_FILE, replacing it only on close()."""
+
+    def __init__(self, store_path: Path, meta: dict, normalized: list[dict]):
+        self.store_path = store_path
+        self.tmp_path = store_path.with_name(f"{store_path.name}.tmp")
+        self._handle = self.tmp_path.open("w", encoding="utf-8")
+        self._write({"type": "meta", **meta, "outline": normalized})
+
+    def _write(self, record: dict) -> None:
+        self._handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def add(self, row: dict) -> None:
+        self._write({"type": "section", **row})
+
+    def close(self) -> None:
+        self._handle.close()
+        os.replace(self.tmp_path, self.store_path)
 
-    (out_dir / "outline.json").write_text(json.dumps(normalized, indent=2), encoding="utf-8")
-    (out_dir / "segments.json").write_text(json.dumps(segments, indent=2), encoding="utf-8")
-
-    lines = ["# Outline", ""]
-    for entry in normalized:
-        indent = "  " * max(0, entry["level"] - 1)
-        title = entry["title"]
-        if entry.get("section_file"):
-            title = f"[{title}]({entry['section_file']})"
-        lines.append(
-            f"{indent}- L{entry['level']} p{entry['page_start']} "
-            f"{title} (lines: {entry['line_count']}, chars: {entry['char_count']})"
+    def abort(self) -> None:
+        self._handle.close()
+        try:
+            self.tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def read_section_store(store_path: Path) -> tuple[dict, list[dict]]:
+    if not store_path.exists():
+        raise SectionStoreUnavailable(f"{store_path.name} not found; run a full conversion first")
+    try:
+        with store_path.open(encoding="utf-8") as handle:
+            meta = json.loads(handle.readline() or "null")
+    except ValueError as err:
+        raise SectionStoreUnavailable(f"{store_path.name} is unreadable: {err}") from err
+    if not isinstance(meta, dict) or meta.pop("type", None) != "meta":
+        raise SectionStoreUnavailable(f"{store_path.name} is missing its header line")
+    if meta.get("version") != SECTION_STORE_VERSION:
+        raise SectionStoreUnavailable(f"{store_path.name} was written by a different extractor version")
+    normalized = meta.pop("outline", [])
+    return meta, normalized
+
+
+def iter_section_store_rows(store_path: Path):
+    with store_path.open(encoding="utf-8") as handle:
+        for raw in handle:
+            if not raw.strip():
+                continue
+            try:
+                record = json.loads(raw)
+            except ValueError as err:
+                raise SectionStoreUnavailable(f"{store_path.name} is unreadable: {err}") from err
+            if record.pop("type", None) == "section":
+                yield record
+
+
+def load_section_store(
+    out_dir: Path,
+    input_path: Path,
+    conversion_mode: str,
+    dedupe_scope: str = "section",
+    noise_profile: str = "auto",
+):
+    """Validate the saved store for this PDF and these options; returns (meta, normalized, rows).
+
+    `rows` is a lazy iterator over the saved sections.
+    """
+    store_path = out_dir / SECTION_STORE_FILE
+    meta, normalized = read_section_store(store_path)
+    # The PDF itself is optional here; when it is present it must be the one the
+    # store was built from.
+    if input_path.exists() and meta.get("source") != source_signature(input_path):
+        raise SectionStoreUnavailable(f"{input_path.name} changed since {SECTION_STORE_FILE} was written")
+    required = required_outline_variant(conversion_mode, bool(meta.get("heuristic_outline")))
+    if meta.get("outline_variant") != required:
+        raise SectionStoreUnavailable(
+            f"{SECTION_STORE_FILE} holds the '{meta.get('outline_variant')}' outline; "
+            f"{conversion_mode} mode needs '{required}'"
+        )
+    if meta.get("dedupe_scope") != dedupe_scope:
+        raise SectionStoreUnavailable(
+            f"{SECTION_STORE_FILE} was deduplicated per {meta.get('dedupe_scope')}, not per {dedupe_scope}"
         )
-    lines.append("")
-    (out_dir / "outline.md").write_text("\n".join(lines), encoding="utf-8")
+    profile = resolve_noise_profile_mode(noise_profile, int(meta.get("page_count") or 1))
+    if meta.get("noise_profile") != profile:
+        raise SectionStoreUnavailable(
+            f"{SECTION_STORE_FILE} used the {meta.get('noise_profile')} margin-noise profile, not {profile}"
+        )
+    return meta, normalized, iter_section_store_rows(store_path)
+
 
+def write_outputs(
+    doc,
+    outline,
+    out_dir: Path,
+    max_section_chars: int,
+    include_section_metadata: bool,
+    conversion_mode: str,
+    emit_generated_toc: bool = False,
+    layouts: PageLayoutCache | None = None,
+    jobs: int = 1,
+    section_store: dict | None = None,
+    max_section_tokens: int = 0,
+    dedupe_scope: str = "section",
+    noise_profile: str = "auto",
+):
+    # Prepare (and clear) the output folder first so locked files fail fast,
+    # before the long extraction runs.
+    with stage_span("prepare_output"):
+        output_dirs = prepare_output_dirs(out_dir, conversion_mode)
+    normalized = normalize_section_outline(outline)
+    writer = SectionOutputWriter(
+        normalized,
+        out_dir,
+        include_section_metadata,
+        conversion_mode,
+        emit_generated_toc=emit_generated_toc,
+        page_count=doc.page_count,
+        output_dirs=output_dirs,
+        part_char_limit=section_part_char_limit(max_section_chars, max_section_tokens),
+    )
+    store = None
+    if section_store is not None:
+        store = SectionStoreWriter(out_dir / SECTION_STORE_FILE, section_store, normalized)
+    search_index = open_search_index(out_dir)
+
+    rows = iter_section_rows(
+        doc,
+        normalized,
+        layouts=layouts,
+        jobs=jobs,
+        dedupe_scope=dedupe_scope,
+        noise_profile=noise_profile,
+    )
+    try:
+        for row in rows:
+            with stage_span("writing"):
+                if store is not None:
+                    store.add(row)
+                writer.add(row)
+            if search_index is not None:
+                with stage_span("search_index"):
+                    search_index.add(row)
+    except BaseException:
+        writer.abort()
+        if store is not None:
+            store.abort()
+        if search_index is not None:
+            search_index.abort()
+        raise
+    finally:
+        rows.close()
+
+    with stage_span("writing"):
+        if store is not None:
+            store.close()
+        normalized, segments = writer.close()
+    if search_index is not None:
+        with stage_span("search_index"):
+            search_index.close(normalized)
     return normalized, segments
 
 
+def write_stage_timings(
+    out_dir: Path, timer: StageTimer, input_path: Path, page_count: int, conversion_mode: str, jobs: int
+) -> None:
+    # With --jobs > 1, work done in worker processes shows up only in the wall
+    # time of the parent's enclosing spans (section_pages, post_processing, dedupe).
+    report = {
+        "input": str(input_path),
+        "pages": page_count,
+        "conversion_mode": conversion_mode,
+        "jobs": jobs,
+        **timer.report(),
+    }
+    (out_dir / TIMINGS_FILE).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+def convert_document(
+    input_path: Path,
+    out_root: Path,
+    max_section_chars: int = 0,
+    include_section_metadata: bool = True,
+    conversion_mode: str = "sections",
+    page_cache_pages: int = PAGE_LAYOUT_CACHE_PAGES,
+    jobs: int = 1,
+    doc=None,
+    layouts: PageLayoutCache | None = None,
+    page_store: PageResultStore | None = None,
+    render_only: bool = False,
+    reuse_sections: bool = False,
+    max_section_tokens: int = 0,
+    dedupe_scope: str = "section",
+    noise_profile: str = "auto",
+):
+    if dedupe_scope not in DEDUPE_SCOPES:
+        raise ValueError(f"Unsupported dedupe scope: {dedupe_scope}")
+    if noise_profile not in NOISE_PROFILES:
+        raise ValueError(f"Unsupported noise profile: {noise_profile}")
+    out_dir = Path(out_root).expanduser().resolve() / input_path.stem
+    reset_progress_clock()
+    timer = StageTimer()
+    previous_timer = _stage_timer
+    set_stage_timer(timer)
+    try:
+        if render_only or reuse_sections:
+            try:
+                meta, normalized, section_rows = load_section_store(
+                    out_dir, input_path, conversion_mode, dedupe_scope, noise_profile
+                )
+            except SectionStoreUnavailable as err:
+                if render_only:
+                    raise
+                report_progress(f"Stored sections not reusable ({err}); extracting from PDF", stage="open")
+            else:
+                report_progress(f"Rendering {conversion_mode} output from stored sections", stage="render")
+                with stage_span("render"):
+                    normalized, segments = render_outputs(
+                        normalized,
+                        section_rows,
+                        out_dir,
+                        include_section_metadata,
+                        conversion_mode,
+                        emit_generated_toc=bool(meta.get("embedded_toc")),
+                        page_count=int(meta.get("page_count") or 1),
+                        part_char_limit=section_part_char_limit(max_section_chars, max_section_tokens),
+                    )
+                report_progress("Finalizing output indexes", stage="finalize")
+                write_stage_timings(out_dir, timer, input_path, int(meta.get("page_count") or 0), conversion_mode, jobs)
+                return out_dir, normalized, segments
+
+        # Callers that keep documents open between runs pass `doc` (and its layout
+        # cache) in; only documents opened here are closed here.
+        owns_doc = doc is None
+        if owns_doc:
+            report_progress("Opening PDF document", stage="open")
+            with stage_span("open"):
+                doc = fitz.open(str(input_path))
+        else:
+            report_progress("Reusing open PDF document", stage="open")
+        try:
+            if layouts is None:
+                layouts = PageLayoutCache(doc, max_pages=page_cache_pages, store=page_store)
+
+            report_progress("Detecting headings", stage="outline")
+            with stage_span("outline"):
+                outline = build_outline_from_toc(doc)
+                has_embedded_toc = bool(outline)
+                if outline:
+                    outline = infer_toc_heading_positions(doc, outline, layouts=layouts)
+                if not outline:
+                    report_progress("No embedded TOC found; using text heuristics")
+                    outline = build_outline_heuristic(doc, layouts=layouts)
+                heuristic_outline = bool(outline) and all(item.get("source") == "text-heuristic" for item in outline)
+                outline_variant = required_outline_variant(conversion_mode, heuristic_outline)
+                if not outline:
+                    outline = [{"level": 1, "title": "Document", "page_start": 1, "source": "fallback"}]
+                elif outline_variant == "single-fallback":
+                    outline = [
+                        {
+                            "level": 1,
+                            "title": infer_document_title(doc, input_path, layouts=layouts),
+                            "page_start": 1,
+                            "source": "single-fallback",
+                        }
+                    ]
+                outline = normalize_outline(outline)
+
+            section_store = {
+                "version": SECTION_STORE_VERSION,
+                "source": source_signature(input_path),
+                "page_count": int(doc.page_count),
+                "embedded_toc": has_embedded_toc,
+                "heuristic_outline": heuristic_outline,
+                "outline_variant": outline_variant,
+                "dedupe_scope": dedupe_scope,
+                "noise_profile": resolve_noise_profile_mode(noise_profile, doc.page_count),
+            }
+            report_progress("Writing outline and section markdown files", stage="sections")
+            with stage_span("sections"):
+                normalized, segments = write_outputs(
+                    doc,
+                    outline,
+                    out_dir,
+                    max_section_chars,
+                    include_section_metadata,
+                    conversion_mode,
+                    emit_generated_toc=has_embedded_toc,
+                    layouts=layouts,
+                    jobs=jobs,
+                    section_store=section_store,
+                    max_section_tokens=max_section_tokens,
+                    dedupe_scope=dedupe_scope,
+                    noise_profile=noise_profile,
+                )
+            report_progress("Finalizing output indexes", stage="finalize")
+            if layouts.store is not None:
+                with stage_span("page_store_prune"):
+                    layouts.store.prune()
+            page_count = int(doc.page_count)
+        finally:
+            if owns_doc:
+                doc.close()
+
+        write_stage_timings(out_dir, timer, input_path, page_count, conversion_mode, jobs)
+        return out_dir, normalized, segments
+    finally:
+        set_stage_timer(previous_timer)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Phase 1 outline extraction and split planner")
     parser.add_argument("--input", "-i", required=True, help="Input PDF path")
     parser.add_argument("--out-dir", "-o", default="output", help="Output directory root")
-    parser.add_argument("--max-section-chars", type=int, default=8000, help="Max chars per section chunk")
+    parser.add_argument(
+        "--max-section-chars",
+        type=int,
+        default=0,
+        help="Split sections (and major-heading groups) longer than this many characters into -part-N files (0 = never split)",
+    )
+    parser.add_argument(
+        "--max-section-tokens",
+        type=int,
+        default=0,
+        help=f"Like --max-section-chars but budgeted in estimated tokens (~{CHARS_PER_TOKEN_ESTIMATE} chars each); overrides it",
+    )
     parser.add_argument(
         "--include-section-metadata",
         type=int,
@@ -1796,55 +3823,113 @@ def main():
         default="sections",
         help="Output grouping mode: single file, per-major-heading, or per-section",
     )
+    parser.add_argument(
+        "--dedupe-scope",
+        choices=list(DEDUPE_SCOPES),
+        default="section",
+        help="Drop repeated paragraphs within each section, or across the whole document",
+    )
+    parser.add_argument(
+        "--noise-profile",
+        choices=list(NOISE_PROFILES),
+        default="auto",
+        help=f"Find running headers/footers from every page (full) or a page sample (sampled); "
+        f"auto samples documents over {NOISE_PROFILE_FULL_SCAN_PAGES} pages",
+    )
+    parser.add_argument(
+        "--page-cache-pages",
+        type=int,
+        default=PAGE_LAYOUT_CACHE_PAGES,
+        help="Max parsed page layouts kept in memory and shared between extraction stages",
+    )
+    parser.add_argument(
+        "--page-cache-dir",
+        default=str(default_page_store_dir()),
+        help="Folder for the on-disk page result cache reused across runs (empty string disables it)",
+    )
+    parser.add_argument(
+        "--page-cache-max-mb",
+        type=int,
+        default=PAGE_STORE_MAX_MB,
+        help="Size cap for the on-disk page result cache; least recently used pages are evicted (0 disables it)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Worker processes for page extraction (0 = one per CPU core)",
+    )
+    parser.add_argument(
+        "--render-only",
+        action="store_true",
+        help=f"Rebuild outputs for --conversion-mode from a previous run's {SECTION_STORE_FILE} without opening the PDF",
+    )
+    parser.add_argument(
+        "--reuse-sections",
+        action="store_true",
+        help=f"Render from {SECTION_STORE_FILE} when it is still valid for this PDF, otherwise extract as usual",
+    )
+    parser.add_argument(
+        "--progress-format",
+        choices=list(PROGRESS_FORMATS),
+        default="text",
+        help="Print progress as PROGRESS: lines (text) or as JSON events with stage, page counts and ETA (json)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"Run under cProfile and save the raw stats as {PROFILE_FILE} in the output folder (main process only)",
+    )
     args = parser.parse_args()
 
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
     input_path = Path(args.input).expanduser().resolve()
-    if not input_path.exists():
+    if not input_path.exists() and not args.render_only:
         raise SystemExit(f"Input file not found: {input_path}")
 
-    print("PROGRESS: Opening PDF document", flush=True)
-    doc = fitz.open(str(input_path))
+    page_store = None
+    if args.page_cache_dir and args.page_cache_max_mb > 0:
+        page_store = PageResultStore(Path(args.page_cache_dir), args.page_cache_max_mb * 1024 * 1024)
 
-    print("PROGRESS: Detecting headings", flush=True)
-    outline = build_outline_from_toc(doc)
-    has_embedded_toc = bool(outline)
-    if outline:
-        outline = infer_toc_heading_positions(doc, outline)
-    if not outline:
-        print("PROGRESS: No embedded TOC found; using text heuristics", flush=True)
-        outline = build_outline_heuristic(doc)
-    if not outline:
-        outline = [{"level": 1, "title": "Document", "page_start": 1, "source": "fallback"}]
-    elif args.conversion_mode == "single" and all(item.get("source") == "text-heuristic" for item in outline):
-        outline = [
-            {
-                "level": 1,
-                "title": infer_document_title(doc, input_path),
-                "page_start": 1,
-                "source": "single-fallback",
-            }
-        ]
-    outline = normalize_outline(outline)
+    if args.progress_format == "json":
+        set_progress_sink(print_progress_json)
 
-    base = input_path.stem
-    out_dir = Path(args.out_dir).expanduser().resolve() / base
-    print("PROGRESS: Writing outline and section markdown files", flush=True)
-    normalized, segments = write_outputs(
-        doc,
-        outline,
-        out_dir,
-        args.max_section_chars,
-        bool(args.include_section_metadata),
-        args.conversion_mode,
-        emit_generated_toc=has_embedded_toc,
-    )
-    print("PROGRESS: Finalizing output indexes", flush=True)
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        out_dir, normalized, segments = convert_document(
+            input_path,
+            Path(args.out_dir),
+            max_section_chars=args.max_section_chars,
+            max_section_tokens=args.max_section_tokens,
+            include_section_metadata=bool(args.include_section_metadata),
+            conversion_mode=args.conversion_mode,
+            page_cache_pages=args.page_cache_pages,
+            jobs=jobs,
+            page_store=page_store,
+            render_only=args.render_only,
+            reuse_sections=args.reuse_sections,
+            dedupe_scope=args.dedupe_scope,
+            noise_profile=args.noise_profile,
+        )
+    except SectionStoreUnavailable as err:
+        raise SystemExit(f"Cannot render from stored sections: {err}")
+    finally:
+        if profiler is not None:
+            profiler.disable()
+    if profiler is not None:
+        profiler.dump_stats(str(out_dir / PROFILE_FILE))
 
     print("Phase 1 extraction complete")
     print(f"Input: {input_path}")
     print(f"Output: {out_dir}")
     print(f"Headings: {len(normalized)}")
     print(f"Segments: {len(segments)}")
+    if profiler is not None:
+        print(f"Profile: {out_dir / PROFILE_FILE}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Long-lived extraction worker for the desktop app.
+
+Reads one JSON request per line on stdin and answers with JSON lines on stdout:
+
+    {"id": "1", "type": "convert", "input": "...pdf", "out_dir": "...", "conversion_mode": "sections",
+     "include_section_metadata": true, "max_section_chars": 0, "dedupe_scope": "section",
+     "page_cache_dir": "...", "page_cache_max_mb": 512, "reuse_sections": true}
+    {"id": "2", "type": "search", "output_dir": "...", "query": "...", "limit": 50}
+    {"id": "3", "type": "ping"}
+    {"type": "shutdown"}
+
+Every convert request produces zero or more {"type": "progress"} messages followed by
+exactly one {"type": "result"} or {"type": "error"} message carrying the same id.
+Progress messages carry "message", "stage" and "elapsed_seconds", plus "pages_done",
+"pages_total" and "eta_seconds" while a stage works through pages. A search request
+gets one {"type": "search_result", "hits": [...]} or {"type": "error"} message.
+"""
+import io
+import json
+import os
+import sys
+import traceback
+from collections import OrderedDict
+from pathlib import Path
+
+# Protocol messages use the real stdout; everything else printed in this process,
+# including import-time notices from PyMuPDF, is redirected to stderr.
+PROTOCOL_STDOUT = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
+sys.stdout = sys.stderr
+
+import fitz
+
+import extract_outline
+
+# Recently converted documents kept open (with their parsed page layouts) so a
+# re-run in another conversion mode skips the open and parse.
+DOCUMENT_CACHE_SIZE = 3
+
+
+class DocumentCache:
+    def __init__(self, max_docs: int = DOCUMENT_CACHE_SIZE):
+        self.max_docs = max(1, int(max_docs))
+        self._entries = OrderedDict()
+
+    def get(self, input_path: Path, page_cache_pages: int, store: extract_outline.PageResultStore | None = None):
+        key = str(input_path)
+        stat = input_path.stat()
+        store_signature = (str(store.root), store.max_bytes) if store is not None else None
+        signature = (stat.st_size, stat.st_mtime_ns, int(page_cache_pages), store_signature)
+        entry = self._entries.get(key)
+        if entry is not None and entry["signature"] == signature:
+            self._entries.move_to_end(key)
+            return entry["doc"], entry["layouts"]
+        if entry is not None:
+            self.discard(input_path)
+
+        doc = fitz.open(key)
+        layouts = extract_outline.PageLayoutCache(doc, max_pages=page_cache_pages, store=store)
+        self._entries[key] = {"signature": signature, "doc": doc, "layouts": layouts}
+        while len(self._entries) > self.max_docs:
+            _, oldest = self._entries.popitem(last=False)
+            oldest["doc"].close()
+        return doc, layouts
+
+    def discard(self, input_path: Path) -> None:
+        entry = self._entries.pop(str(input_path), None)
+        if entry is not None:
+            entry["doc"].close()
+
+    def close_all(self) -> None:
+        while self._entries:
+            _, entry = self._entries.popitem(last=False)
+            entry["doc"].close()
+
+
+def build_page_store(request: dict):
+    cache_dir = request.get("page_cache_dir")
+    if cache_dir is None:
+        cache_dir = str(extract_outline.default_page_store_dir())
+    max_mb = request.get("page_cache_max_mb")
+    max_mb = extract_outline.PAGE_STORE_MAX_MB if max_mb is None else int(max_mb)
+    if not cache_dir or max_mb <= 0:
+        return None
+    return extract_outline.PageResultStore(Path(str(cache_dir)), max_mb * 1024 * 1024)
+
+
+def handle_convert(request: dict, cache: DocumentCache, send) -> None:
+    request_id = request.get("id")
+    extract_outline.set_progress_sink(lambda event: send({"id": request_id, "type": "progress", **event}))
+    input_path = None
+    try:
+        input_path = Path(str(request.get("input") or "")).expanduser().resolve()
+        if not input_path.is_file():
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+        page_cache_pages = int(request.get("page_cache_pages") or extract_outline.PAGE_LAYOUT_CACHE_PAGES)
+        page_store = build_page_store(request)
+        doc, layouts = cache.get(input_path, page_cache_pages, page_store)
+        out_dir, normalized, segments = extract_outline.convert_document(
+            input_path,
+            Path(str(request.get("out_dir") or "output")),
+            max_section_chars=int(request.get("max_section_chars") or 0),
+            max_section_tokens=int(request.get("max_section_tokens") or 0),
+            include_section_metadata=bool(request.get("include_section_metadata", True)),
+            conversion_mode=str(request.get("conversion_mode") or "sections"),
+            doc=doc,
+            layouts=layouts,
+            page_store=page_store,
+            render_only=bool(request.get("render_only", False)),
+            reuse_sections=bool(request.get("reuse_sections", False)),
+            dedupe_scope=str(request.get("dedupe_scope") or "section"),
+            noise_profile=str(request.get("noise_profile") or "auto"),
+        )
+        send(
+            {
+                "id": request_id,
+                "type": "result",
+                "output_dir": str(out_dir),
+                "headings": len(normalized),
+                "segments": len(segments),
+            }
+        )
+    except Exception as err:
+        if input_path is not None:
+            cache.discard(input_path)
+        send(
+            {
+                "id": request_id,
+                "type": "error",
+                "message": f"{type(err).__name__}: {err}",
+                "details": traceback.format_exc(),
+            }
+        )
+    finally:
+        extract_outline.set_progress_sink(None)
+
+
+def handle_search(request: dict, send) -> None:
+    request_id = request.get("id")
+    try:
+        hits = extract_outline.search_section_index(
+            Path(str(request.get("output_dir") or "")).expanduser(),
+            str(request.get("query") or ""),
+            limit=int(request.get("limit") or extract_outline.SEARCH_RESULT_LIMIT),
+        )
+        send({"id": request_id, "type": "search_result", "hits": hits})
+    except Exception as err:
+        send({"id": request_id, "type": "error", "message": f"{type(err).__name__}: {err}"})
+
+
+def main():
+    requests = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+
+    def send(message: dict) -> None:
+        PROTOCOL_STDOUT.write(json.dumps(message) + "\n")
+        PROTOCOL_STDOUT.flush()
+
+    cache = DocumentCache()
+    send({"type": "ready", "pid": os.getpid()})
+    try:
+        for raw in requests:
+            line = raw.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError:
+                send({"id": None, "type": "error", "message": "Invalid request: expected one JSON object per line."})
+                continue
+            if not isinstance(request, dict):
+                send({"id": None, "type": "error", "message": "Invalid request: expected a JSON object."})
+                continue
+
+            kind = request.get("type")
+            if kind == "shutdown":
+                break
+            if kind == "ping":
+                send({"id": request.get("id"), "type": "pong"})
+            elif kind == "convert":
+                handle_convert(request, cache, send)
+            elif kind == "search":
+                handle_search(request, send)
+            else:
+                send({"id": request.get("id"), "type": "error", "message": f"Unsupported request type: {kind}"})
+    finally:
+        cache.close_all()
+
+
+if __name__ == "__main__":
+    main()
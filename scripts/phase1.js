@@ -1,16 +1,31 @@
 #!/usr/bin/env node
-const { spawnSync } = require('node:child_process');
+const { execFile, spawnSync } = require('node:child_process');
 const fs = require('node:fs');
+const os = require('node:os');
 const path = require('node:path');
 
+// Bump when the cache layout or the probe below changes.
+const INTERPRETER_CACHE_VERSION = 1;
+// Prints the interpreter's real path first, then fails if PyMuPDF is missing, so
+// one spawn per candidate tells "not Python", "no PyMuPDF", and "usable" apart.
+const PYTHON_PROBE_CODE = 'import sys; print(sys.executable, flush=True); import fitz';
+
 function parseArgs(argv) {
   const opts = {
     input: '',
     outDir: 'output',
     engine: 'auto',
-    maxSectionChars: '8000',
+    refreshPython: false,
+    maxSectionChars: '0',
+    maxSectionTokens: '0',
     includeSectionMetadata: '1',
     conversionMode: 'sections',
+    dedupeScope: 'section',
+    noiseProfile: 'auto',
+    jobs: '1',
+    renderOnly: false,
+    reuseSections: false,
+    profile: false,
   };
 
   for (let i = 2; i < argv.length; i += 1) {
@@ -21,12 +36,28 @@ function parseArgs(argv) {
       opts.outDir = argv[++i] || 'output';
     } else if (arg === '--engine') {
       opts.engine = (argv[++i] || 'auto').toLowerCase();
+    } else if (arg === '--refresh-python') {
+      opts.refreshPython = true;
     } else if (arg === '--max-section-chars') {
-      opts.maxSectionChars = argv[++i] || '8000';
+      opts.maxSectionChars = argv[++i] || '0';
+    } else if (arg === '--max-section-tokens') {
+      opts.maxSectionTokens = argv[++i] || '0';
     } else if (arg === '--include-section-metadata') {
       opts.includeSectionMetadata = argv[++i] || '1';
     } else if (arg === '--conversion-mode') {
       opts.conversionMode = argv[++i] || 'sections';
+    } else if (arg === '--dedupe-scope') {
+      opts.dedupeScope = argv[++i] || 'section';
+    } else if (arg === '--noise-profile') {
+      opts.noiseProfile = argv[++i] || 'auto';
+    } else if (arg === '--jobs' || arg === '-j') {
+      opts.jobs = argv[++i] || '1';
+    } else if (arg === '--render-only') {
+      opts.renderOnly = true;
+    } else if (arg === '--reuse-sections') {
+      opts.reuseSections = true;
+    } else if (arg === '--profile') {
+      opts.profile = true;
     } else if (arg === '--help' || arg === '-h') {
       printHelp();
       process.exit(0);
@@ -54,8 +85,10 @@ function parseArgs(argv) {
 function printHelp() {
   console.log(
     'Usage: node scripts/phase1.js --input <file.pdf> [--out-dir output] '
-    + '[--engine auto|pymupdf] [--max-section-chars 8000] '
-    + '[--include-section-metadata 1|0] [--conversion-mode single|major|sections]'
+    + '[--engine auto|pymupdf] [--refresh-python] [--max-section-chars N] [--max-section-tokens N] '
+    + '[--include-section-metadata 1|0] [--conversion-mode single|major|sections] [--dedupe-scope section|document] '
+    + '[--noise-profile auto|full|sampled] '
+    + '[--jobs N] [--render-only] [--reuse-sections] [--profile]'
   );
 }
 
@@ -70,15 +103,80 @@ function findFirstPdf(dir) {
   return '';
 }
 
-function commandExists(command, args = ['--version']) {
-  const check = spawnSync(command, args, { stdio: 'ignore', windowsHide: true });
-  return check.status === 0;
+function parseProbeOutput(stdout, exitCode) {
+  const executable = String(stdout || '').split(/\r?\n/)[0].trim();
+  if (!executable) return null;
+  return { executable, hasPyMuPDF: exitCode === 0 };
+}
+
+function probePython(pythonBin) {
+  const check = spawnSync(pythonBin, ['-c', PYTHON_PROBE_CODE], {
+    encoding: 'utf8',
+    stdio: ['ignore', 'pipe', 'ignore'],
+    windowsHide: true,
+  });
+  if (check.error || check.status === null) return null;
+  return parseProbeOutput(check.stdout, check.status);
+}
+
+// Same probe without blocking the event loop (used by the Electron main process).
+function probePythonAsync(pythonBin) {
+  return new Promise((resolve) => {
+    execFile(pythonBin, ['-c', PYTHON_PROBE_CODE], { encoding: 'utf8', windowsHide: true }, (err, stdout) => {
+      // A non-numeric code means the interpreter could not be spawned or was killed.
+      if (err && !Number.isInteger(err.code)) {
+        resolve(null);
+        return;
+      }
+      resolve(parseProbeOutput(stdout, err ? err.code : 0));
+    });
+  });
+}
+
+function defaultInterpreterCachePath() {
+  const base = process.platform === 'win32'
+    ? (process.env.LOCALAPPDATA || path.join(os.homedir(), 'AppData', 'Local'))
+    : (process.env.XDG_CACHE_HOME || path.join(os.homedir(), '.cache'));
+  return path.join(base, 'petes-pdf-to-md', 'python-interpreter.json');
 }
 
-function hasPyMuPDF(pythonBin) {
-  const code = 'import fitz';
-  const check = spawnSync(pythonBin, ['-c', code], { stdio: 'ignore', windowsHide: true });
-  return check.status === 0;
+function interpreterOverride() {
+  return String(process.env.PDF_TO_MD_PYTHON || process.env.PYTHON_BIN || '').trim();
+}
+
+function readInterpreterCache(cachePath) {
+  let cached;
+  try {
+    cached = JSON.parse(fs.readFileSync(cachePath, 'utf8'));
+  } catch (_err) {
+    return null;
+  }
+  if (!cached || cached.version !== INTERPRETER_CACHE_VERSION) return null;
+  // A changed PDF_TO_MD_PYTHON/PYTHON_BIN means the user asked for a different interpreter.
+  if (cached.override !== interpreterOverride()) return null;
+  try {
+    const stat = fs.statSync(cached.executable);
+    if (!stat.isFile() || stat.mtimeMs !== cached.mtimeMs || stat.size !== cached.size) return null;
+  } catch (_err) {
+    return null;
+  }
+  return cached;
+}
+
+function writeInterpreterCache(cachePath, executable) {
+  try {
+    const stat = fs.statSync(executable);
+    fs.mkdirSync(path.dirname(cachePath), { recursive: true });
+    fs.writeFileSync(cachePath, JSON.stringify({
+      version: INTERPRETER_CACHE_VERSION,
+      override: interpreterOverride(),
+      executable,
+      mtimeMs: stat.mtimeMs,
+      size: stat.size,
+    }, null, 2), 'utf8');
+  } catch (_err) {
+    // Caching is best effort; the next run simply probes again.
+  }
 }
 
 function findPythonCandidates() {
@@ -101,33 +199,70 @@ function findPythonCandidates() {
   add('/opt/homebrew/bin/python');
   add('/usr/local/bin/python');
 
-  return candidates.filter((bin) => commandExists(bin));
+  return candidates;
 }
 
-function resolveEngine(requested) {
+function checkEngineName(requested) {
   if (requested !== 'auto' && requested !== 'pymupdf') {
     throw new Error(`Unsupported engine: ${requested}`);
   }
+}
+
+function cachedEngine(cachePath, refresh) {
+  if (refresh) return null;
+  const cached = readInterpreterCache(cachePath);
+  return cached ? { engine: 'pymupdf', pythonBin: cached.executable, cached: true } : null;
+}
 
-  const pythonCandidates = findPythonCandidates();
+function noUsableEngineError(pythonCandidates) {
   if (pythonCandidates.length === 0) {
-    throw new Error('Python is required for Phase 1. Install Python 3 and try again.');
+    return new Error('Python is required for Phase 1. Install Python 3 and try again.');
   }
+  const installHintBin = pythonCandidates[0];
+  return new Error(
+    `PyMuPDF is not installed for detected Python interpreters (${pythonCandidates.join(', ')}). `
+    + `Install with: ${installHintBin} -m pip install pymupdf`
+  );
+}
 
-  if (requested === 'pymupdf' || requested === 'auto') {
-    for (const pythonBin of pythonCandidates) {
-      if (hasPyMuPDF(pythonBin)) {
-        return { engine: 'pymupdf', pythonBin };
-      }
+function resolveEngine(requested, options = {}) {
+  checkEngineName(requested);
+  const cachePath = options.cachePath || defaultInterpreterCachePath();
+  const cached = cachedEngine(cachePath, options.refresh);
+  if (cached) return cached;
+
+  const pythonCandidates = [];
+  for (const candidate of findPythonCandidates()) {
+    const probe = probePython(candidate);
+    if (!probe) continue;
+    if (probe.hasPyMuPDF) {
+      writeInterpreterCache(cachePath, probe.executable);
+      return { engine: 'pymupdf', pythonBin: probe.executable, cached: false };
     }
-    const installHintBin = pythonCandidates[0];
-    throw new Error(
-      `PyMuPDF is not installed for detected Python interpreters (${pythonCandidates.join(', ')}). `
-      + `Install with: ${installHintBin} -m pip install pymupdf`
-    );
+    pythonCandidates.push(candidate);
   }
+  throw noUsableEngineError(pythonCandidates);
+}
 
-  throw new Error('No compatible engine found.');
+// Like resolveEngine, but probes candidates with async child processes. A valid
+// cache entry is still answered from disk without spawning anything.
+async function resolveEngineAsync(requested, options = {}) {
+  checkEngineName(requested);
+  const cachePath = options.cachePath || defaultInterpreterCachePath();
+  const cached = cachedEngine(cachePath, options.refresh);
+  if (cached) return cached;
+
+  const pythonCandidates = [];
+  for (const candidate of findPythonCandidates()) {
+    const probe = await probePythonAsync(candidate);
+    if (!probe) continue;
+    if (probe.hasPyMuPDF) {
+      writeInterpreterCache(cachePath, probe.executable);
+      return { engine: 'pymupdf', pythonBin: probe.executable, cached: false };
+    }
+    pythonCandidates.push(candidate);
+  }
+  throw noUsableEngineError(pythonCandidates);
 }
 
 function resolveExtractScriptPath() {
@@ -157,7 +292,7 @@ function run() {
 
   const inputPath = path.resolve(opts.input);
   console.log(`PROGRESS: Preparing input ${path.basename(inputPath)}`);
-  if (!fs.existsSync(inputPath)) {
+  if (!fs.existsSync(inputPath) && !opts.renderOnly) {
     console.error(`Input file not found: ${inputPath}`);
     process.exit(1);
   }
@@ -165,13 +300,17 @@ function run() {
   let selected;
   try {
     console.log('PROGRESS: Resolving conversion engine');
-    selected = resolveEngine(opts.engine);
+    selected = resolveEngine(opts.engine, { refresh: opts.refreshPython });
   } catch (err) {
     console.error(err.message);
     process.exit(1);
   }
 
   const scriptPath = resolveExtractScriptPath();
+  const extraArgs = [];
+  if (opts.renderOnly) extraArgs.push('--render-only');
+  if (opts.reuseSections) extraArgs.push('--reuse-sections');
+  if (opts.profile) extraArgs.push('--profile');
   if (!fs.existsSync(scriptPath)) {
     console.error(`Extraction script not found: ${scriptPath}`);
     process.exit(1);
@@ -184,8 +323,13 @@ function run() {
       '--input', inputPath,
       '--out-dir', opts.outDir,
       '--max-section-chars', String(opts.maxSectionChars),
+      '--max-section-tokens', String(opts.maxSectionTokens),
       '--include-section-metadata', String(opts.includeSectionMetadata),
       '--conversion-mode', String(opts.conversionMode),
+      '--dedupe-scope', String(opts.dedupeScope),
+      '--noise-profile', String(opts.noiseProfile),
+      '--jobs', String(opts.jobs),
+      ...extraArgs,
     ],
     { stdio: 'inherit', windowsHide: true }
   );
@@ -196,4 +340,13 @@ function run() {
   console.log('PROGRESS: Core extraction complete; waiting for subprocess exit and file flush');
 }
 
-run();
+if (require.main === module) {
+  run();
+}
+
+module.exports = {
+  defaultInterpreterCachePath,
+  resolveEngine,
+  resolveEngineAsync,
+  resolveExtractScriptPath,
+};
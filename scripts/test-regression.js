@@ -2,6 +2,7 @@
 const fs = require('node:fs');
 const path = require('node:path');
 const { spawnSync } = require('node:child_process');
+const { resolveEngine } = require('./phase1.js');
 
 const ROOT = process.cwd();
 const CASES_FILE = path.join(ROOT, 'tests', 'cases', 'regression.json');
@@ -63,6 +64,28 @@ function findMarkdownFiles(dir) {
 }
 
 function executeAutomatedCase(testCase) {
+  if (testCase.check === 'dedupe_prefix_parity') {
+    // Generates its own paragraphs, so this check needs no PDF fixture.
+    const { pythonBin } = resolveEngine('auto');
+    const child = spawnSync(pythonBin, [path.join(ROOT, 'scripts', 'dedupe_parity.py')], {
+      cwd: path.join(ROOT, 'scripts'),
+      encoding: 'utf8',
+      windowsHide: true,
+    });
+    const summary = JSON.parse(child.stdout.slice(child.stdout.indexOf('{')) || '{}');
+    assert(summary.prefix_only_dropped > 0, `No near-threshold duplicates were generated: ${child.stderr}`);
+    assert(
+      !summary.missed.length,
+      `Missed ${summary.missed.length} of ${summary.prefix_only_dropped} paragraphs the prefix-only lookup dropped`
+    );
+    assert(
+      summary.ratio_calls <= summary.ratio_call_budget,
+      `${summary.ratio_calls} difflib comparisons for ${summary.cost_paragraphs} paragraphs (budget ${summary.ratio_call_budget})`
+    );
+    assert(child.status === 0, `dedupe_parity.py exited ${child.status}: ${child.stderr}`);
+    return { paragraphs: summary.paragraphs, dropped: summary.dropped, ratioCalls: summary.ratio_calls };
+  }
+
   const fixtureAbs = path.join(ROOT, testCase.fixture || '');
   assert(testCase.fixture, 'Missing fixture path');
   assert(fs.existsSync(fixtureAbs), `Fixture not found: ${testCase.fixture}`);
@@ -143,6 +166,98 @@ function executeAutomatedCase(testCase) {
     return { outputDir: docDir, filename: expected };
   }
 
+  if (testCase.check === 'jobs_output_parity') {
+    const runs = {};
+    for (const jobs of ['1', '2']) {
+      const jobsOutDir = path.join(caseRunDir, `jobs-${jobs}`);
+      ensureDir(jobsOutDir);
+      const child = runPhase1([
+        '--input', fixtureAbs,
+        '--out-dir', jobsOutDir,
+        '--conversion-mode', testCase.mode || 'sections',
+        '--jobs', jobs,
+      ]);
+      assert(child.status === 0, `--jobs ${jobs}: expected exit 0, got ${child.status}`);
+      const docDir = toDocDir(jobsOutDir, fixtureAbs);
+      const files = {};
+      for (const file of findMarkdownFiles(docDir)) {
+        files[path.relative(docDir, file)] = fs.readFileSync(file, 'utf8');
+      }
+      files['segments.json'] = fs.readFileSync(path.join(docDir, 'segments.json'), 'utf8');
+      runs[jobs] = files;
+    }
+    const serialNames = Object.keys(runs['1']).sort();
+    const parallelNames = Object.keys(runs['2']).sort();
+    assert(
+      JSON.stringify(serialNames) === JSON.stringify(parallelNames),
+      'Parallel run produced a different set of output files'
+    );
+    for (const name of serialNames) {
+      assert(runs['1'][name] === runs['2'][name], `Parallel output differs from serial output: ${name}`);
+    }
+    return { files: serialNames.length };
+  }
+
+  if (testCase.check === 'render_only_parity') {
+    const renderModes = testCase.renderModes || ['major', 'sections'];
+    for (const renderMode of renderModes) {
+      const fullOutDir = path.join(caseRunDir, `full-${renderMode}`);
+      const renderOutDir = path.join(caseRunDir, `render-${renderMode}`);
+      ensureDir(fullOutDir);
+      ensureDir(renderOutDir);
+      const full = runPhase1(['--input', fixtureAbs, '--out-dir', fullOutDir, '--conversion-mode', renderMode]);
+      assert(full.status === 0, `full ${renderMode} run: expected exit 0, got ${full.status}`);
+      const extract = runPhase1(['--input', fixtureAbs, '--out-dir', renderOutDir, '--conversion-mode', testCase.mode || 'sections']);
+      assert(extract.status === 0, `extraction run: expected exit 0, got ${extract.status}`);
+      const render = runPhase1([
+        '--input', fixtureAbs,
+        '--out-dir', renderOutDir,
+        '--conversion-mode', renderMode,
+        '--render-only',
+      ]);
+      assert(render.status === 0, `--render-only ${renderMode}: expected exit 0, got ${render.status}`);
+
+      const fullDocDir = toDocDir(fullOutDir, fixtureAbs);
+      const renderDocDir = toDocDir(renderOutDir, fixtureAbs);
+      const names = findMarkdownFiles(fullDocDir).map((file) => path.relative(fullDocDir, file));
+      names.push('segments.json', 'outline.json');
+      for (const name of names) {
+        const renderedPath = path.join(renderDocDir, name);
+        assert(fs.existsSync(renderedPath), `--render-only ${renderMode} did not write ${name}`);
+        assert(
+          fs.readFileSync(renderedPath, 'utf8') === fs.readFileSync(path.join(fullDocDir, name), 'utf8'),
+          `--render-only ${renderMode} output differs from a full conversion: ${name}`
+        );
+      }
+    }
+    return { modes: renderModes.length };
+  }
+
+  if (testCase.check === 'section_parts_budget') {
+    const limit = Number(testCase.maxSectionChars || 4000);
+    const child = runPhase1([
+      '--input', fixtureAbs,
+      '--out-dir', caseRunDir,
+      '--conversion-mode', testCase.mode || 'sections',
+      '--max-section-chars', String(limit),
+    ]);
+    assert(child.status === 0, `Expected exit 0, got ${child.status}`);
+    const docDir = toDocDir(caseRunDir, fixtureAbs);
+    const segments = JSON.parse(fs.readFileSync(path.join(docDir, 'segments.json'), 'utf8'));
+    const parts = segments.filter((segment) => segment.part);
+    assert(parts.length > 0, `Expected at least one section split at ${limit} chars`);
+    for (const segment of parts) {
+      assert(fs.existsSync(path.join(docDir, segment.file)), `Missing part file: ${segment.file}`);
+      assert(/-part-\d+\.md$/.test(segment.file), `Part file is not named -part-N.md: ${segment.file}`);
+      assert(segment.part <= segment.part_count, `Part ${segment.part} exceeds part_count ${segment.part_count}`);
+      if (segment.part > 1) {
+        const previous = segments[segments.indexOf(segment) - 1];
+        assert(segment.char_offset > previous.char_offset, `Part offsets do not increase: ${segment.file}`);
+      }
+    }
+    return { parts: parts.length };
+  }
+
   throw new Error(`Unsupported automated check: ${testCase.check || '(missing check)'}`);
 }
 